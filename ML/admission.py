@@ -0,0 +1,196 @@
+import asyncio
+import math
+import os
+import time
+from collections import deque
+
+
+class Overloaded(Exception):
+    """Запрос не допущен к обработке: очередь класса полна или истёк срок ожидания."""
+
+    def __init__(self, name, reason, retry_after):
+        super().__init__(f"{name} overloaded: {reason}")
+        self.name = name
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class RequestClass:
+    def __init__(self, name, limit, queue_size, deadline, priority=0):
+        self.name = name
+        self.limit = limit
+        self.queue_size = queue_size
+        self.deadline = deadline  # сколько запрос может ждать в очереди, секунды
+        self.priority = priority  # больше — раньше получает слот общего пула
+        self.active = 0
+        self.borrowed = 0  # сколько из active заняты слотами общего пула
+        self.waiters = deque()
+        self.admitted = 0
+        self.rejected_full = 0
+        self.rejected_deadline = 0
+        self.wait_total = 0.0
+        self.service_time = 1.0  # скользящее среднее времени обработки для оценки Retry-After
+
+    def retry_after(self):
+        # Примерно столько займёт разбор уже стоящей очереди
+        backlog = (len(self.waiters) + 1) / max(1, self.limit)
+        return max(1, math.ceil(backlog * self.service_time))
+
+    def stats(self):
+        return {
+            "limit": self.limit,
+            "active": self.active,
+            "borrowed": self.borrowed,
+            "queued": len(self.waiters),
+            "queue_size": self.queue_size,
+            "admitted": self.admitted,
+            "rejected_queue_full": self.rejected_full,
+            "rejected_deadline": self.rejected_deadline,
+            "mean_wait_ms": round(self.wait_total / self.admitted * 1000, 2) if self.admitted else 0.0,
+        }
+
+
+class AdmissionController:
+    """
+    Отдельные пулы и ограниченные очереди для каждого класса запросов (bulkhead):
+    собственные слоты класса другим классам не достаются, поэтому поток тяжёлых
+    голосовых запросов не занимает ёмкость текстового чата и наоборот.
+
+    Сверх своих слотов классы занимают общий пул (shared). Освободившийся слот
+    общего пула получает ожидающий запрос класса с большим priority, внутри
+    класса — в порядке очереди: при перегрузке чат обгоняет голос, и голос
+    отказывает первым. Запрос, не дождавшийся слота за deadline, получает отказ
+    с оценкой Retry-After.
+    """
+
+    def __init__(self, classes, shared=0, enabled=True):
+        self.classes = {c.name: c for c in classes}
+        self.shared = shared
+        self.shared_active = 0
+        self.enabled = enabled
+
+    @classmethod
+    def from_env(cls):
+        classes = [
+            RequestClass(
+                "chat",
+                limit=int(os.getenv("ADMISSION_CHAT_CONCURRENCY", "128")),
+                queue_size=int(os.getenv("ADMISSION_CHAT_QUEUE", "512")),
+                deadline=float(os.getenv("ADMISSION_CHAT_DEADLINE_MS", "2000")) / 1000,
+                priority=1,
+            ),
+            RequestClass(
+                "voice",
+                limit=int(os.getenv("ADMISSION_VOICE_CONCURRENCY", "4")),
+                queue_size=int(os.getenv("ADMISSION_VOICE_QUEUE", "16")),
+                deadline=float(os.getenv("ADMISSION_VOICE_DEADLINE_MS", "5000")) / 1000,
+            ),
+        ]
+        return cls(
+            classes,
+            shared=int(os.getenv("ADMISSION_SHARED_CONCURRENCY", "8")),
+            enabled=os.getenv("ADMISSION_ENABLED", "1") != "0",
+        )
+
+    async def acquire(self, name):
+        """Ждёт слот класса; возвращает момент допуска, его нужно передать в release()."""
+        if not self.enabled:
+            return time.monotonic()
+        request_class = self.classes[name]
+        # Пока в очереди класса кто-то есть, новый запрос встаёт за ним.
+        # Свободный слот общего пула при ожидающих запросах не остаётся: его сразу раздаёт _dispatch
+        if not request_class.waiters:
+            if request_class.active - request_class.borrowed < request_class.limit:
+                self._grant(request_class)
+                request_class.admitted += 1
+                return time.monotonic()
+            if self.shared_active < self.shared:
+                self._grant(request_class, borrow=True)
+                request_class.admitted += 1
+                return time.monotonic()
+        if len(request_class.waiters) >= request_class.queue_size:
+            request_class.rejected_full += 1
+            raise Overloaded(name, "queue is full", request_class.retry_after())
+
+        future = asyncio.get_running_loop().create_future()
+        request_class.waiters.append(future)
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(asyncio.shield(future), request_class.deadline)
+        except asyncio.TimeoutError:
+            if future.done() and not future.cancelled():
+                # Слот выдан в момент истечения срока: возвращаем его
+                self.release(name)
+            request_class.rejected_deadline += 1
+            raise Overloaded(name, "queue deadline exceeded", request_class.retry_after())
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release(name)
+            raise
+        finally:
+            if not future.done():
+                future.cancel()
+            try:
+                request_class.waiters.remove(future)
+            except ValueError:
+                pass
+            self._dispatch()
+        admitted_at = time.monotonic()
+        request_class.admitted += 1
+        request_class.wait_total += admitted_at - started
+        return admitted_at
+
+    def release(self, name, admitted_at=None):
+        if not self.enabled:
+            return
+        request_class = self.classes[name]
+        request_class.active -= 1
+        # Слоты взаимозаменяемы: первым возвращается занятый в общем пуле
+        if request_class.borrowed:
+            request_class.borrowed -= 1
+            self.shared_active -= 1
+        if admitted_at is not None:
+            service_time = time.monotonic() - admitted_at
+            request_class.service_time = 0.9 * request_class.service_time + 0.1 * service_time
+        self._dispatch()
+
+    def _grant(self, request_class, borrow=False):
+        request_class.active += 1
+        if borrow:
+            request_class.borrowed += 1
+            self.shared_active += 1
+
+    @staticmethod
+    def _next_waiter(request_class):
+        while request_class.waiters:
+            future = request_class.waiters.popleft()
+            if not future.done():
+                return future
+        return None
+
+    def _dispatch(self):
+        """
+        Раздаёт свободные слоты ожидающим: сначала собственные слоты каждого класса
+        в порядке очереди, затем слоты общего пула по убыванию priority.
+        """
+        for request_class in self.classes.values():
+            while request_class.active - request_class.borrowed < request_class.limit:
+                future = self._next_waiter(request_class)
+                if future is None:
+                    break
+                self._grant(request_class)
+                future.set_result(None)
+        for request_class in sorted(self.classes.values(), key=lambda c: -c.priority):
+            while self.shared_active < self.shared:
+                future = self._next_waiter(request_class)
+                if future is None:
+                    break
+                self._grant(request_class, borrow=True)
+                future.set_result(None)
+
+    def stats(self):
+        return {
+            "enabled": self.enabled,
+            "shared": {"limit": self.shared, "active": self.shared_active},
+            **{name: request_class.stats() for name, request_class in self.classes.items()},
+        }
@@ -0,0 +1,30 @@
+import subprocess
+
+import numpy as np
+
+
+SAMPLE_RATE = 16000
+
+
+def decode_audio(data, sr=SAMPLE_RATE):
+    """
+    Декодирует байты аудиофайла любого формата, который понимает ffmpeg,
+    в моно float32 массив с частотой sr — тот же формат, что whisper.load_audio,
+    но без записи на диск: данные подаются в ffmpeg через stdin.
+    """
+    cmd = [
+        "ffmpeg",
+        "-nostdin",
+        "-threads", "0",
+        "-i", "pipe:0",
+        "-f", "s16le",
+        "-ac", "1",
+        "-acodec", "pcm_s16le",
+        "-ar", str(sr),
+        "-",
+    ]
+    try:
+        out = subprocess.run(cmd, input=data, capture_output=True, check=True).stdout
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"Failed to decode audio: {e.stderr.decode(errors='replace')}") from e
+    return np.frombuffer(out, np.int16).flatten().astype(np.float32) / 32768.0
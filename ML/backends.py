@@ -0,0 +1,45 @@
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class LLMBackend:
+    name: str
+    api_url: str
+    api_key: Optional[str]
+    model: str
+
+
+# Все поддерживаемые провайдеры говорят на OpenAI-совместимом /chat/completions,
+# поэтому бэкенд — это адрес, ключ и имя модели.
+# (адрес по умолчанию, переменная с ключом, модель по умолчанию)
+BACKENDS = {
+    "groq": ("https://api.groq.com/openai/v1/chat/completions", "GROQ_API_KEY", "llama3-70b-8192"),
+    "openai": (None, "LLM_API_KEY", None),
+    "fake": ("http://localhost:8002/v1/chat/completions", None, "llama3-70b-8192"),
+}
+
+
+def backend_from_env():
+    """
+    LLM_BACKEND=groq (по умолчанию) | openai | fake.
+    openai — любой OpenAI-совместимый сервер, нужны LLM_API_URL и LLM_MODEL;
+    fake — локальный fake_llm.py для нагрузочных тестов без сети и квоты Groq.
+    LLM_API_URL, LLM_API_KEY и LLM_MODEL переопределяют значения любого бэкенда.
+    """
+    name = os.getenv("LLM_BACKEND", "groq")
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown LLM_BACKEND '{name}', expected one of: {', '.join(BACKENDS)}")
+    default_url, key_env, default_model = BACKENDS[name]
+
+    api_url = os.getenv("LLM_API_URL") or default_url
+    api_key = os.getenv("LLM_API_KEY") or (os.getenv(key_env) if key_env else None)
+    model = os.getenv("LLM_MODEL") or default_model
+    if not api_url:
+        raise ValueError(f"LLM_API_URL environment variable not set for LLM_BACKEND={name}")
+    if not model:
+        raise ValueError(f"LLM_MODEL environment variable not set for LLM_BACKEND={name}")
+    if key_env and not api_key:
+        raise ValueError(f"{key_env} environment variable not set")
+    return LLMBackend(name=name, api_url=api_url, api_key=api_key, model=model)
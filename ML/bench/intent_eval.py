@@ -0,0 +1,99 @@
+"""
+Оценка быстрого пути разбора событий на размеченном наборе.
+
+    python bench/intent_eval.py [--fixtures bench/fixtures/intents.jsonl] [--min-confidence 0.8] [--verbose]
+
+Все примеры разбираются относительно фиксированного «сейчас» (понедельник 16 июня 2025, 09:00),
+поэтому результат воспроизводим. Печатает JSON с долей перехваченных запросов на создание (hit rate),
+точностью среди перехваченных и числом ложных срабатываний на прочих сообщениях.
+Необязательное поле "history" в примере — предыдущие реплики диалога.
+"""
+import argparse
+import datetime
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from intent import FASTPATH_MIN_CONFIDENCE, FastPath, parse_event_intent  # noqa: E402
+
+NOW = datetime.datetime(2025, 6, 16, 9, 0)
+DEFAULT_FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "intents.jsonl")
+
+
+def matches(event, expected):
+    for field, value in expected.items():
+        actual = event.get(field)
+        if field == "title":
+            if str(actual).lower() != str(value).lower():
+                return False
+        elif actual != value:
+            return False
+    return True
+
+
+def evaluate(path, min_confidence, verbose=False):
+    with open(path, encoding="utf-8") as f:
+        cases = [json.loads(line) for line in f if line.strip()]
+
+    fast_path = FastPath(min_confidence=min_confidence)
+    positives = hits = correct = negatives = false_positives = 0
+    elapsed = 0.0
+    for case in cases:
+        started = time.perf_counter()
+        event = fast_path.try_parse(case["message"], now=NOW, history=case.get("history"))
+        elapsed += time.perf_counter() - started
+        handled = event is not None
+        # Уверенность и сигналы — только для вывода --verbose
+        parsed = parse_event_intent(case["message"], now=NOW)
+        expected = case["expected"]
+        if expected is None:
+            negatives += 1
+            if handled:
+                false_positives += 1
+                status = "FALSE POSITIVE"
+            else:
+                status = "ok"
+        else:
+            positives += 1
+            if not handled:
+                status = "to LLM"
+            else:
+                hits += 1
+                if matches(event, expected):
+                    correct += 1
+                    status = "ok"
+                else:
+                    status = "WRONG"
+        if verbose:
+            confidence = parsed.confidence if parsed else None
+            print(f"[{status:>14}] {confidence!s:>5} {case['message']}", file=sys.stderr)
+            if parsed and status in ("WRONG", "FALSE POSITIVE"):
+                print(f"{'':>22}{parsed.event} {parsed.signals}", file=sys.stderr)
+
+    return {
+        "cases": len(cases),
+        "min_confidence": min_confidence,
+        "create_intents": positives,
+        "fast_path_hits": hits,
+        "hit_rate": round(hits / positives, 4) if positives else 0.0,
+        "accuracy": round(correct / hits, 4) if hits else 0.0,
+        "other_messages": negatives,
+        "false_positives": false_positives,
+        "mean_parse_us": round(elapsed / len(cases) * 1e6, 1) if cases else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", default=DEFAULT_FIXTURES)
+    parser.add_argument("--min-confidence", type=float, default=FASTPATH_MIN_CONFIDENCE)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+    print(json.dumps(evaluate(args.fixtures, args.min_confidence, args.verbose), indent=2))
+
+
+if __name__ == "__main__":
+    main()
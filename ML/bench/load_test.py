@@ -0,0 +1,362 @@
+"""
+Нагрузочный тест эндпоинтов ML-сервиса: пропускная способность, p50/p95/p99 и время по этапам.
+
+    python bench/load_test.py --spawn --scenario chat --history 20 --events 200 --concurrency 32 --duration 30
+    python bench/load_test.py --spawn --scenario voice --clip-seconds 3,10,30 --concurrency 4
+    python bench/load_test.py --url http://localhost:8001 --scenario chat_stream --output results.json
+    python bench/load_test.py --spawn --baseline bench/baseline.json --max-regression 0.15
+
+--spawn поднимает на свободных портах fake_llm.py и chat.py с LLM_BACKEND=fake и выключенными
+кэшами, так что тест не ходит в сеть и воспроизводим; задержку заглушки задаёт --fake-latency.
+Без --spawn нагрузка идёт на уже запущенный сервис по --url.
+
+Нагрузка замкнутая: --concurrency клиентов шлют запросы друг за другом в течение --duration секунд,
+первые --warmup секунд в статистику не попадают. Каждое сообщение уникально, чтобы не мерить кэш.
+Время по этапам (fastpath, prompt, transcription, upstream) берётся из заголовка Server-Timing.
+
+Печатает JSON с результатами (и пишет его в --output). С --baseline сравнивает с прошлым
+результатом и выходит с кодом 1, если задержка выросла или пропускная способность упала
+больше чем на --max-regression.
+"""
+import argparse
+import array
+import asyncio
+import datetime
+import io
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+import wave
+
+import httpx
+
+ML_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ML_DIR)
+
+from timing import parse_server_timing  # noqa: E402
+
+SAMPLE_RATE = 16000
+QUESTIONS = [
+    "What do I have planned on Friday?",
+    "How busy is my week?",
+    "When is my next free afternoon?",
+    "Summarize my meetings for tomorrow",
+    "Any tips to prepare for the review?",
+]
+
+
+def make_calendar(n, rng):
+    start = datetime.datetime(2025, 6, 16, 8, 0)
+    events = []
+    for i in range(n):
+        begin = start + datetime.timedelta(hours=rng.randrange(0, 24 * 60), minutes=rng.choice((0, 15, 30, 45)))
+        events.append({
+            "id": str(i),
+            "summary": f"Event {i} {rng.choice(['sync', 'review', 'gym', 'lecture', 'call', 'lunch'])}",
+            "start": begin.isoformat(),
+            "end": (begin + datetime.timedelta(minutes=rng.choice((30, 60, 90)))).isoformat(),
+            "location": rng.choice(["Room 101", "Online", "Campus", ""]),
+        })
+    return events
+
+
+def make_history(n, rng):
+    history = []
+    for i in range(n):
+        role = "user" if i % 2 == 0 else "assistant"
+        words = " ".join(rng.choice(["plan", "meeting", "week", "focus", "task", "time", "call", "notes"])
+                         for _ in range(rng.randrange(8, 40)))
+        history.append({"role": role, "content": f"{i}: {words}"})
+    return history
+
+
+def make_clip(seconds, rng):
+    """WAV 16 кГц с «речью»: слоги из гармоник с огибающей и паузы, чтобы VAD находил сегменты."""
+    samples = array.array("h")
+    t = 0
+    total = int(seconds * SAMPLE_RATE)
+    while len(samples) < total:
+        syllable = int(rng.uniform(0.15, 0.3) * SAMPLE_RATE)
+        pitch = rng.uniform(110, 220)
+        for k in range(syllable):
+            env = math.sin(math.pi * k / syllable)
+            x = sum(math.sin(2 * math.pi * pitch * h * t / SAMPLE_RATE) / h for h in (1, 2, 3))
+            samples.append(int(8000 * env * x))
+            t += 1
+        gap = int((0.5 if rng.random() < 0.15 else rng.uniform(0.05, 0.12)) * SAMPLE_RATE)
+        samples.extend([0] * gap)
+        t += gap
+    return samples[:total]
+
+
+def wav_bytes(samples):
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(SAMPLE_RATE)
+        w.writeframes(samples.tobytes())
+    return buf.getvalue()
+
+
+def percentile(values, p):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(p * len(ordered)) - 1))]
+
+
+def summarize(values):
+    if not values:
+        return None
+    return {
+        "mean": round(sum(values) / len(values), 2),
+        "p50": round(percentile(values, 0.50), 2),
+        "p95": round(percentile(values, 0.95), 2),
+        "p99": round(percentile(values, 0.99), 2),
+        "max": round(max(values), 2),
+    }
+
+
+class Scenario:
+    def __init__(self, args):
+        self.kind = args.scenario
+        self.rng = random.Random(args.seed)
+        self.calendar = make_calendar(args.events, self.rng)
+        self.history = make_history(args.history, self.rng)
+        self.counter = 0
+        self.clips = []
+        if self.kind == "voice":
+            self.clips = [make_clip(float(s), self.rng) for s in args.clip_seconds.split(",")]
+
+    def next_request(self):
+        self.counter += 1
+        if self.kind == "voice":
+            samples = self.clips[self.counter % len(self.clips)]
+            # Хвост тишины разной длины меняет хэш файла, чтобы не попадать в кэш распознавания
+            data = wav_bytes(samples + array.array("h", [0] * (self.counter % 997 + 1)))
+            return "/voice", {"files": {"file": ("clip.wav", data, "audio/wav")}}
+        body = {
+            "message": f"{QUESTIONS[self.counter % len(QUESTIONS)]} (#{self.counter})",
+            "calendar": self.calendar,
+            "history": self.history,
+        }
+        path = "/chat/stream" if self.kind == "chat_stream" else "/chat"
+        return path, {"json": body}
+
+
+async def send(client, path, kwargs, stream):
+    started = time.perf_counter()
+    ttfb = None
+    stream_error = False
+    last_line = ""
+    if stream:
+        async with client.stream("POST", path, **kwargs) as response:
+            async for line in response.aiter_lines():
+                if ttfb is None:
+                    ttfb = time.perf_counter() - started
+                # Ошибка в SSE приходит событием при статусе 200
+                stream_error = stream_error or line == "event: error"
+                if line.startswith("data:"):
+                    last_line = line
+    else:
+        response = await client.post(path, **kwargs)
+    elapsed = time.perf_counter() - started
+    stages = parse_server_timing(response.headers.get("Server-Timing"))
+    if last_line:
+        # Заголовок потока знает только этапы до генерации, полные — в последнем событии
+        try:
+            stages.update(parse_server_timing(json.loads(last_line[len("data:"):]).get("server_timing")))
+        except (ValueError, AttributeError):
+            pass
+    return response.status_code, elapsed, ttfb, stages, stream_error
+
+
+async def run_load(url, scenario, concurrency, duration, warmup, timeout):
+    results = []
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    record_from = started + warmup
+    stop_at = record_from + duration
+    stream = scenario.kind == "chat_stream"
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=url, timeout=timeout, limits=limits) as client:
+        async def worker():
+            while loop.time() < stop_at:
+                path, kwargs = scenario.next_request()
+                issued = loop.time()
+                try:
+                    status, elapsed, ttfb, stages, stream_error = await send(client, path, kwargs, stream)
+                    error = "stream_error" if stream_error else (None if status < 400 else str(status))
+                except httpx.HTTPError as e:
+                    status, elapsed, ttfb, stages, error = 0, loop.time() - issued, None, {}, type(e).__name__
+                if issued >= record_from:
+                    results.append((elapsed, ttfb, stages, error, loop.time()))
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return results, record_from
+
+
+def report(results, record_from, args):
+    ok = [r for r in results if r[3] is None]
+    errors = {}
+    for r in results:
+        if r[3] is not None:
+            errors[r[3]] = errors.get(r[3], 0) + 1
+    window = max((r[4] for r in results), default=record_from) - record_from
+    stage_names = sorted({name for r in ok for name in r[2]})
+    params = {
+        "scenario": args.scenario,
+        "concurrency": args.concurrency,
+        "duration": args.duration,
+        "history": args.history,
+        "events": args.events,
+    }
+    if args.scenario == "voice":
+        params["clip_seconds"] = [float(s) for s in args.clip_seconds.split(",")]
+    if args.spawn:
+        params["fake_latency"] = args.fake_latency
+    return {
+        "params": params,
+        "requests": len(results),
+        "succeeded": len(ok),
+        "errors": errors,
+        "error_rate": round(1 - len(ok) / len(results), 4) if results else 0.0,
+        "throughput_rps": round(len(ok) / window, 2) if window > 0 else 0.0,
+        "latency_ms": summarize([r[0] * 1000 for r in ok]),
+        "ttfb_ms": summarize([r[1] * 1000 for r in ok if r[1] is not None]),
+        "stages_ms": {name: summarize([r[2][name] for r in ok if name in r[2]]) for name in stage_names},
+    }
+
+
+def check_regression(result, baseline, max_regression):
+    """Список нарушений: задержка выше базовой, пропускная способность ниже, ошибок больше."""
+    problems = []
+    for key in ("p50", "p95", "p99"):
+        base = (baseline.get("latency_ms") or {}).get(key)
+        current = (result.get("latency_ms") or {}).get(key)
+        if base and current is not None and current > base * (1 + max_regression):
+            problems.append(f"latency {key} {current}ms > baseline {base}ms (+{max_regression:.0%})")
+    base = baseline.get("throughput_rps")
+    if base and result["throughput_rps"] < base * (1 - max_regression):
+        problems.append(f"throughput {result['throughput_rps']} rps < baseline {base} rps (-{max_regression:.0%})")
+    if result["error_rate"] > baseline.get("error_rate", 0.0) + 0.01:
+        problems.append(f"error rate {result['error_rate']} > baseline {baseline.get('error_rate', 0.0)}")
+    return problems
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_ready(url, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(url, timeout=2).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{url} not ready after {timeout}s")
+
+
+def spawn_services(args):
+    """Запускает заглушку LLM и сервис чата как отдельные процессы; возвращает (url, процессы)."""
+    fake_port, chat_port = free_port(), free_port()
+    env = dict(os.environ)
+    env.update({
+        "FAKE_LLM_LATENCY": args.fake_latency,
+        "FAKE_LLM_TOKENS_PER_S": str(args.fake_tokens_per_s),
+        "LLM_BACKEND": "fake",
+        "LLM_API_URL": f"http://127.0.0.1:{fake_port}/v1/chat/completions",
+        "LLM_CACHE_BACKEND": "none",
+        "TRANSCRIPT_CACHE_BACKEND": "none",
+        "FASTPATH_ENABLED": "1",
+        "ML_ENABLE_VOICE": "1" if args.scenario == "voice" else "0",
+        "ML_WARMUP": "1" if args.scenario == "voice" else "0",
+    })
+    uvicorn = [sys.executable, "-m", "uvicorn", "--host", "127.0.0.1", "--log-level", "warning"]
+    out = None if args.verbose else subprocess.DEVNULL
+    procs = [
+        subprocess.Popen(uvicorn + ["fake_llm:app", "--port", str(fake_port)], cwd=ML_DIR, env=env, stdout=out, stderr=out),
+        subprocess.Popen(uvicorn + ["chat:app", "--port", str(chat_port)], cwd=ML_DIR, env=env, stdout=out, stderr=out),
+    ]
+    try:
+        wait_ready(f"http://127.0.0.1:{fake_port}/v1/models", 30)
+        wait_ready(f"http://127.0.0.1:{chat_port}/ready", args.ready_timeout)
+    except Exception:
+        stop_services(procs)
+        raise
+    return f"http://127.0.0.1:{chat_port}", procs
+
+
+def stop_services(procs):
+    for proc in procs:
+        proc.terminate()
+    for proc in procs:
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8001")
+    parser.add_argument("--spawn", action="store_true", help="run fake_llm.py and chat.py locally for the test")
+    parser.add_argument("--scenario", choices=("chat", "chat_stream", "voice"), default="chat")
+    parser.add_argument("--history", type=int, default=10, help="messages of chat history per request")
+    parser.add_argument("--events", type=int, default=50, help="calendar events per request")
+    parser.add_argument("--clip-seconds", default="3,10", help="comma-separated voice clip lengths")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--warmup", type=float, default=3.0)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--fake-latency", default="lognormal:300:0.4")
+    parser.add_argument("--fake-tokens-per-s", type=float, default=0.0)
+    parser.add_argument("--ready-timeout", type=float, default=300.0)
+    parser.add_argument("--output", help="write the JSON result to this file")
+    parser.add_argument("--baseline", help="previous result to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.15)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    scenario = Scenario(args)
+    procs = []
+    url = args.url
+    if args.spawn:
+        url, procs = spawn_services(args)
+    try:
+        results, record_from = asyncio.run(
+            run_load(url, scenario, args.concurrency, args.duration, args.warmup, args.timeout))
+    finally:
+        stop_services(procs)
+
+    result = report(results, record_from, args)
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        result["regressions"] = check_regression(result, baseline, args.max_regression)
+        exit_code = 1 if result["regressions"] else 0
+
+    text = json.dumps(result, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
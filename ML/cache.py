@@ -0,0 +1,199 @@
+import datetime
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from collections.abc import Sized
+
+
+class InMemoryBackend:
+    """LRU-словарь в памяти процесса с TTL на каждую запись."""
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self.evictions = 0
+
+    async def get(self, key):
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    async def set(self, key, value, ttl):
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    async def clear(self):
+        self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class RedisBackend:
+    """
+    Хранилище в Redis-совместимом сервере (нужен пакет `redis`).
+    Ограничение по памяти задаётся на стороне сервера (maxmemory + allkeys-lru),
+    здесь выставляется только TTL. Числа записей бэкенд не знает: ключи живут на
+    сервере, а считать их SCAN на каждый /stats и /metrics слишком дорого,
+    поэтому в статистике entries — None.
+    """
+
+    def __init__(self, url, prefix="egoai:llm:"):
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError("Redis cache backend requires the 'redis' package") from e
+        self.prefix = prefix
+        self._redis = redis.from_url(url)
+        self.evictions = 0
+
+    async def get(self, key):
+        value = await self._redis.get(self.prefix + key)
+        return value.decode() if value is not None else None
+
+    async def set(self, key, value, ttl):
+        await self._redis.set(self.prefix + key, value, ex=max(1, int(ttl)))
+
+    async def clear(self):
+        async for key in self._redis.scan_iter(match=self.prefix + "*"):
+            await self._redis.delete(key)
+
+
+def create_backend(name, max_entries=1024, redis_url=None, prefix="egoai:llm:"):
+    if name == "redis":
+        return RedisBackend(redis_url or "redis://localhost:6379/0", prefix=prefix)
+    return InMemoryBackend(max_entries=max_entries)
+
+
+def seconds_until_midnight(now=None):
+    now = now or datetime.datetime.now()
+    tomorrow = (now + datetime.timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return (tomorrow - now).total_seconds()
+
+
+class KeyedCache:
+    """Общая часть кэшей: включение/выключение, счётчики попаданий и TTL."""
+
+    def __init__(self, backend, ttl=3600, enabled=True):
+        self.backend = backend
+        self.ttl = ttl
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+
+    def current_ttl(self):
+        return self.ttl
+
+    def entries(self):
+        """Число записей, если бэкенд его знает (в памяти процесса), иначе None."""
+        return len(self.backend) if isinstance(self.backend, Sized) else None
+
+    async def get(self, key):
+        if not self.enabled:
+            return None
+        value = await self.backend.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key, value):
+        if self.enabled:
+            await self.backend.set(key, value, self.current_ttl())
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "backend": type(self.backend).__name__,
+            "entries": self.entries(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.backend.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class ResponseCache(KeyedCache):
+    """
+    Кэш ответов LLM по точному совпадению запроса.
+    Ключ — хэш канонического JSON из списка сообщений, модели и температуры.
+    Системный промпт содержит сегодняшнюю дату, поэтому записи живут не дольше
+    конца текущих суток.
+    """
+
+    @staticmethod
+    def make_key(messages, model_name, temperature):
+        canonical = json.dumps(
+            {"model": model_name, "temperature": temperature, "messages": messages},
+            sort_keys=True,
+            separators=(",", ":"),
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def current_ttl(self):
+        return max(1.0, min(self.ttl, seconds_until_midnight()))
+
+
+class TranscriptionCache(KeyedCache):
+    """
+    Кэш распознанного текста по содержимому загруженного файла.
+    Повторная отправка того же аудио (ретраи клиента) не запускает Whisper,
+    а одинаковый текст затем попадает в кэш ответов LLM.
+    Значение — JSON с текстом и таймингами сегментов.
+    """
+
+    @staticmethod
+    def make_key(data, model_name, language):
+        digest = hashlib.sha256(data)
+        digest.update(f"|{model_name}|{language}".encode("utf-8"))
+        return digest.hexdigest()
+
+    async def get(self, key):
+        value = await super().get(key)
+        return json.loads(value) if value is not None else None
+
+    async def set(self, key, value):
+        await super().set(key, json.dumps(value, ensure_ascii=False))
+
+
+def response_cache_from_env():
+    backend_name = os.getenv("LLM_CACHE_BACKEND", "memory")
+    backend = create_backend(
+        backend_name,
+        max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1024")),
+        redis_url=os.getenv("LLM_CACHE_REDIS_URL"),
+    )
+    return ResponseCache(
+        backend,
+        ttl=int(os.getenv("LLM_CACHE_TTL", "3600")),
+        enabled=backend_name != "none",
+    )
+
+
+def transcription_cache_from_env():
+    backend_name = os.getenv("TRANSCRIPT_CACHE_BACKEND", "memory")
+    backend = create_backend(
+        backend_name,
+        max_entries=int(os.getenv("TRANSCRIPT_CACHE_MAX_ENTRIES", "512")),
+        redis_url=os.getenv("TRANSCRIPT_CACHE_REDIS_URL") or os.getenv("LLM_CACHE_REDIS_URL"),
+        prefix="egoai:stt:",
+    )
+    return TranscriptionCache(
+        backend,
+        ttl=int(os.getenv("TRANSCRIPT_CACHE_TTL", "86400")),
+        enabled=backend_name != "none",
+    )
@@ -1,116 +1,296 @@
-import datetime
-import whisper
-import requests
+import asyncio
+import json
+import httpx
+import logging
 import os
-from fastapi import FastAPI, UploadFile, File, HTTPException
+import time
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, UploadFile, File, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from typing import List, Optional
 import uvicorn
-import tempfile
 
+from admission import AdmissionController, Overloaded
+from backends import backend_from_env
+from cache import response_cache_from_env, transcription_cache_from_env
+from intent import FastPath
+from logs import setup_logging_from_env
+from metrics import CONTENT_TYPE, MetricsMiddleware, Registry
+from prompt import build_system_prompt, prompt_builder
+from sessions import SessionStore
+from singleflight import SingleFlight
+from timing import StageTimer
+from tokens import TokenBudget, assemble_messages, normalize_history
+from transport import CircuitOpenError, ResilientTransport
 
-GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-if not GROQ_API_KEY:
-    raise ValueError("GROQ_API_KEY environment variable not set")
+
+# Логи уходят в очередь и пишутся фоновым потоком, см. logs.py
+setup_logging_from_env()
+logger = logging.getLogger(__name__)
+
+# Провайдер LLM выбирается через LLM_BACKEND (groq | openai | fake), см. backends.py
+LLM_BACKEND = backend_from_env()
+
+# Размер пула соединений к Groq и лимит одновременных запросов
+GROQ_MAX_CONNECTIONS = int(os.getenv("GROQ_MAX_CONNECTIONS", "20"))
+GROQ_MAX_KEEPALIVE = int(os.getenv("GROQ_MAX_KEEPALIVE", "20"))
+GROQ_MAX_CONCURRENCY = int(os.getenv("GROQ_MAX_CONCURRENCY", "512"))
+GROQ_TIMEOUT = float(os.getenv("GROQ_TIMEOUT", "30"))
+
+# ML_ENABLE_VOICE=0 — текстовый деплой: whisper, torch и numpy не импортируются вовсе.
+# ML_WARMUP=1 — загрузить модель в фоне при старте, а не на первом запросе /voice.
+VOICE_ENABLED = os.getenv("ML_ENABLE_VOICE", "1") != "0"
+WARMUP_ON_STARTUP = os.getenv("ML_WARMUP", "0") == "1"
+
+# Метрики в формате Prometheus, отдаются на /metrics
+metrics = Registry()
+request_latency = metrics.histogram(
+    "ml_request_duration_seconds", "End-to-end request latency, until the last byte of the body",
+    ["endpoint", "status"])
+requests_in_flight = metrics.gauge("ml_requests_in_flight", "Requests being processed", ["endpoint"])
+stage_latency = metrics.histogram(
+    "ml_stage_duration_seconds", "Time per processing stage: queue, fastpath, prompt, transcription, upstream",
+    ["endpoint", "stage"])
+llm_latency = metrics.histogram(
+    "ml_llm_request_duration_seconds", "Latency of a single LLM provider HTTP call (until headers for streams)",
+    ["status"])
+llm_prompt_tokens = metrics.counter("ml_llm_prompt_tokens_total", "Prompt tokens reported in the provider usage")
+llm_completion_tokens = metrics.counter(
+    "ml_llm_completion_tokens_total", "Completion tokens reported in the provider usage")
+calendar_events = metrics.counter("ml_calendar_events_total", "Calendar events received with chat requests")
+calendar_events_dropped = metrics.counter(
+    "ml_calendar_events_dropped_total", "Calendar events left out of the prompt by the token budget")
+history_messages = metrics.counter("ml_history_messages_total", "History messages received with chat requests")
+history_messages_dropped = metrics.counter(
+    "ml_history_messages_dropped_total", "History messages left out of the prompt by the token budget")
+# Ниже — значения, которые уже считаются в компонентах; заполняются в collect_service_stats
+llm_in_flight = metrics.gauge("ml_llm_requests_in_flight", "LLM provider calls in flight")
+cache_lookups = metrics.counter("ml_cache_lookups_total", "Cache lookups", ["cache", "result"])
+cache_entries = metrics.gauge("ml_cache_entries", "Entries in the in-process cache", ["cache"])
+cache_evictions = metrics.counter("ml_cache_evictions_total", "LRU evictions", ["cache"])
+fast_path_requests = metrics.counter("ml_fastpath_requests_total", "Messages tried on the local fast path", ["result"])
+single_flight_requests = metrics.counter(
+    "ml_singleflight_requests_total", "LLM calls made vs. requests coalesced onto one", ["result"])
+llm_retries = metrics.counter("ml_llm_retries_total", "Retried LLM provider calls")
+llm_hedges = metrics.counter("ml_llm_hedges_total", "Hedged LLM calls sent and won", ["result"])
+breaker_state = metrics.gauge("ml_llm_breaker_state", "Circuit breaker state: 0 closed, 1 half-open, 2 open")
+breaker_rejected = metrics.counter("ml_llm_breaker_rejected_total", "Requests rejected by the open breaker")
+admission_active = metrics.gauge("ml_admission_active", "Requests holding an admission slot", ["class"])
+admission_queued = metrics.gauge("ml_admission_queued", "Requests waiting for an admission slot", ["class"])
+admission_rejected = metrics.counter(
+    "ml_admission_rejected_total", "Requests rejected with 429", ["class", "reason"])
+whisper_clips = metrics.counter("ml_whisper_clips_total", "Audio clips submitted to Whisper workers")
+whisper_in_flight = metrics.gauge("ml_whisper_in_flight", "Clips being transcribed or waiting for a Whisper worker")
+conversation_sessions = metrics.gauge("ml_conversation_sessions", "Conversations kept server-side")
+conversation_lookups = metrics.counter(
+    "ml_conversation_lookups_total", "Conversation lookups by conversation_id; a miss asks for a resync", ["result"])
 
 
 class Chat:
-    def __init__(self, model_name, api_key):
+    def __init__(self, model_name, api_key, api_url, max_connections=GROQ_MAX_CONNECTIONS,
+                 max_keepalive=GROQ_MAX_KEEPALIVE, max_concurrency=GROQ_MAX_CONCURRENCY,
+                 timeout=GROQ_TIMEOUT, temperature=0.5, transport=None):
         self.model = model_name
+        self.temperature = temperature
         self.api_key = api_key
-        self.api_url = "https://api.groq.com/openai/v1/chat/completions"
+        self.api_url = api_url
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=60,
+        )
+        self.timeout = httpx.Timeout(timeout, connect=5.0)
+        self.max_concurrency = max_concurrency
+        # Ограничивает число запросов в полёте; лишние ждут здесь, а не в пуле httpx
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._client = None
+        self.in_flight = 0
+        # Повторы, circuit breaker и хеджирование запросов к провайдеру
+        self.transport = transport or ResilientTransport.from_env()
 
-    def chat(self, messages):
-        try:
-            print(f"Sending request to Groq API with {len(messages)} messages")
-            response = requests.post(
-                self.api_url,
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": self.model,
-                    "messages": messages,
-                    "temperature": 0.5
-                },
-                timeout=30
+    @property
+    def client(self):
+        # Один долгоживущий HTTP/2 клиент на процесс: соединения переиспользуются
+        if self._client is None or self._client.is_closed:
+            headers = {"Content-Type": "application/json"}
+            if self.api_key:
+                headers["Authorization"] = f"Bearer {self.api_key}"
+            self._client = httpx.AsyncClient(
+                http2=True,
+                limits=self.limits,
+                timeout=self.timeout,
+                headers=headers,
             )
-            print(f"Response status: {response.status_code}")
-            if not response.ok:
-                print(f"Response content: {response.text}")
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _timed(self, send):
+        started = time.perf_counter()
+        status = "error"
+        try:
+            response = await send()
+            status = response.status_code
+            return response
+        finally:
+            llm_latency.observe(time.perf_counter() - started, status=status)
+
+    async def _post(self, payload):
+        async with self._semaphore:
+            self.in_flight += 1
+            try:
+                return await self._timed(lambda: self.client.post(self.api_url, json=payload))
+            finally:
+                self.in_flight -= 1
+
+    @staticmethod
+    def record_usage(usage):
+        if usage:
+            llm_prompt_tokens.inc(usage.get("prompt_tokens", 0))
+            llm_completion_tokens.inc(usage.get("completion_tokens", 0))
+
+    async def chat(self, messages):
+        response = None
+        try:
+            logger.debug("Sending request to LLM API", extra={"messages": len(messages)})
+            payload = {
+                "model": self.model,
+                "messages": messages,
+                "temperature": self.temperature
+            }
+            response = await self.transport.call(lambda: self._post(payload))
+            if not response.is_success:
+                logger.warning("LLM API error response",
+                               extra={"status": response.status_code, "body": response.text})
             response.raise_for_status()
             result = response.json()
+            self.record_usage(result.get("usage"))
             return result['choices'][0]['message']['content'].strip()
-        except requests.exceptions.RequestException as e:
-            print(f"Request error: {e}")
+        except CircuitOpenError as e:
+            logger.warning("LLM API unavailable: %s", e)
+            raise
+        except httpx.HTTPError as e:
+            logger.warning("LLM request error: %s", e)
             raise
         except KeyError as e:
-            print(f"Response parsing error: {e}, Response: {response.text if 'response' in locals() else 'No response'}")
+            logger.error("LLM response parsing error: %s", e,
+                         extra={"body": response.text if response is not None else None})
             raise
         except Exception as e:
-            print(f"Unexpected error in chat method: {e}")
+            logger.exception("Unexpected error in chat method")
             raise
 
-model = Chat("llama3-70b-8192", GROQ_API_KEY)
-model_voice = whisper.load_model("tiny")
+    async def stream(self, messages):
+        """Отдаёт ответ модели по кусочкам (delta.content) по мере генерации."""
+        logger.debug("Streaming request to LLM API", extra={"messages": len(messages)})
+        request = self.client.build_request(
+            "POST",
+            self.api_url,
+            json={
+                "model": self.model,
+                "messages": messages,
+                "temperature": self.temperature,
+                "stream": True
+            },
+        )
+        async with self._semaphore:
+            self.in_flight += 1
+            try:
+                # Повторяется только установка потока: после первого куска ответ уже у клиента
+                response = await self.transport.call(
+                    lambda: self._timed(lambda: self.client.send(request, stream=True)), hedge=False)
+                try:
+                    if not response.is_success:
+                        await response.aread()
+                        logger.warning("LLM API error response",
+                                       extra={"status": response.status_code, "body": response.text})
+                    response.raise_for_status()
+                    # Groq отдаёт OpenAI-совместимый SSE: строки "data: {...}" и "data: [DONE]"
+                    async for line in response.aiter_lines():
+                        if not line.startswith("data:"):
+                            continue
+                        data = line[len("data:"):].strip()
+                        if data == "[DONE]":
+                            break
+                        chunk = json.loads(data)
+                        # Groq кладёт usage в x_groq последнего куска, OpenAI — в сам кусок
+                        self.record_usage(chunk.get("usage") or (chunk.get("x_groq") or {}).get("usage"))
+                        choices = chunk.get("choices") or []
+                        if not choices:
+                            continue
+                        delta = choices[0].get("delta", {}).get("content")
+                        if delta:
+                            yield delta
+                finally:
+                    await response.aclose()
+            finally:
+                self.in_flight -= 1
 
+model = Chat(LLM_BACKEND.model, LLM_BACKEND.api_key, LLM_BACKEND.api_url)
+voice_pipeline = None
+warmup = None  # задача прогрева Whisper при старте, пока она идёт, /ready отвечает 503
+response_cache = response_cache_from_env()
+transcription_cache = transcription_cache_from_env()
+token_budget = TokenBudget.from_env()
+single_flight = SingleFlight()
+admission = AdmissionController.from_env()
+sessions = SessionStore.from_env()
+fast_path = FastPath(enabled=os.getenv("FASTPATH_ENABLED", "1") != "0")
 
-def format_event(event):
-    try:
-        # Проверяем наличие обязательных полей
-        if not isinstance(event, dict):
-            return f"- Invalid event format: {event}"
-        
-        # Получаем start_time (может быть в разных форматах)
-        start_field = event.get("start") or event.get("start_time")
-        end_field = event.get("end") or event.get("end_time") 
-        summary = event.get("summary") or event.get("title", "Untitled event")
-        
-        if not start_field or not end_field:
-            return f"- {summary} (incomplete event data)"
-            
-        # Парсим даты
-        start = datetime.datetime.fromisoformat(
-            start_field.replace("Z", "+00:00")).strftime("%B %d, %Y %I:%M %p")
-        end = datetime.datetime.fromisoformat(
-            end_field.replace("Z", "+00:00")).strftime("%I:%M %p")
-        location = event.get("location", "Unknown location") or "Unknown location"
-        
-        return f"- {summary} from {start} to {end} at {location}"
-    except Exception as e:
-        print(f"Error formatting event {event}: {e}")
-        summary = event.get("summary") or event.get("title", "Unknown event")
-        return f"- {summary} (formatting error)"
 
+def get_voice_pipeline():
+    """Голосовой стек создаётся при первом обращении; сама модель грузится при первом распознавании."""
+    global voice_pipeline
+    if not VOICE_ENABLED:
+        raise HTTPException(status_code=503, detail="Voice is disabled in this deployment")
+    if voice_pipeline is None:
+        from voice import VoicePipeline
+        voice_pipeline = VoicePipeline.from_env()
+    return voice_pipeline
 
-def build_system_prompt(calendar_data=None):
-    today = datetime.datetime.now().strftime("%B %d, %Y")
-    try:
-        if calendar_data:
-            print(f"Processing {len(calendar_data)} calendar events")
-            calendar_context = "\n".join(format_event(e) for e in calendar_data if e)
-        else:
-            calendar_context = "No calendar events available"
-    except Exception as e:
-        print(f"Error processing calendar data: {e}")
-        calendar_context = "Error loading calendar events"
-        
-    content = (
-        "You are a helpful assistant who answers questions about the user's calendar and gives general productivity tips. "
-        "If the user wants to create a calendar event, respond ONLY with a valid JSON object with fields: title, description, start_time, end_time, all_day, location, type. "
-        "Otherwise, answer as usual. "
-        "If user does not setup type use 'other work'"
-        "Only respond based on the provided calendar and general knowledge. "
-        f"Today: {today}\n"
-        f"Here is the user's calendar:\n\n{calendar_context}"
-    )
-    return {"role": "system", "content": content}
 
+def log_warmup_result(task):
+    """
+    Без этого колбэка ошибка прогрева видна только как "Task exception was never retrieved".
+    Неудачный прогрев не блокирует чат: голос помечается деградировавшим в /ready,
+    а следующий запрос /voice снова попробует загрузить модель.
+    """
+    if task.cancelled():
+        return
+    error = task.exception()
+    if error is not None:
+        logger.error("Whisper warmup failed, voice is degraded", exc_info=error)
 
-app = FastAPI(title="ML Calendar Chat API")
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global warmup
+    if VOICE_ENABLED and WARMUP_ON_STARTUP:
+        warmup = asyncio.create_task(get_voice_pipeline().engine.start())
+        warmup.add_done_callback(log_warmup_result)
+    yield
+    if warmup is not None and not warmup.done():
+        warmup.cancel()
+    if voice_pipeline is not None:
+        await voice_pipeline.shutdown()
+    await model.aclose()
+
+
+app = FastAPI(title="ML Calendar Chat API", lifespan=lifespan)
+
+app.add_middleware(
+    MetricsMiddleware,
+    duration=request_latency,
+    in_flight=requests_in_flight,
+    paths=["/chat", "/chat/stream", "/voice", "/stats", "/metrics", "/health", "/ready"],
+)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -124,77 +304,403 @@ class ChatRequest(BaseModel):
     message: str
     calendar: Optional[List[dict]] = None
     history: Optional[List[dict]] = None  # Добавляем поле для истории
+    # С conversation_id история и календарь хранятся на сервере: достаточно прислать
+    # новое сообщение, а календарь — только если его calendar_version изменилась
+    conversation_id: Optional[str] = None
+    calendar_version: Optional[str] = None
 
 
 class ChatResponse(BaseModel):
     response: str
+    usage: Optional[dict] = None  # число токенов по частям промпта
+    conversation_id: Optional[str] = None
 
 
 class VoiceResponse(BaseModel):
     transcription: str
     response: str
+    audio_seconds: Optional[float] = None
+    speech_seconds: Optional[float] = None  # сколько аудио реально ушло в Whisper
+    segments: Optional[List[dict]] = None
+
+
+def resync_required(reason, resend):
+    """Серверное состояние диалога потеряно или устарело: клиент повторяет запрос с полными данными."""
+    return HTTPException(status_code=409, detail={"error": reason, "resync": resend})
+
+
+def resolve_conversation(req: ChatRequest):
+    """
+    Возвращает (сессия, история, календарь) для запроса. Без conversation_id всё
+    берётся из запроса, как раньше. С conversation_id присланные history/calendar
+    заменяют сохранённые (полная пересылка), иначе используются сохранённые.
+    Если сессии нет (истёк TTL, вытеснена, перезапуск), а историю клиент не прислал,
+    или версия календаря изменилась без самого календаря — 409 с тем, что нужно прислать.
+    """
+    if req.conversation_id is None or not sessions.enabled:
+        return None, req.history, req.calendar
+    session = sessions.get(req.conversation_id)
+    if session is None:
+        if req.history is None:
+            raise resync_required("conversation_not_found", ["history", "calendar"])
+        session = sessions.create(req.conversation_id)
+    if req.history is not None:
+        sessions.set_history(session, normalize_history(req.history))
+    if req.calendar is not None:
+        session.calendar = req.calendar
+        session.calendar_version = req.calendar_version
+    elif req.calendar_version is not None and req.calendar_version != session.calendar_version:
+        raise resync_required("calendar_outdated", ["calendar"])
+    return session, session.history, session.calendar
+
+
+def remember_turn(session, message, reply):
+    if session is not None:
+        sessions.append(session, {"role": "user", "content": message}, {"role": "assistant", "content": reply})
+
+
+def build_messages(req: ChatRequest, history, calendar):
+    """Системный промпт + история + текущее сообщение в рамках бюджета токенов."""
+    messages, usage = assemble_messages(
+        prompt_builder, calendar, history, req.message, token_budget)
+    calendar_events.inc(len(calendar or []))
+    calendar_events_dropped.inc(usage["events_dropped"])
+    history_messages.inc(len(history or []))
+    history_messages_dropped.inc(usage["history_dropped"])
+    if usage["events_dropped"] or usage["history_dropped"]:
+        logger.info("Prompt trimmed to budget", extra={"usage": usage})
+    return messages, usage
+
+
+async def complete(messages):
+    """
+    Ответ модели с учётом кэша: при попадании запрос в Groq не отправляется.
+    Одинаковые запросы, пришедшие одновременно, ждут один общий вызов.
+    """
+    key = response_cache.make_key(messages, model.model, model.temperature)
+    cached = await response_cache.get(key)
+    if cached is not None:
+        logger.debug("LLM response cache hit")
+        return cached
+
+    async def call():
+        reply = await model.chat(messages)
+        await response_cache.set(key, reply)
+        return reply
+
+    return await single_flight.do(key, call)
+
+
+def fast_path_reply(message, history=None):
+    """
+    Простую просьбу создать событие разбираем локально и отвечаем тем же JSON, что вернула бы модель.
+    Реплики с историей диалога всегда уходят в LLM.
+    """
+    event = fast_path.try_parse(message, history=history)
+    if event is None:
+        return None
+    logger.debug("Fast path: parsed event without LLM", extra={"title": event["title"]})
+    return json.dumps(event, ensure_ascii=False)
+
+
+def llm_unavailable(error):
+    """Breaker разомкнут: сразу отвечаем 503, клиент может повторить после Retry-After."""
+    return HTTPException(
+        status_code=503,
+        detail=f"LLM provider unavailable: {error}",
+        headers={"Retry-After": str(max(1, round(error.retry_after)))},
+    )
+
+
+def observe_stages(endpoint, timer):
+    for stage, seconds in timer.stages.items():
+        stage_latency.observe(seconds, endpoint=endpoint, stage=stage)
+
+
+def too_busy(error):
+    """Очередь класса переполнена или запрос прождал слишком долго: 429, повторить позже."""
+    return HTTPException(
+        status_code=429,
+        detail=f"Service is busy ({error.reason}), retry later",
+        headers={"Retry-After": str(error.retry_after)},
+    )
+
+
+def sse_event(data, event=None):
+    payload = f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+    if event:
+        return f"event: {event}\n{payload}"
+    return payload
 
 
 @app.post("/chat", response_model=ChatResponse)
-def chat(req: ChatRequest):
+async def chat(req: ChatRequest, response: Response):
+    timer = StageTimer()
     try:
-        print(f"Received chat request: {req.message[:50]}...")
-        if req.history:
-            print(f"Chat history provided: {len(req.history)} messages")
-        
-        system_prompt = build_system_prompt(req.calendar)
-        
-        # Строим полный список сообщений с историей
-        messages = [system_prompt]
-        
-        # Добавляем историю чата если есть
-        if req.history:
-            for hist_msg in req.history:
-                if isinstance(hist_msg, dict) and 'role' in hist_msg and 'content' in hist_msg:
-                    # Убеждаемся что роль корректная для Groq API
-                    role = hist_msg['role']
-                    if role == 'llm':
-                        role = 'assistant'  # Groq использует 'assistant' вместо 'llm'
-                    messages.append({"role": role, "content": hist_msg['content']})
-        
-        # Добавляем текущее сообщение пользователя
-        messages.append({"role": "user", "content": req.message})
-        
-        print(f"Built messages with system prompt + history + current, total messages: {len(messages)}")
-        reply = model.chat(messages)
-        print(f"Got reply from model: {reply[:50] if reply else 'None'}...")
-        return ChatResponse(response=reply)
+        session, history, calendar = resolve_conversation(req)
+        logger.info("Chat request", extra={
+            "chars": len(req.message),
+            "history": len(history or []),
+            "events": len(calendar or []),
+            "conversation": req.conversation_id,
+        })
+
+        with timer.stage("fastpath"):
+            reply = fast_path_reply(req.message, history)
+        if reply is not None:
+            remember_turn(session, req.message, reply)
+            return ChatResponse(response=reply, conversation_id=req.conversation_id)
+
+        # Быстрый путь не требует ресурсов, в очередь встают только запросы к модели
+        with timer.stage("queue"):
+            admitted_at = await admission.acquire("chat")
+        try:
+            with timer.stage("prompt"):
+                messages, usage = build_messages(req, history, calendar)
+
+            logger.debug("Built messages", extra={"messages": len(messages), "tokens": usage["total"]})
+            with timer.stage("upstream"):
+                reply = await complete(messages)
+        finally:
+            admission.release("chat", admitted_at)
+        remember_turn(session, req.message, reply)
+        return ChatResponse(response=reply, usage=usage, conversation_id=req.conversation_id)
+    except HTTPException:
+        raise
+    except CircuitOpenError as e:
+        raise llm_unavailable(e)
+    except Overloaded as e:
+        raise too_busy(e)
     except Exception as e:
-        print(f"Chat endpoint error: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Chat endpoint error")
         raise HTTPException(status_code=500, detail=f"ML Service Error: {str(e)}")
+    finally:
+        response.headers["Server-Timing"] = timer.header()
+        observe_stages("/chat", timer)
 
 
-@app.post("/voice", response_model=VoiceResponse)
-def voice_chat(file: UploadFile = File(...)):
-    tmp_path = None
+@app.post("/chat/stream")
+async def chat_stream(req: ChatRequest):
+    """
+    Потоковый вариант /chat в формате Server-Sent Events.
+    Каждый кусок ответа приходит как `data: {"delta": "..."}`,
+    в конце `event: done` с полным текстом, при ошибке `event: error`.
+    Потерянная сессия диалога — обычный ответ 409 до начала потока.
+    Заголовок Server-Timing уходит до генерации и содержит только этапы до потока;
+    полное время по этапам приходит в поле server_timing событий done и error.
+    """
+    session, history, calendar = resolve_conversation(req)
+    logger.info("Streaming chat request", extra={
+        "chars": len(req.message),
+        "history": len(history or []),
+        "events": len(calendar or []),
+        "conversation": req.conversation_id,
+    })
+    timer = StageTimer()
+    with timer.stage("fastpath"):
+        fast_reply = fast_path_reply(req.message, history)
+    admitted_at = None
+    if fast_reply is None:
+        # Слот держится до конца потока и освобождается в event_stream
+        try:
+            with timer.stage("queue"):
+                admitted_at = await admission.acquire("chat")
+        except Overloaded as e:
+            raise too_busy(e)
     try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as tmp:
-            tmp.write(file.file.read())
-            tmp_path = tmp.name
+        with timer.stage("prompt"):
+            messages, usage = build_messages(req, history, calendar) if fast_reply is None else (None, None)
+    except Exception:
+        if admitted_at is not None:
+            admission.release("chat", admitted_at)
+        raise
 
-        result = model_voice.transcribe(tmp_path, language='en', fp16=False)
-        text = result["text"].strip()
+    async def event_stream():
+        parts = []
+        try:
+            if fast_reply is not None:
+                remember_turn(session, req.message, fast_reply)
+                yield sse_event({"delta": fast_reply})
+                yield sse_event({"response": fast_reply, "server_timing": timer.header()}, event="done")
+                return
+            key = response_cache.make_key(messages, model.model, model.temperature)
+            cached = await response_cache.get(key)
+            if cached is not None:
+                remember_turn(session, req.message, cached)
+                yield sse_event({"delta": cached})
+                yield sse_event(
+                    {"response": cached, "usage": usage, "server_timing": timer.header()}, event="done")
+                return
+            with timer.stage("upstream"):
+                async for delta in model.stream(messages):
+                    parts.append(delta)
+                    yield sse_event({"delta": delta})
+            reply = "".join(parts).strip()
+            await response_cache.set(key, reply)
+            # Оборванный поток в историю не попадает: ответ клиент не получил целиком
+            remember_turn(session, req.message, reply)
+            yield sse_event({"response": reply, "usage": usage, "server_timing": timer.header()}, event="done")
+        except Exception as e:
+            logger.exception("Chat stream error")
+            yield sse_event(
+                {"detail": f"ML Service Error: {e}", "server_timing": timer.header()}, event="error")
+        finally:
+            if admitted_at is not None:
+                admission.release("chat", admitted_at)
+            observe_stages("/chat/stream", timer)
+            logger.info("Chat stream finished", extra={"server_timing": timer.header()})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no", "Server-Timing": timer.header()},
+    )
 
-        system_prompt = build_system_prompt()
-        messages = [system_prompt, {"role": "user", "content": text}]
-        reply = model.chat(messages)
 
-        return VoiceResponse(transcription=text, response=reply)
+@app.post("/voice", response_model=VoiceResponse)
+async def voice_chat(response: Response, file: UploadFile = File(...)):
+    timer = StageTimer()
+    try:
+        pipeline = get_voice_pipeline()
+        with timer.stage("queue"):
+            admitted_at = await admission.acquire("voice")
+        try:
+            data = await file.read()
+            with timer.stage("transcription"):
+                key = await run_in_threadpool(
+                    transcription_cache.make_key, data, pipeline.model_name, 'en')
+                transcript = await transcription_cache.get(key)
+                if transcript is None:
+                    transcript = await pipeline.transcribe(data, language='en')
+                    await transcription_cache.set(key, transcript)
+                else:
+                    logger.debug("Transcription cache hit")
+        finally:
+            # Слот голоса ограничивает распознавание; ответ модели от него не зависит
+            admission.release("voice", admitted_at)
+        text = transcript["transcription"]
+        if not text.strip():
+            # Речи в записи нет: отвечать модели нечего
+            return VoiceResponse(response="", **transcript)
+
+        with timer.stage("fastpath"):
+            reply = fast_path_reply(text)
+        if reply is None:
+            with timer.stage("prompt"):
+                system_prompt = build_system_prompt()
+                messages = [system_prompt, {"role": "user", "content": text}]
+            with timer.stage("upstream"):
+                reply = await complete(messages)
+
+        return VoiceResponse(response=reply, **transcript)
+    except HTTPException:
+        raise
+    except CircuitOpenError as e:
+        raise llm_unavailable(e)
+    except Overloaded as e:
+        raise too_busy(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"ML Service Error: {e}")
     finally:
-        if tmp_path and os.path.exists(tmp_path):
-            os.remove(tmp_path)
+        response.headers["Server-Timing"] = timer.header()
+        observe_stages("/voice", timer)
+
+
+@app.get("/stats")
+async def stats():
+    return {
+        "cache": response_cache.stats(),
+        "transcription_cache": transcription_cache.stats(),
+        "prompt": prompt_builder.stats(),
+        "fast_path": fast_path.stats(),
+        "single_flight": single_flight.stats(),
+        "transport": model.transport.stats(),
+        "admission": admission.stats(),
+        "sessions": sessions.stats(),
+        "transcriber": voice_pipeline.stats() if voice_pipeline is not None else None,
+    }
+
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    return Response(content=metrics.render(), media_type=CONTENT_TYPE)
+
+
+@metrics.collector
+def collect_service_stats():
+    """Переносит счётчики из stats() компонентов в метрики при каждом запросе /metrics."""
+    llm_in_flight.set(model.in_flight)
+    for name, cache in (("response", response_cache), ("transcription", transcription_cache)):
+        cache_lookups.set(cache.hits, cache=name, result="hit")
+        cache_lookups.set(cache.misses, cache=name, result="miss")
+        entries = cache.entries()
+        if entries is not None:  # у Redis число записей не считается
+            cache_entries.set(entries, cache=name)
+        cache_evictions.set(cache.backend.evictions, cache=name)
+    fast_path_requests.set(fast_path.hits, result="hit")
+    fast_path_requests.set(fast_path.misses, result="miss")
+    fast_path_requests.set(fast_path.skipped, result="skipped")
+    single_flight_requests.set(single_flight.calls, result="call")
+    single_flight_requests.set(single_flight.coalesced, result="coalesced")
+    transport = model.transport
+    llm_retries.set(transport.retries)
+    llm_hedges.set(transport.hedges, result="sent")
+    llm_hedges.set(transport.hedge_wins, result="won")
+    breaker_state.set({"closed": 0, "half_open": 1, "open": 2}[transport.breaker.state])
+    breaker_rejected.set(transport.breaker.rejected)
+    for name, request_class in admission.classes.items():
+        admission_active.set(request_class.active, **{"class": name})
+        admission_queued.set(len(request_class.waiters), **{"class": name})
+        admission_rejected.set(request_class.rejected_full, reason="queue_full", **{"class": name})
+        admission_rejected.set(request_class.rejected_deadline, reason="deadline", **{"class": name})
+    conversation_sessions.set(len(sessions))
+    conversation_lookups.set(sessions.hits, result="hit")
+    conversation_lookups.set(sessions.misses, result="miss")
+    if voice_pipeline is not None:
+        engine_stats = voice_pipeline.stats()
+        whisper_clips.set(engine_stats["submitted"])
+        whisper_in_flight.set(engine_stats["in_flight"])
+
+
+@app.get("/health")
+async def health():
+    return {"status": "ok"}
+
+
+@app.get("/ready")
+async def ready():
+    """
+    Готовность к трафику. Чат готов сразу; с ML_WARMUP=1 сервис ждёт окончания
+    прогрева Whisper. Если загрузка модели не удалась, сервис остаётся готовым для чата,
+    а голос отмечается как degraded: 503 навсегда вывел бы из балансировки и чат.
+    """
+    whisper_error = None
+    if not VOICE_ENABLED:
+        whisper_state = "disabled"
+    elif voice_pipeline is None:
+        whisper_state = "not_loaded"
+    else:
+        whisper_state = voice_pipeline.engine.state
+        whisper_error = voice_pipeline.engine.error
+    if whisper_state == "failed":
+        status = "degraded"
+    elif warmup is not None and not warmup.done():
+        status = "starting"
+    else:
+        status = "ready"
+    content = {
+        "status": status,
+        "models": {"llm": model.model, "llm_backend": LLM_BACKEND.name, "whisper": whisper_state},
+    }
+    if whisper_error:
+        content["whisper_error"] = whisper_error
+    return JSONResponse(status_code=503 if status == "starting" else 200, content=content)
 
 
 if __name__ == "__main__":
-    print(f"Starting ML service with GROQ_API_KEY: {'*' * (len(GROQ_API_KEY) - 4) + GROQ_API_KEY[-4:] if GROQ_API_KEY else 'NOT SET'}")
-    uvicorn.run("ml_calendar_chat_api:app",
+    api_key = LLM_BACKEND.api_key
+    logger.info("Starting ML service with LLM backend %s (%s), API key: %s",
+                LLM_BACKEND.name, LLM_BACKEND.api_url,
+                '*' * (len(api_key) - 4) + api_key[-4:] if api_key else 'NOT SET')
+    uvicorn.run("chat:app",
                 host="0.0.0.0", port=8001, reload=True)
\ No newline at end of file
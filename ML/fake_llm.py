@@ -0,0 +1,199 @@
+"""
+Локальная замена Groq для нагрузочного тестирования: OpenAI-совместимый
+POST /v1/chat/completions (обычный и stream=true) без сети и без расхода квоты.
+
+    uvicorn fake_llm:app --port 8002
+    LLM_BACKEND=fake uvicorn chat:app --port 8001
+
+Поведение задаётся переменными окружения и может меняться на лету через POST /fake/config:
+    FAKE_LLM_LATENCY      распределение задержки до первого токена, мс:
+                          fixed:200 | uniform:100:400 | normal:300:50 | lognormal:250:0.5
+    FAKE_LLM_TOKENS_PER_S скорость генерации в потоке и добавка к задержке обычного ответа (0 — мгновенно)
+    FAKE_LLM_REPLY_TOKENS длина ответа в словах
+    FAKE_LLM_ERROR_RATE   доля запросов, завершающихся ошибкой
+    FAKE_LLM_ERROR_STATUS код ошибки (429 отдаётся с Retry-After)
+    FAKE_LLM_HANG_RATE    доля запросов, которые зависают на FAKE_LLM_HANG_SECONDS
+"""
+import asyncio
+import json
+import os
+import random
+import time
+import uuid
+
+from typing import Any, Dict
+
+from fastapi import Body, FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, ConfigDict, Field, ValidationError, field_validator
+import uvicorn
+
+
+def parse_latency(spec):
+    """Строка вида 'вид:параметры' -> функция, возвращающая задержку в секундах."""
+    kind, _, args = spec.partition(":")
+    params = [float(x) for x in args.split(":") if x]
+    if kind == "fixed":
+        (ms,) = params
+        return lambda: ms / 1000
+    if kind == "uniform":
+        lo, hi = params
+        return lambda: random.uniform(lo, hi) / 1000
+    if kind == "normal":
+        mean, std = params
+        return lambda: max(0.0, random.gauss(mean, std)) / 1000
+    if kind == "lognormal":
+        # медиана в мс и sigma логарифма: даёт тяжёлый хвост, как у реального провайдера
+        median, sigma = params
+        return lambda: random.lognormvariate(0, sigma) * median / 1000
+    raise ValueError(f"Unknown latency distribution '{spec}'")
+
+
+class FakeConfig(BaseModel):
+    """Параметры поведения; неизвестные поля и значения вне диапазона отклоняются."""
+    model_config = ConfigDict(extra="forbid")
+
+    latency: str = "lognormal:300:0.4"
+    tokens_per_second: float = Field(0, ge=0)
+    reply_tokens: int = Field(40, ge=0, le=10_000)
+    error_rate: float = Field(0, ge=0, le=1)
+    error_status: int = Field(503, ge=400, le=599)
+    hang_rate: float = Field(0, ge=0, le=1)
+    hang_seconds: float = Field(60, ge=0)
+
+    @field_validator("latency")
+    @classmethod
+    def check_latency(cls, value):
+        try:
+            parse_latency(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"Unknown latency distribution '{value}', "
+                             "expected fixed:MS | uniform:LO:HI | normal:MEAN:STD | lognormal:MEDIAN:SIGMA")
+        return value
+
+    @classmethod
+    def from_env(cls):
+        env = {
+            "latency": "FAKE_LLM_LATENCY",
+            "tokens_per_second": "FAKE_LLM_TOKENS_PER_S",
+            "reply_tokens": "FAKE_LLM_REPLY_TOKENS",
+            "error_rate": "FAKE_LLM_ERROR_RATE",
+            "error_status": "FAKE_LLM_ERROR_STATUS",
+            "hang_rate": "FAKE_LLM_HANG_RATE",
+            "hang_seconds": "FAKE_LLM_HANG_SECONDS",
+        }
+        return cls(**{field: os.environ[name] for field, name in env.items() if name in os.environ})
+
+    def sample_latency(self):
+        return parse_latency(self.latency)()
+
+
+config = FakeConfig.from_env()
+counters = {"requests": 0, "errors": 0, "hangs": 0, "streams": 0}
+
+app = FastAPI(title="Fake OpenAI-compatible LLM")
+
+
+def reply_words(messages, n):
+    last = next((m.get("content", "") for m in reversed(messages) if m.get("role") == "user"), "")
+    words = (f"Fake reply to: {last}".split() + ["lorem", "ipsum", "dolor", "sit", "amet"] * n)[:n]
+    return words
+
+
+def usage(messages, words):
+    prompt = sum(len(str(m.get("content", "")).split()) for m in messages)
+    return {"prompt_tokens": prompt, "completion_tokens": len(words), "total_tokens": prompt + len(words)}
+
+
+@app.post("/v1/chat/completions")
+async def completions(request: Request):
+    body = await request.json()
+    messages = body.get("messages") or []
+    model = body.get("model", "fake")
+    counters["requests"] += 1
+
+    if random.random() < config.hang_rate:
+        counters["hangs"] += 1
+        await asyncio.sleep(config.hang_seconds)
+    if random.random() < config.error_rate:
+        counters["errors"] += 1
+        headers = {"Retry-After": "1"} if config.error_status == 429 else None
+        return JSONResponse(
+            status_code=config.error_status,
+            content={"error": {"message": "Injected error", "type": "fake_error"}},
+            headers=headers,
+        )
+
+    await asyncio.sleep(config.sample_latency())
+    words = reply_words(messages, config.reply_tokens)
+    completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+    created = int(time.time())
+    per_token = 1 / config.tokens_per_second if config.tokens_per_second > 0 else 0
+
+    if not body.get("stream"):
+        await asyncio.sleep(per_token * len(words))
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": " ".join(words)},
+                "finish_reason": "stop",
+            }],
+            "usage": usage(messages, words),
+        }
+
+    counters["streams"] += 1
+
+    async def chunks():
+        for i, word in enumerate(words):
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": {"content": word if i == 0 else " " + word}, "finish_reason": None}],
+            }
+            yield f"data: {json.dumps(chunk)}\n\n"
+            if per_token:
+                await asyncio.sleep(per_token)
+        final = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": created,
+            "model": model,
+            "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+            "x_groq": {"usage": usage(messages, words)},
+        }
+        yield f"data: {json.dumps(final)}\n\n"
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(chunks(), media_type="text/event-stream")
+
+
+@app.get("/v1/models")
+async def models():
+    return {"object": "list", "data": [{"id": "llama3-70b-8192", "object": "model"}]}
+
+
+@app.get("/fake/config")
+async def get_config():
+    return {"config": config.model_dump(), "counters": counters}
+
+
+@app.post("/fake/config")
+async def set_config(values: Dict[str, Any] = Body(...)):
+    """Меняет параметры без перезапуска, например {"error_rate": 0.2, "latency": "fixed:1500"}."""
+    global config
+    try:
+        # Проверяется конфигурация целиком: при ошибке не применяется ни одно поле
+        config = FakeConfig(**{**config.model_dump(), **values})
+    except ValidationError as e:
+        return JSONResponse(status_code=422, content={"detail": json.loads(e.json(include_url=False))})
+    return {"config": config.model_dump()}
+
+
+if __name__ == "__main__":
+    uvicorn.run("fake_llm:app", host="0.0.0.0", port=int(os.getenv("FAKE_LLM_PORT", "8002")))
@@ -0,0 +1,352 @@
+import datetime
+import os
+import re
+from dataclasses import dataclass, field
+
+
+# Быстрый путь для простых просьб создать событие: «schedule a meeting with Bob tomorrow at 3pm for an hour».
+# Разбор локальный и детерминированный; если уверенность ниже порога, запрос уходит в LLM.
+# Нужен явный глагол создания: «I have a meeting tomorrow at 3pm» — рассказ, а не просьба.
+
+FASTPATH_MIN_CONFIDENCE = float(os.getenv("FASTPATH_MIN_CONFIDENCE", "0.8"))
+DEFAULT_DURATION = datetime.timedelta(hours=1)
+
+WEEKDAYS = {
+    "monday": 0, "mon": 0, "tuesday": 1, "tue": 1, "tues": 1, "wednesday": 2, "wed": 2,
+    "thursday": 3, "thu": 3, "thurs": 3, "friday": 4, "fri": 4, "saturday": 5, "sat": 5,
+    "sunday": 6, "sun": 6,
+}
+MONTHS = {
+    "january": 1, "jan": 1, "february": 2, "feb": 2, "march": 3, "mar": 3, "april": 4, "apr": 4,
+    "may": 5, "june": 6, "jun": 6, "july": 7, "jul": 7, "august": 8, "aug": 8,
+    "september": 9, "sep": 9, "sept": 9, "october": 10, "oct": 10, "november": 11, "nov": 11,
+    "december": 12, "dec": 12,
+}
+NUMBER_WORDS = {
+    "a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6,
+    "seven": 7, "eight": 8, "nine": 9, "ten": 10,
+}
+TYPE_KEYWORDS = (
+    (re.compile(r"\b(focus|deep work|concentrat\w*)\b", re.I), "focus"),
+    (re.compile(r"\b(tasks?|to-?do|chores?|errands?)\b", re.I), "tasks"),
+    (re.compile(r"\b(goals?|targets?|deadline)\b", re.I), "target"),
+)
+
+_WEEKDAY_ALT = "|".join(sorted(WEEKDAYS, key=len, reverse=True))
+_MONTH_ALT = "|".join(sorted(MONTHS, key=len, reverse=True))
+_NUMBER_ALT = "|".join(sorted(NUMBER_WORDS, key=len, reverse=True))
+_TIME = r"(\d{1,2})(?::(\d{2}))?\s*(am|pm|a\.m\.|p\.m\.)?"
+
+CREATE_RE = re.compile(
+    r"^\s*(?:please\s+)?(?:(?:can|could|would)\s+you\s+(?:please\s+)?)?"
+    r"(?:create|add|schedule|set\s+up|setup|book|plan|put|make|arrange|block|remind\s+me\s+(?:to|about))\b"
+    r"(?:\s+(?:me|in)\b)?(?:\s+(?:an?|the|new|my)\b)*"
+    r"(?:\s+(?:event|entry|calendar\s+event)\b(?:\s+(?:called|named|titled|for|about)\b)?)?",
+    re.I,
+)
+NOT_CREATE_RE = re.compile(
+    r"\b(?:cancel|delete|remove|move|reschedule|postpone|clear|free|don'?t|do\s+not|never)\b", re.I)
+# Повторяющиеся события и время в другом часовом поясе разбор не поддерживает:
+# такие сообщения уходят в LLM, а не превращаются в одно событие с мусором в названии
+RECURRENCE_RE = re.compile(
+    r"\b(?:every|each|daily|weekly|biweekly|bi-weekly|fortnightly|monthly|quarterly|yearly|annually"
+    r"|recurring|recurrent|repeat\w*|weekdays)\b", re.I)
+TIMEZONE_RE = re.compile(
+    r"(?i:\b(?:utc|gmt)\b|\btime\s*zones?\b"
+    r"|\b(?:local|my|your|his|her|their|our|eastern|western|central|pacific|mountain)\s+time\b)"
+    r"|\b[A-Z][a-z]+\s+time\b"  # «Moscow time», «London time»
+    r"|\b(?:EST|EDT|CST|CDT|MST|MDT|PST|PDT|CET|CEST|EET|EEST|BST|IST|MSK|JST|AEST|AEDT)\b")
+
+DATE_PATTERNS = (
+    ("relative", re.compile(r"\b(?:the\s+)?day\s+after\s+tomorrow\b", re.I)),
+    ("tomorrow", re.compile(r"\btomorrow\b", re.I)),
+    ("today", re.compile(r"\b(?:today|tonight|this\s+evening|this\s+afternoon|this\s+morning)\b", re.I)),
+    ("in_days", re.compile(rf"\bin\s+(\d+|{_NUMBER_ALT})\s+(days?|weeks?)\b", re.I)),
+    ("iso", re.compile(r"\b(?:on\s+)?(\d{4})-(\d{2})-(\d{2})\b", re.I)),
+    ("dotted", re.compile(r"\b(?:on\s+)?(\d{1,2})\.(\d{1,2})(?:\.(\d{4}))?\b", re.I)),
+    ("month_day", re.compile(rf"\b(?:on\s+)?({_MONTH_ALT})\.?\s+(\d{{1,2}})(?:st|nd|rd|th)?(?:,?\s+(\d{{4}}))?\b", re.I)),
+    ("day_month", re.compile(rf"\b(?:on\s+)?(?:the\s+)?(\d{{1,2}})(?:st|nd|rd|th)?\s+(?:of\s+)?({_MONTH_ALT})\.?(?:,?\s+(\d{{4}}))?\b", re.I)),
+    ("weekday", re.compile(rf"\b(?:on\s+)?(?:(next|this|coming)\s+)?({_WEEKDAY_ALT})\b", re.I)),
+)
+ALL_DAY_RE = re.compile(r"\b(?:all[\s-]day|whole\s+day|full\s+day)\b", re.I)
+RANGE_RE = re.compile(rf"\b(?:from\s+)?{_TIME}\s*(?:-|–|to|until|till)\s*{_TIME}", re.I)
+AT_TIME_RE = re.compile(rf"\b(?:at|@)\s*{_TIME}(?![\w:])", re.I)
+BARE_TIME_RE = re.compile(r"\b(\d{1,2})(?::(\d{2}))?\s*(am|pm|a\.m\.|p\.m\.)(?!\w)|\b(\d{1,2}):(\d{2})\b", re.I)
+NAMED_TIME_RE = re.compile(r"\b(?:at\s+)?(noon|midday|midnight)\b", re.I)
+DURATION_RE = re.compile(
+    rf"\bfor\s+(?:(half\s+an?\s+hour)|(an?\s+hour\s+and\s+a\s+half)|(\d+(?:\.\d+)?|{_NUMBER_ALT})\s*(hours?|hrs?|h|minutes?|mins?|m)\b)",
+    re.I,
+)
+LOCATION_RE = re.compile(
+    r"\b(?:at|in)\s+((?:the\s+)?[A-Z][\w'&-]*(?:\s+(?:[A-Z][\w'&-]*|of|de|and))*)|\b(?:at|in)\s+the\s+([a-z][\w'-]*(?:\s+[a-z][\w'-]*){0,2})\s*$",
+)
+CALENDAR_SUFFIX_RE = re.compile(r"\b(?:to|in|on|into)\s+(?:my|the)\s+calendar\b", re.I)
+FILLER_RE = re.compile(r"^(?:(?:on|at|for|from|to|with|and|please|a|an|the)\b\s*)+|(?:\s*\b(?:on|at|for|from|to|and|please)\b)+\s*$", re.I)
+VAGUE_TITLES = {"it", "this", "that", "something", "one", "event", "events", "them", "an event", "a meeting"}
+# «make it tomorrow», «move that to 5pm»: название ссылается на что-то из диалога, его знает только LLM
+PRONOUN_TITLE_RE = re.compile(
+    r"^(?:it|this|that|these|those|them|one|same|something|anything|everything)\b", re.I)
+
+
+@dataclass
+class ParsedEvent:
+    event: dict
+    confidence: float
+    signals: list = field(default_factory=list)
+
+
+def _number(text):
+    text = text.lower()
+    return float(NUMBER_WORDS[text]) if text in NUMBER_WORDS else float(text)
+
+
+def _to_time(hour, minute, meridiem):
+    """Часы с учётом am/pm; без указания — 1..7 считаются вечером, остальное как есть. Второй элемент — была ли неоднозначность."""
+    hour = int(hour)
+    minute = int(minute or 0)
+    if hour > 23 or minute > 59:
+        return None, False
+    ambiguous = False
+    if meridiem:
+        meridiem = meridiem.lower().replace(".", "")
+        if hour > 12 or hour == 0:
+            return None, False
+        if meridiem == "pm" and hour != 12:
+            hour += 12
+        elif meridiem == "am" and hour == 12:
+            hour = 0
+    elif 1 <= hour <= 7:
+        hour += 12
+        ambiguous = True
+    return datetime.time(hour, minute), ambiguous
+
+
+def _cut(text, match):
+    return text[:match.start()] + " " + text[match.end():]
+
+
+def _parse_date(text, today):
+    for kind, pattern in DATE_PATTERNS:
+        match = pattern.search(text)
+        if not match:
+            continue
+        try:
+            if kind == "relative":
+                date = today + datetime.timedelta(days=2)
+            elif kind == "tomorrow":
+                date = today + datetime.timedelta(days=1)
+            elif kind == "today":
+                date = today
+            elif kind == "in_days":
+                days = _number(match.group(1)) * (7 if match.group(2).lower().startswith("week") else 1)
+                date = today + datetime.timedelta(days=int(days))
+            elif kind == "iso":
+                date = datetime.date(int(match.group(1)), int(match.group(2)), int(match.group(3)))
+            elif kind == "dotted":
+                year = int(match.group(3)) if match.group(3) else today.year
+                date = datetime.date(year, int(match.group(2)), int(match.group(1)))
+                if not match.group(3) and date < today:
+                    date = date.replace(year=year + 1)
+            elif kind in ("month_day", "day_month"):
+                if kind == "month_day":
+                    month, day, year = match.group(1), match.group(2), match.group(3)
+                else:
+                    day, month, year = match.group(1), match.group(2), match.group(3)
+                date = datetime.date(int(year) if year else today.year, MONTHS[month.lower().rstrip(".")], int(day))
+                if not year and date < today:
+                    date = date.replace(year=date.year + 1)
+            else:
+                qualifier = (match.group(1) or "").lower()
+                ahead = (WEEKDAYS[match.group(2).lower()] - today.weekday()) % 7
+                if ahead == 0 and qualifier != "this":
+                    ahead = 7
+                date = today + datetime.timedelta(days=ahead)
+        except (ValueError, KeyError):
+            return None, text
+        return date, _cut(text, match)
+    return None, text
+
+
+def _parse_times(text):
+    """Возвращает (начало, конец или None, неоднозначно, текст без найденного)."""
+    match = RANGE_RE.search(text)
+    if match and (match.group(3) or match.group(6) or match.group(2) or match.group(5)
+                  or match.group(0).lower().lstrip().startswith("from")):
+        start_meridiem = match.group(3) or match.group(6)
+        start, start_ambiguous = _to_time(match.group(1), match.group(2), start_meridiem)
+        end, end_ambiguous = _to_time(match.group(4), match.group(5), match.group(6) or match.group(3))
+        if start and end:
+            # «11-1pm»: если начало с чужим pm оказалось позже конца, начало до полудня
+            if start > end and not match.group(3) and start.hour >= 12:
+                start = start.replace(hour=start.hour - 12)
+            return start, end, start_ambiguous or end_ambiguous, _cut(text, match)
+    for pattern in (AT_TIME_RE, BARE_TIME_RE):
+        match = pattern.search(text)
+        if not match:
+            continue
+        groups = match.groups()
+        if pattern is BARE_TIME_RE and groups[0] is None:
+            groups = (groups[3], groups[4], None)
+        start, ambiguous = _to_time(*groups[:3])
+        if start:
+            return start, None, ambiguous, _cut(text, match)
+    match = NAMED_TIME_RE.search(text)
+    if match:
+        hour = 0 if match.group(1).lower() == "midnight" else 12
+        return datetime.time(hour, 0), None, False, _cut(text, match)
+    return None, None, False, text
+
+
+def _parse_duration(text):
+    match = DURATION_RE.search(text)
+    if not match:
+        return None, text
+    if match.group(1):
+        minutes = 30
+    elif match.group(2):
+        minutes = 90
+    else:
+        amount = _number(match.group(3))
+        minutes = amount if match.group(4).lower().startswith("m") else amount * 60
+    return datetime.timedelta(minutes=minutes), _cut(text, match)
+
+
+def _clean_title(text):
+    text = re.sub(r"\s+", " ", text).strip(" ,.;:!-")
+    previous = None
+    while previous != text:
+        previous = text
+        text = FILLER_RE.sub("", text).strip(" ,.;:!-")
+    return text[:1].upper() + text[1:] if text else ""
+
+
+def parse_event_intent(message, now=None):
+    """
+    Пытается разобрать просьбу создать событие без LLM.
+    Возвращает ParsedEvent с событием в том же JSON-формате, что просит системный промпт,
+    или None, если сообщение не похоже на создание события.
+    """
+    if not message or len(message) > 300:
+        return None
+    now = now or datetime.datetime.now()
+    text = " ".join(message.split())
+
+    verb = CREATE_RE.match(text)
+    if not verb or NOT_CREATE_RE.search(text) or RECURRENCE_RE.search(text) or TIMEZONE_RE.search(text):
+        return None
+
+    text = text[verb.end():]
+    score = 0.4
+    signals = ["verb"]
+
+    text = CALENDAR_SUFFIX_RE.sub(" ", text)
+    all_day_match = ALL_DAY_RE.search(text)
+    if all_day_match:
+        text = _cut(text, all_day_match)
+    date, text = _parse_date(text, now.date())
+    start_time, end_time, ambiguous, text = _parse_times(text)
+    duration, text = _parse_duration(text)
+
+    location = None
+    location_match = LOCATION_RE.search(text)
+    if location_match:
+        location = (location_match.group(1) or location_match.group(2)).strip()
+        if location.lower().startswith("the "):
+            location = location[4:]
+        text = _cut(text, location_match)
+
+    title = _clean_title(text)
+    if not title or title.lower() in VAGUE_TITLES or PRONOUN_TITLE_RE.match(title):
+        return None
+
+    if date:
+        score += 0.2
+        signals.append("date")
+    if start_time or all_day_match:
+        score += 0.25
+        signals.append("time")
+    score += 0.15
+    signals.append("title")
+    if end_time or duration:
+        score += 0.05
+        signals.append("end")
+    if re.search(r"\d", title):
+        score -= 0.3
+        signals.append("leftover_numbers")
+    if len(title.split()) > 8:
+        score -= 0.2
+        signals.append("long_title")
+    if ambiguous:
+        score -= 0.1
+        signals.append("ambiguous_hour")
+
+    date = date or now.date()
+    if all_day_match and not start_time:
+        start = datetime.datetime.combine(date, datetime.time(0, 0))
+        end = datetime.datetime.combine(date, datetime.time(23, 59))
+    elif start_time:
+        start = datetime.datetime.combine(date, start_time)
+        if end_time:
+            end = datetime.datetime.combine(date, end_time)
+            if end <= start:
+                end += datetime.timedelta(days=1)
+        else:
+            end = start + (duration or DEFAULT_DURATION)
+    else:
+        return ParsedEvent(event={}, confidence=0.0, signals=signals)
+
+    event_type = "other"
+    for pattern, name in TYPE_KEYWORDS:
+        if pattern.search(message):
+            event_type = name
+            break
+
+    event = {
+        "title": title,
+        "description": "",
+        "start_time": start.isoformat(timespec="seconds"),
+        "end_time": end.isoformat(timespec="seconds"),
+        "all_day": bool(all_day_match),
+        "location": location or "",
+        "type": event_type,
+    }
+    return ParsedEvent(event=event, confidence=round(max(0.0, min(score, 1.0)), 2), signals=signals)
+
+
+class FastPath:
+    """
+    Счётчики быстрого пути: сколько сообщений обработано локально, а сколько ушло в LLM.
+    Сообщения внутри диалога (есть история) не разбираются: «make it 4pm instead» понятно
+    только вместе с предыдущими репликами.
+    """
+
+    def __init__(self, min_confidence=FASTPATH_MIN_CONFIDENCE, enabled=True):
+        self.min_confidence = min_confidence
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.skipped = 0
+
+    def try_parse(self, message, now=None, history=None):
+        if not self.enabled:
+            return None
+        if history:
+            self.skipped += 1
+            return None
+        parsed = parse_event_intent(message, now)
+        if parsed is not None and parsed.confidence >= self.min_confidence:
+            self.hits += 1
+            return parsed.event
+        self.misses += 1
+        return None
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "min_confidence": self.min_confidence,
+            "hits": self.hits,
+            "misses": self.misses,
+            "skipped_in_conversation": self.skipped,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+        }
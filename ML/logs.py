@@ -0,0 +1,166 @@
+import atexit
+import copy
+import datetime
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+
+
+# Атрибуты самой LogRecord; всё остальное в записи пришло через extra= и попадает в JSON полями
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "taskName"}
+
+
+def truncate(value, max_chars=1000, max_items=20):
+    """Ограничивает размер значения: длинные строки обрезаются, у списков и словарей остаётся начало."""
+    if isinstance(value, str):
+        if len(value) <= max_chars:
+            return value
+        return f"{value[:max_chars]}...(+{len(value) - max_chars} chars)"
+    if isinstance(value, (list, tuple)):
+        items = [truncate(item, max_chars, max_items) for item in value[:max_items]]
+        if len(value) > max_items:
+            items.append(f"...(+{len(value) - max_items} items)")
+        return items
+    if isinstance(value, dict):
+        items = list(value.items())
+        result = {str(k): truncate(v, max_chars, max_items) for k, v in items[:max_items]}
+        if len(items) > max_items:
+            result["..."] = f"+{len(items) - max_items} keys"
+        return result
+    return value
+
+
+class JsonFormatter(logging.Formatter):
+    """Одна запись — одна строка JSON: время, уровень, логгер, сообщение и поля из extra."""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.datetime.fromtimestamp(record.created, tz=datetime.timezone.utc)
+                  .isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Пропускает только долю записей ниже WARNING для указанных логгеров (и их потомков).
+    Предупреждения и ошибки не сэмплируются.
+    """
+
+    def __init__(self, rates):
+        super().__init__()
+        self.rates = rates
+
+    def rate_for(self, name):
+        while name:
+            if name in self.rates:
+                return self.rates[name]
+            name = name.rpartition(".")[0]
+        return 1.0
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rate_for(record.name)
+        return rate >= 1.0 or random.random() < rate
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    Отдаёт запись в очередь и сразу возвращается; форматирование и запись на диск
+    делает фоновый поток QueueListener. При переполнении очереди записи
+    отбрасываются, а не тормозят обработку запросов.
+    """
+
+    def __init__(self, log_queue, max_chars=1000, max_items=20):
+        super().__init__(log_queue)
+        self.max_chars = max_chars
+        self.max_items = max_items
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Всё, что ссылается на изменяемые объекты или стек, фиксируем в потоке запроса
+        record = copy.copy(record)
+        record.msg = truncate(record.getMessage(), self.max_chars)
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        for key, value in list(vars(record).items()):
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                setattr(record, key, truncate(value, self.max_chars, self.max_items))
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def parse_mapping(spec, convert):
+    """'chat=DEBUG,transport=WARNING' -> {'chat': convert('DEBUG'), ...}"""
+    result = {}
+    for part in (spec or "").split(","):
+        name, sep, value = part.strip().partition("=")
+        if sep and name:
+            result[name.strip()] = convert(value.strip())
+    return result
+
+
+def setup_logging(level="INFO", levels="", sampling="", fmt="json", max_chars=1000, queue_size=10000):
+    """
+    Настраивает корневой логгер: QueueHandler в потоке запроса, вывод в stdout из
+    фонового QueueListener. Возвращает запущенный listener (остановить при завершении).
+    levels  — уровни по модулям, 'transport=DEBUG,cache=WARNING';
+    sampling — доли для шумных логгеров, 'chat=0.1'.
+    """
+    log_queue = queue.Queue(maxsize=queue_size)
+    handler = NonBlockingQueueHandler(log_queue, max_chars=max_chars)
+    if sampling:
+        handler.addFilter(SamplingFilter(parse_mapping(sampling, float)))
+
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(JsonFormatter() if fmt == "json" else logging.Formatter(
+        "%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level.upper())
+    for name, module_level in parse_mapping(levels, str.upper).items():
+        logging.getLogger(name).setLevel(module_level)
+    # uvicorn к этому моменту уже поставил свои синхронные обработчики; переводим его логи в очередь
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        logging.getLogger(name).handlers.clear()
+        logging.getLogger(name).propagate = True
+
+    listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
+
+
+def setup_logging_from_env():
+    return setup_logging(
+        level=os.getenv("LOG_LEVEL", "INFO"),
+        levels=os.getenv("LOG_LEVELS", "httpx=WARNING,httpcore=WARNING"),
+        sampling=os.getenv("LOG_SAMPLING", ""),
+        fmt=os.getenv("LOG_FORMAT", "json"),
+        max_chars=int(os.getenv("LOG_MAX_CHARS", "1000")),
+    )
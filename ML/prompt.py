@@ -0,0 +1,186 @@
+import datetime
+import hashlib
+import json
+import logging
+from collections import OrderedDict
+
+from tokens import count_tokens
+
+logger = logging.getLogger(__name__)
+
+
+SYSTEM_PROMPT_TEMPLATE = (
+    "You are a helpful assistant who answers questions about the user's calendar and gives general productivity tips. "
+    "If the user wants to create a calendar event, respond ONLY with a valid JSON object with fields: title, description, start_time, end_time, all_day, location, type. "
+    "Otherwise, answer as usual. "
+    "If user does not setup type use 'other work'"
+    "Only respond based on the provided calendar and general knowledge. "
+    "Today: {today}\n"
+    "Here is the user's calendar:\n\n{calendar_context}"
+)
+
+
+def format_event(event):
+    try:
+        # Проверяем наличие обязательных полей
+        if not isinstance(event, dict):
+            return f"- Invalid event format: {event}"
+
+        # Получаем start_time (может быть в разных форматах)
+        start_field = event.get("start") or event.get("start_time")
+        end_field = event.get("end") or event.get("end_time")
+        summary = event.get("summary") or event.get("title", "Untitled event")
+
+        if not start_field or not end_field:
+            return f"- {summary} (incomplete event data)"
+
+        # Парсим даты
+        start = datetime.datetime.fromisoformat(
+            start_field.replace("Z", "+00:00")).strftime("%B %d, %Y %I:%M %p")
+        end = datetime.datetime.fromisoformat(
+            end_field.replace("Z", "+00:00")).strftime("%I:%M %p")
+        location = event.get("location", "Unknown location") or "Unknown location"
+
+        return f"- {summary} from {start} to {end} at {location}"
+    except Exception as e:
+        logger.warning("Error formatting event: %s", e, extra={"event": event})
+        summary = event.get("summary") or event.get("title", "Unknown event")
+        return f"- {summary} (formatting error)"
+
+
+def event_key(event):
+    """
+    Ключ события для кэша строк: id плюс все поля, которые попадают в строку.
+    Если событие изменилось, ключ меняется вместе с ним.
+    Поля сериализуются в JSON: значения могут быть словарями и списками
+    (например, location от Google), а такой ключ всегда хешируется.
+    """
+    return json.dumps([
+        event.get("id"),
+        event.get("start") or event.get("start_time"),
+        event.get("end") or event.get("end_time"),
+        event.get("summary") or event.get("title"),
+        event.get("location"),
+    ], sort_keys=True, default=str, ensure_ascii=False)
+
+
+def fit_lines(lines, max_tokens=None):
+    """Оставляет первые строки, укладывающиеся в бюджет; возвращает (строки, токены, отброшено)."""
+    if max_tokens is None:
+        return lines, sum(count_tokens(line) + 1 for line in lines), 0
+    kept = []
+    used = 0
+    for line in lines:
+        cost = count_tokens(line) + 1
+        if used + cost > max_tokens:
+            break
+        kept.append(line)
+        used += cost
+    dropped = len(lines) - len(kept)
+    if dropped:
+        kept.append(f"- ... and {dropped} more events not shown")
+    return kept, used, dropped
+
+
+class PromptBuilder:
+    """
+    Инкрементальная сборка системного промпта.
+    Строка каждого события форматируется один раз и берётся из кэша по его ключу,
+    а готовый промпт кэшируется по отпечатку календаря и сегодняшней дате,
+    поэтому неизменившийся календарь между репликами не пересобирается.
+    """
+
+    def __init__(self, max_events=50000, max_prompts=1024):
+        self.max_events = max_events
+        self.max_prompts = max_prompts
+        self._lines = OrderedDict()
+        self._prompts = OrderedDict()
+        self.line_hits = 0
+        self.line_misses = 0
+        self.prompt_hits = 0
+        self.prompt_misses = 0
+
+    @staticmethod
+    def fingerprint(keys):
+        return hashlib.blake2b(repr(keys).encode("utf-8"), digest_size=16).hexdigest()
+
+    def format_line(self, event, key):
+        line = self._lines.get(key)
+        if line is not None:
+            self._lines.move_to_end(key)
+            self.line_hits += 1
+            return line
+        self.line_misses += 1
+        line = format_event(event)
+        self._lines[key] = line
+        if len(self._lines) > self.max_events:
+            self._lines.popitem(last=False)
+        return line
+
+    def calendar_lines(self, calendar_data):
+        lines = []
+        for event in calendar_data or []:
+            if not event:
+                continue
+            if isinstance(event, dict):
+                lines.append(self.format_line(event, event_key(event)))
+            else:
+                lines.append(format_event(event))
+        return lines
+
+    def build(self, calendar_data=None, today=None, max_calendar_tokens=None):
+        return self.build_with_usage(calendar_data, today, max_calendar_tokens)[0]
+
+    def build_with_usage(self, calendar_data=None, today=None, max_calendar_tokens=None):
+        """
+        Возвращает (system message, токены календаря, сколько событий не вошло).
+        Если задан max_calendar_tokens, в промпт попадают события по порядку,
+        пока хватает бюджета.
+        """
+        today = today or datetime.datetime.now().strftime("%B %d, %Y")
+        if not calendar_data:
+            return {"role": "system", "content": SYSTEM_PROMPT_TEMPLATE.format(
+                today=today, calendar_context="No calendar events available")}, 0, 0
+
+        try:
+            keys = [event_key(e) if isinstance(e, dict) else repr(e) for e in calendar_data if e]
+            cache_key = (self.fingerprint(keys), today, max_calendar_tokens)
+            cached = self._prompts.get(cache_key)
+            if cached is not None:
+                self._prompts.move_to_end(cache_key)
+                self.prompt_hits += 1
+                content, calendar_tokens, dropped = cached
+                return {"role": "system", "content": content}, calendar_tokens, dropped
+            self.prompt_misses += 1
+
+            logger.debug("Formatting calendar", extra={"events": len(calendar_data)})
+            lines = self.calendar_lines(calendar_data)
+            lines, calendar_tokens, dropped = fit_lines(lines, max_calendar_tokens)
+            calendar_context = "\n".join(lines)
+        except Exception as e:
+            logger.exception("Error processing calendar data")
+            return {"role": "system", "content": SYSTEM_PROMPT_TEMPLATE.format(
+                today=today, calendar_context="Error loading calendar events")}, 0, 0
+
+        content = SYSTEM_PROMPT_TEMPLATE.format(today=today, calendar_context=calendar_context)
+        self._prompts[cache_key] = (content, calendar_tokens, dropped)
+        if len(self._prompts) > self.max_prompts:
+            self._prompts.popitem(last=False)
+        return {"role": "system", "content": content}, calendar_tokens, dropped
+
+    def stats(self):
+        return {
+            "event_lines": len(self._lines),
+            "line_hits": self.line_hits,
+            "line_misses": self.line_misses,
+            "prompts": len(self._prompts),
+            "prompt_hits": self.prompt_hits,
+            "prompt_misses": self.prompt_misses,
+        }
+
+
+prompt_builder = PromptBuilder()
+
+
+def build_system_prompt(calendar_data=None):
+    return prompt_builder.build(calendar_data)
@@ -0,0 +1,92 @@
+import os
+import time
+from collections import OrderedDict
+
+
+class Conversation:
+    """Состояние диалога на сервере: прошлые сообщения и календарь с его версией."""
+
+    def __init__(self, conversation_id):
+        self.id = conversation_id
+        self.history = []
+        self.calendar = None
+        self.calendar_version = None
+        self.touched_at = time.monotonic()
+
+
+class SessionStore:
+    """
+    Диалоги по conversation_id, чтобы клиент присылал только новое сообщение.
+    LRU с TTL по последнему обращению; история каждого диалога ограничена
+    max_history сообщениями (в промпт всё равно попадает только бюджет токенов).
+    Хранилище в памяти процесса: при нескольких воркерах нужен sticky-роутинг,
+    иначе клиент просто чаще получает запрос на полную пересылку.
+    """
+
+    def __init__(self, max_sessions=10000, ttl=3600, max_history=100, enabled=True):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.max_history = max_history
+        self.enabled = enabled
+        self._sessions = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            max_sessions=int(os.getenv("CONVERSATION_MAX_SESSIONS", "10000")),
+            ttl=int(os.getenv("CONVERSATION_TTL", "3600")),
+            max_history=int(os.getenv("CONVERSATION_MAX_HISTORY", "100")),
+            enabled=os.getenv("CONVERSATION_SESSIONS", "1") != "0",
+        )
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def get(self, conversation_id):
+        session = self._sessions.get(conversation_id)
+        if session is not None and time.monotonic() - session.touched_at > self.ttl:
+            del self._sessions[conversation_id]
+            self.expirations += 1
+            session = None
+        if session is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        session.touched_at = time.monotonic()
+        self._sessions.move_to_end(conversation_id)
+        return session
+
+    def create(self, conversation_id):
+        session = Conversation(conversation_id)
+        self._sessions[conversation_id] = session
+        self._sessions.move_to_end(conversation_id)
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+            self.evictions += 1
+        return session
+
+    def set_history(self, session, history):
+        session.history = list(history[-self.max_history:])
+
+    def append(self, session, *messages):
+        session.history.extend(messages)
+        if len(session.history) > self.max_history:
+            del session.history[:len(session.history) - self.max_history]
+        session.touched_at = time.monotonic()
+
+    def delete(self, conversation_id):
+        return self._sessions.pop(conversation_id, None) is not None
+
+    def stats(self):
+        return {
+            "enabled": self.enabled,
+            "sessions": len(self._sessions),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
@@ -0,0 +1,45 @@
+import asyncio
+
+
+class SingleFlight:
+    """
+    Схлопывание одинаковых одновременных вызовов: пока вызов с ключом выполняется,
+    остальные запросы с тем же ключом ждут его результат вместо повторного обращения к Groq.
+    Результат не сохраняется после завершения — это не кэш.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    @property
+    def in_flight(self):
+        return len(self._calls)
+
+    async def do(self, key, fn):
+        task = self._calls.get(key)
+        if task is None:
+            self.calls += 1
+            # Вызов идёт отдельной задачей: отмена первого запроса (клиент ушёл)
+            # не обрывает ожидание остальных
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda t: self._finish(key, t))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _finish(self, key, task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            # Помечаем исключение полученным, даже если все ожидающие уже отменены
+            task.exception()
+
+    def stats(self):
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "in_flight": self.in_flight,
+        }
@@ -0,0 +1,5 @@
+import os
+
+# chat.py читает настройки при импорте: тестам нужен локальный бэкенд без ключа Groq
+os.environ.setdefault("LLM_BACKEND", "fake")
+os.environ.setdefault("LOG_FORMAT", "text")
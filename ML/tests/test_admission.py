@@ -0,0 +1,141 @@
+import asyncio
+
+import pytest
+
+from admission import AdmissionController, Overloaded, RequestClass
+
+
+def controller(chat_limit=1, voice_limit=1, queue_size=2, deadline=1.0, shared=0):
+    return AdmissionController([
+        RequestClass("chat", limit=chat_limit, queue_size=queue_size, deadline=deadline, priority=1),
+        RequestClass("voice", limit=voice_limit, queue_size=queue_size, deadline=deadline),
+    ], shared=shared)
+
+
+async def test_waiters_are_admitted_in_order_as_slots_free_up():
+    admission = controller()
+    first = await admission.acquire("chat")
+    order = []
+
+    async def waiter(name):
+        admitted_at = await admission.acquire("chat")
+        order.append(name)
+        return admitted_at
+
+    tasks = [asyncio.create_task(waiter("second")), asyncio.create_task(waiter("third"))]
+    await asyncio.sleep(0)
+    assert admission.stats()["chat"]["queued"] == 2
+
+    admission.release("chat", first)
+    second = await tasks[0]
+    admission.release("chat", second)
+    admission.release("chat", await tasks[1])
+
+    assert order == ["second", "third"]
+    assert admission.stats()["chat"]["active"] == 0
+    assert admission.stats()["chat"]["admitted"] == 3
+
+
+async def test_full_queue_is_rejected_with_retry_after():
+    admission = controller(queue_size=1)
+    await admission.acquire("chat")
+    queued = asyncio.create_task(admission.acquire("chat"))
+    await asyncio.sleep(0)
+
+    with pytest.raises(Overloaded) as error:
+        await admission.acquire("chat")
+
+    assert error.value.reason == "queue is full"
+    assert error.value.retry_after >= 1
+    assert admission.stats()["chat"]["rejected_queue_full"] == 1
+    queued.cancel()
+    await asyncio.gather(queued, return_exceptions=True)
+
+
+async def test_deadline_rejects_without_leaking_the_slot():
+    admission = controller(deadline=0.05)
+    admitted_at = await admission.acquire("chat")
+
+    with pytest.raises(Overloaded) as error:
+        await admission.acquire("chat")
+    assert error.value.reason == "queue deadline exceeded"
+
+    admission.release("chat", admitted_at)
+    await admission.acquire("chat")
+    assert admission.stats()["chat"]["active"] == 1
+    assert admission.stats()["chat"]["queued"] == 0
+    assert admission.stats()["chat"]["rejected_deadline"] == 1
+
+
+async def test_cancelled_waiter_does_not_take_a_slot():
+    admission = controller()
+    admitted_at = await admission.acquire("chat")
+    cancelled = asyncio.create_task(admission.acquire("chat"))
+    await asyncio.sleep(0)
+
+    cancelled.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await cancelled
+    admission.release("chat", admitted_at)
+
+    assert admission.stats()["chat"]["active"] == 0
+    assert admission.stats()["chat"]["queued"] == 0
+
+
+async def test_classes_do_not_share_or_block_capacity():
+    admission = controller()
+    await admission.acquire("chat")
+    chat_waiter = asyncio.create_task(admission.acquire("chat"))
+    await asyncio.sleep(0)
+
+    # Очередь чата не задерживает голос, у голоса свой пул
+    voice_admitted = await asyncio.wait_for(admission.acquire("voice"), 0.1)
+    admission.release("voice", voice_admitted)
+
+    assert not chat_waiter.done()
+    assert admission.stats()["voice"]["admitted"] == 1
+    chat_waiter.cancel()
+    await asyncio.gather(chat_waiter, return_exceptions=True)
+
+
+async def test_class_borrows_the_shared_pool_and_returns_it():
+    admission = controller(shared=1)
+    own = await admission.acquire("voice")
+    borrowed = await asyncio.wait_for(admission.acquire("voice"), 0.1)
+    assert admission.stats()["shared"] == {"limit": 1, "active": 1}
+    assert admission.stats()["voice"]["borrowed"] == 1
+
+    admission.release("voice", borrowed)
+    admission.release("voice", own)
+
+    assert admission.stats()["shared"]["active"] == 0
+    assert admission.stats()["voice"]["active"] == 0
+
+
+async def test_chat_waiter_gets_the_shared_slot_before_earlier_voice():
+    admission = controller(shared=1)
+    await admission.acquire("chat")
+    await admission.acquire("voice")
+    borrowed = await admission.acquire("voice")
+
+    voice_waiter = asyncio.create_task(admission.acquire("voice"))
+    await asyncio.sleep(0)
+    chat_waiter = asyncio.create_task(admission.acquire("chat"))
+    await asyncio.sleep(0)
+
+    # Голос встал в очередь раньше, но освободившийся слот общего пула уходит чату
+    admission.release("voice", borrowed)
+    await asyncio.wait_for(chat_waiter, 0.1)
+    assert not voice_waiter.done()
+    assert admission.stats()["chat"]["borrowed"] == 1
+    voice_waiter.cancel()
+    await asyncio.gather(voice_waiter, return_exceptions=True)
+
+
+async def test_disabled_controller_admits_everything():
+    admission = AdmissionController([RequestClass("chat", limit=1, queue_size=0, deadline=0)], enabled=False)
+
+    for _ in range(10):
+        await admission.acquire("chat")
+
+    assert admission.stats()["chat"]["active"] == 0
@@ -0,0 +1,117 @@
+import datetime
+
+import cache
+from cache import InMemoryBackend, ResponseCache, TranscriptionCache, seconds_until_midnight
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def frozen_clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache.time, "monotonic", clock)
+    return clock
+
+
+async def test_entries_expire_after_ttl(monkeypatch):
+    clock = frozen_clock(monkeypatch)
+    backend = InMemoryBackend()
+    await backend.set("key", "value", ttl=10)
+
+    clock.now += 9.9
+    assert await backend.get("key") == "value"
+    clock.now += 0.1
+    assert await backend.get("key") is None
+    assert len(backend) == 0
+
+
+async def test_least_recently_used_entry_is_evicted():
+    backend = InMemoryBackend(max_entries=2)
+    await backend.set("a", "1", ttl=60)
+    await backend.set("b", "2", ttl=60)
+    await backend.get("a")
+    await backend.set("c", "3", ttl=60)
+
+    assert await backend.get("b") is None
+    assert await backend.get("a") == "1"
+    assert await backend.get("c") == "3"
+    assert backend.evictions == 1
+
+
+async def test_overwrite_refreshes_ttl_without_eviction(monkeypatch):
+    clock = frozen_clock(monkeypatch)
+    backend = InMemoryBackend(max_entries=1)
+    await backend.set("key", "old", ttl=10)
+    clock.now += 8
+    await backend.set("key", "new", ttl=10)
+    clock.now += 8
+
+    assert await backend.get("key") == "new"
+    assert backend.evictions == 0
+
+
+def test_response_ttl_ends_at_midnight():
+    assert seconds_until_midnight(datetime.datetime(2025, 6, 16, 23, 59, 0)) == 60
+    assert seconds_until_midnight(datetime.datetime(2025, 6, 16, 0, 0, 0)) == 86400
+
+    response_cache = ResponseCache(InMemoryBackend(), ttl=3600)
+    assert 1 <= response_cache.current_ttl() <= 3600
+
+
+async def test_response_cache_counts_hits_and_misses():
+    response_cache = ResponseCache(InMemoryBackend(), ttl=3600)
+    messages = [{"role": "user", "content": "hi", "name": "me"}]
+    key = response_cache.make_key(messages, "llama3", 0.5)
+
+    assert await response_cache.get(key) is None
+    await response_cache.set(key, "hello")
+    reordered = [{"name": "me", "content": "hi", "role": "user"}]
+    assert await response_cache.get(response_cache.make_key(reordered, "llama3", 0.5)) == "hello"
+    assert response_cache.make_key(messages, "llama3", 0.7) != key
+    assert response_cache.stats()["hits"] == 1
+    assert response_cache.stats()["misses"] == 1
+
+
+async def test_transcription_cache_round_trip_and_disabled_cache():
+    transcription_cache = TranscriptionCache(InMemoryBackend(), ttl=60)
+    key = transcription_cache.make_key(b"audio", "tiny", "en")
+    transcript = {"transcription": "hello", "segments": [{"start": 0.0, "end": 1.0}]}
+
+    await transcription_cache.set(key, transcript)
+
+    assert await transcription_cache.get(key) == transcript
+    assert key != transcription_cache.make_key(b"audio", "base", "en")
+
+    disabled = TranscriptionCache(InMemoryBackend(), ttl=60, enabled=False)
+    await disabled.set(key, transcript)
+    assert await disabled.get(key) is None
+    assert len(disabled.backend) == 0
+
+
+class ServerSideBackend:
+    """Как RedisBackend: записи на сервере, их число процессу неизвестно."""
+
+    evictions = 0
+
+    def __init__(self):
+        self._data = {}
+
+    async def get(self, key):
+        return self._data.get(key)
+
+    async def set(self, key, value, ttl):
+        self._data[key] = value
+
+
+async def test_entries_are_unknown_for_a_server_side_backend():
+    response_cache = ResponseCache(ServerSideBackend(), ttl=60)
+    await response_cache.set("key", "value")
+
+    assert await response_cache.get("key") == "value"
+    assert response_cache.stats()["entries"] is None
+    assert ResponseCache(InMemoryBackend(), ttl=60).stats()["entries"] == 0
@@ -0,0 +1,105 @@
+import json
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+import chat
+import fake_llm
+from admission import AdmissionController, RequestClass
+from cache import InMemoryBackend, ResponseCache
+from fake_llm import FakeConfig
+from sessions import SessionStore
+from timing import parse_server_timing
+from transport import ResilientTransport, RetryPolicy
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    """Chat против fake_llm в том же процессе: без сети, без повторов."""
+    monkeypatch.setattr(fake_llm, "config", FakeConfig(latency="fixed:0", reply_tokens=5))
+    model = chat.Chat("fake", "", "http://fake-llm/v1/chat/completions",
+                      transport=ResilientTransport(retry=RetryPolicy(max_attempts=1)))
+    model._client = httpx.AsyncClient(transport=httpx.ASGITransport(app=fake_llm.app))
+    monkeypatch.setattr(chat, "model", model)
+    monkeypatch.setattr(chat, "response_cache", ResponseCache(InMemoryBackend(), ttl=3600))
+    monkeypatch.setattr(chat, "admission", AdmissionController([
+        RequestClass("chat", limit=1, queue_size=1, deadline=1.0)]))
+    monkeypatch.setattr(chat, "sessions", SessionStore())
+    monkeypatch.setattr(chat.fast_path, "enabled", False)
+    return model
+
+
+def read_events(body):
+    """Разбирает SSE на пары (event, data); событие без имени — None."""
+    events = []
+    for block in body.split("\n\n"):
+        if not block:
+            continue
+        event, data = None, None
+        for line in block.split("\n"):
+            if line.startswith("event: "):
+                event = line[len("event: "):]
+            elif line.startswith("data: "):
+                data = json.loads(line[len("data: "):])
+        events.append((event, data))
+    return events
+
+
+def test_stream_sends_deltas_then_done(llm):
+    response = TestClient(chat.app).post("/chat/stream", json={"message": "hello"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.text.endswith("\n\n")
+    events = read_events(response.text)
+    deltas = [data["delta"] for event, data in events[:-1]]
+    assert all(event is None for event, _ in events[:-1])
+    assert len(deltas) == 5
+
+    event, done = events[-1]
+    assert event == "done"
+    assert done["response"] == "".join(deltas).strip()
+    assert done["usage"]["total"] > 0
+    assert {"queue", "prompt", "upstream"} <= set(parse_server_timing(done["server_timing"]))
+    assert "queue" in parse_server_timing(response.headers["Server-Timing"])
+
+
+def test_upstream_error_becomes_an_error_event(llm, monkeypatch):
+    monkeypatch.setattr(fake_llm, "config", FakeConfig(latency="fixed:0", error_rate=1, error_status=503))
+
+    response = TestClient(chat.app).post("/chat/stream", json={"message": "hello"})
+
+    assert response.status_code == 200
+    ((event, data),) = read_events(response.text)
+    assert event == "error"
+    assert data["detail"].startswith("ML Service Error")
+    assert chat.admission.stats()["chat"]["active"] == 0
+
+
+def test_cache_hit_is_served_as_a_stream(llm):
+    client = TestClient(chat.app)
+    first = read_events(client.post("/chat/stream", json={"message": "hello"}).text)
+    streams = fake_llm.counters["streams"]
+
+    events = read_events(client.post("/chat/stream", json={"message": "hello"}).text)
+
+    assert fake_llm.counters["streams"] == streams
+    assert events[0] == (None, {"delta": first[-1][1]["response"]})
+    assert events[-1][0] == "done"
+    assert events[-1][1]["response"] == first[-1][1]["response"]
+    assert "upstream" not in parse_server_timing(events[-1][1]["server_timing"])
+
+
+async def test_disconnect_releases_the_admission_slot(llm):
+    response = await chat.chat_stream(chat.ChatRequest(message="hello"))
+    assert chat.admission.stats()["chat"]["active"] == 1
+
+    # Так Starlette закрывает генератор, когда клиент отключился посреди потока
+    first = await response.body_iterator.__anext__()
+    await response.body_iterator.aclose()
+
+    assert json.loads(first[len("data: "):])["delta"]
+    assert chat.admission.stats()["chat"]["active"] == 0
+    # Оборванный ответ не кэшируется
+    assert len(chat.response_cache.backend) == 0
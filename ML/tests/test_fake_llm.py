@@ -0,0 +1,92 @@
+import json
+import statistics
+
+import pytest
+from fastapi.testclient import TestClient
+
+import fake_llm
+from fake_llm import FakeConfig, parse_latency
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(fake_llm, "config", FakeConfig(latency="fixed:0", reply_tokens=3))
+    monkeypatch.setattr(fake_llm, "counters", {"requests": 0, "errors": 0, "hangs": 0, "streams": 0})
+    return TestClient(fake_llm.app)
+
+
+def samples(spec, n=2000):
+    sample = parse_latency(spec)
+    return [sample() for _ in range(n)]
+
+
+def test_parse_latency_distributions():
+    assert samples("fixed:200", 3) == [0.2, 0.2, 0.2]
+
+    uniform = samples("uniform:100:400")
+    assert all(0.1 <= value <= 0.4 for value in uniform)
+
+    normal = samples("normal:300:50")
+    assert abs(statistics.mean(normal) - 0.3) < 0.01
+    assert min(samples("normal:10:100")) == 0.0  # отрицательная задержка обрезается
+
+    lognormal = samples("lognormal:250:0.5")
+    assert abs(statistics.median(lognormal) - 0.25) < 0.02
+    assert max(lognormal) > 2 * statistics.median(lognormal)  # тяжёлый хвост
+
+
+@pytest.mark.parametrize("spec", ["gamma:1:2", "fixed", "uniform:100", "normal:a:b"])
+def test_parse_latency_rejects_bad_specs(spec):
+    with pytest.raises((TypeError, ValueError)):
+        parse_latency(spec)
+
+
+@pytest.mark.parametrize("values", [
+    {"latency": "gamma:1"},
+    {"error_rate": 1.5},
+    {"error_status": 200},
+    {"reply_tokens": -1},
+    {"unknown": 1},
+])
+def test_config_rejects_bad_input_without_applying_it(client, values):
+    response = client.post("/fake/config", json={"reply_tokens": 7, **values})
+
+    assert response.status_code == 422
+    assert client.get("/fake/config").json()["config"]["reply_tokens"] == 3
+
+
+def test_config_applies_valid_values(client):
+    response = client.post("/fake/config", json={"error_rate": 0.2, "latency": "uniform:1:2"})
+
+    assert response.status_code == 200
+    assert fake_llm.config.error_rate == 0.2
+    assert fake_llm.config.latency == "uniform:1:2"
+
+
+@pytest.mark.parametrize("status, retry_after", [(429, "1"), (503, None)])
+def test_injected_error_status(client, status, retry_after):
+    client.post("/fake/config", json={"error_rate": 1, "error_status": status})
+
+    response = client.post("/v1/chat/completions", json={"messages": [{"role": "user", "content": "hi"}]})
+
+    assert response.status_code == status
+    assert response.headers.get("Retry-After") == retry_after
+    assert response.json()["error"]["type"] == "fake_error"
+    assert fake_llm.counters["errors"] == 1
+
+
+def test_stream_chunks_end_with_done(client):
+    response = client.post("/v1/chat/completions", json={
+        "messages": [{"role": "user", "content": "hi"}], "stream": True})
+
+    assert response.status_code == 200
+    assert response.text.endswith("\n\n")
+    lines = [block for block in response.text.split("\n\n") if block]
+    assert all(line.startswith("data: ") for line in lines)
+    assert lines[-1] == "data: [DONE]"
+
+    chunks = [json.loads(line[len("data: "):]) for line in lines[:-1]]
+    deltas = [chunk["choices"][0]["delta"].get("content", "") for chunk in chunks]
+    assert "".join(deltas) == "Fake reply to:"
+    assert chunks[-1]["choices"][0]["finish_reason"] == "stop"
+    assert chunks[-1]["x_groq"]["usage"]["completion_tokens"] == 3
@@ -0,0 +1,68 @@
+import datetime
+
+import pytest
+
+from bench.intent_eval import DEFAULT_FIXTURES, evaluate
+from intent import FastPath, parse_event_intent
+
+NOW = datetime.datetime(2025, 6, 16, 9, 0)
+
+
+def test_create_request_is_parsed():
+    parsed = parse_event_intent("schedule a meeting with Bob tomorrow at 3pm for an hour", now=NOW)
+
+    assert parsed.confidence == 1.0
+    assert parsed.event["title"] == "Meeting with Bob"
+    assert parsed.event["start_time"] == "2025-06-17T15:00:00"
+    assert parsed.event["end_time"] == "2025-06-17T16:00:00"
+
+
+@pytest.mark.parametrize("message", [
+    "Meeting tomorrow at 3pm got cancelled",
+    "I have a meeting tomorrow at 3pm",
+    "My flight lands tomorrow at 5pm",
+    "lunch with Maria on Wednesday at noon",
+])
+def test_statements_without_create_verb_are_not_parsed(message):
+    assert parse_event_intent(message, now=NOW) is None
+
+
+@pytest.mark.parametrize("message", [
+    "make it tomorrow at 3pm",
+    "schedule that for tomorrow at 2pm",
+    "put this on Monday at 9am",
+    "add tomorrow at 3pm",
+])
+def test_pronoun_and_empty_titles_are_not_parsed(message):
+    assert parse_event_intent(message, now=NOW) is None
+
+
+@pytest.mark.parametrize("message", [
+    "add weekly sync every Monday at 10am",
+    "schedule standup every day at 9am",
+    "book a recurring gym session tomorrow at 7am",
+    "add meeting tomorrow at 3pm in Moscow time",
+    "add demo tomorrow at 3pm UTC",
+    "book a call tomorrow at 4pm Pacific time",
+])
+def test_recurrence_and_timezone_phrases_go_to_llm(message):
+    assert parse_event_intent(message, now=NOW) is None
+
+
+def test_fast_path_skips_messages_in_conversation():
+    fast_path = FastPath(min_confidence=0.8)
+    message = "schedule a call with Anna tomorrow at 4pm"
+    history = [{"role": "assistant", "content": "Would you like me to schedule a call?"}]
+
+    assert fast_path.try_parse(message, now=NOW, history=history) is None
+    assert fast_path.try_parse(message, now=NOW)["title"] == "Call with Anna"
+    assert fast_path.stats()["skipped_in_conversation"] == 1
+    assert fast_path.stats()["hits"] == 1
+
+
+def test_bench_fixtures_have_no_false_positives():
+    result = evaluate(DEFAULT_FIXTURES, min_confidence=0.8)
+
+    assert result["false_positives"] == 0
+    assert result["accuracy"] == 1.0
+    assert result["fast_path_hits"] > 0
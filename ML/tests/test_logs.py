@@ -0,0 +1,91 @@
+import json
+import logging
+import queue
+
+import pytest
+
+import logs
+from logs import JsonFormatter, NonBlockingQueueHandler, SamplingFilter, setup_logging, truncate
+
+
+@pytest.fixture
+def root_logger():
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+    yield root
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    for handler in handlers:
+        root.addHandler(handler)
+    root.setLevel(level)
+
+
+def test_truncate_limits_strings_lists_and_dicts():
+    assert truncate("short", max_chars=10) == "short"
+    assert truncate("x" * 15, max_chars=10) == "x" * 10 + "...(+5 chars)"
+    assert truncate(list(range(5)), max_items=3) == [0, 1, 2, "...(+2 items)"]
+    assert truncate({i: i for i in range(4)}, max_items=2) == {"0": 0, "1": 1, "...": "+2 keys"}
+    assert truncate({"history": ["y" * 20]}, max_chars=4) == {"history": ["yyyy...(+16 chars)"]}
+    assert truncate(42) == 42
+
+
+def test_queued_record_is_frozen_and_formatted_as_json():
+    log_queue = queue.Queue()
+    handler = NonBlockingQueueHandler(log_queue, max_chars=8, max_items=2)
+    logger = logging.getLogger("test_logs.queued")
+    logger.addHandler(handler)
+    logger.propagate = False
+    events = [1, 2, 3]
+    try:
+        logger.warning("reply for %s", "a long user name", extra={"events": events, "status": 503})
+    finally:
+        logger.removeHandler(handler)
+    events.append(4)  # запись уже отвязана от изменяемых объектов запроса
+
+    entry = json.loads(JsonFormatter().format(log_queue.get_nowait()))
+
+    assert entry["level"] == "WARNING"
+    assert entry["logger"] == "test_logs.queued"
+    assert entry["msg"] == "reply fo...(+18 chars)"
+    assert entry["events"] == [1, 2, "...(+1 items)"]
+    assert entry["status"] == 503
+
+
+def test_full_queue_drops_records_instead_of_blocking():
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=1))
+    record = logging.LogRecord("test", logging.INFO, __file__, 1, "message", None, None)
+
+    handler.emit(record)
+    handler.emit(record)
+
+    assert handler.queue.qsize() == 1
+    assert handler.dropped == 1
+
+
+def test_sampling_keeps_warnings_and_inherits_rates():
+    sampling = SamplingFilter({"chat": 0.0})
+
+    def record(name, level):
+        return logging.LogRecord(name, level, __file__, 1, "message", None, None)
+
+    assert sampling.rate_for("chat.stream") == 0.0
+    assert not sampling.filter(record("chat.stream", logging.INFO))
+    assert sampling.filter(record("chat.stream", logging.WARNING))
+    assert sampling.filter(record("transport", logging.INFO))
+
+
+def test_listener_flushes_and_stops_at_exit(root_logger, monkeypatch, capsys):
+    registered = []
+    monkeypatch.setattr(logs.atexit, "register", registered.append)
+
+    listener = setup_logging(level="INFO", levels="noisy=WARNING", fmt="json")
+    logging.getLogger("test_logs.exit").info("bye", extra={"conversation": "c1"})
+    logging.getLogger("noisy").info("hidden")
+
+    assert registered == [listener.stop]
+    registered[0]()
+
+    # После остановки фоновый поток завершён, а очередь выписана до конца
+    assert listener._thread is None
+    lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [(line["msg"], line["conversation"]) for line in lines] == [("bye", "c1")]
@@ -0,0 +1,84 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from metrics import MetricsMiddleware, Registry
+
+
+def test_registry_renders_prometheus_text():
+    registry = Registry()
+    requests = registry.counter("requests_total", "Requests", ["path"])
+    queue = registry.gauge("queue_depth", "Queued requests")
+    requests.inc(path="/chat")
+    requests.inc(2, path='/say "hi"\n')
+    queue.set(1.5)
+    queue.dec(0.5)
+
+    assert registry.render() == (
+        "# HELP requests_total Requests\n"
+        "# TYPE requests_total counter\n"
+        'requests_total{path="/chat"} 1\n'
+        'requests_total{path="/say \\"hi\\"\\n"} 2\n'
+        "# HELP queue_depth Queued requests\n"
+        "# TYPE queue_depth gauge\n"
+        "queue_depth 1\n"
+    )
+
+
+def test_collectors_run_on_every_render():
+    registry = Registry()
+    hits = registry.counter("cache_hits_total", "Cache hits")
+    source = {"hits": 3}
+    registry.collector(lambda: hits.set(source["hits"]))
+
+    assert "cache_hits_total 3\n" in registry.render()
+    source["hits"] = 5
+    assert "cache_hits_total 5\n" in registry.render()
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = Registry()
+    latency = registry.histogram("latency_seconds", "Latency", ["stage"], buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        latency.observe(value, stage="upstream")
+
+    lines = registry.render().splitlines()
+
+    # Граница входит в свою корзину (le — «меньше или равно»), всё большее — в +Inf
+    assert lines[2:] == [
+        'latency_seconds_bucket{stage="upstream",le="0.1"} 2',
+        'latency_seconds_bucket{stage="upstream",le="1"} 3',
+        'latency_seconds_bucket{stage="upstream",le="+Inf"} 4',
+        'latency_seconds_sum{stage="upstream"} 3.65',
+        'latency_seconds_count{stage="upstream"} 4',
+    ]
+
+
+def metered_app(paths):
+    registry = Registry()
+    duration = registry.histogram("request_seconds", "Request duration", ["endpoint", "status"])
+    in_flight = registry.gauge("requests_in_flight", "Requests in flight", ["endpoint"])
+    app = FastAPI()
+
+    @app.get("/ok")
+    async def ok():
+        return {"in_flight": in_flight._values[("/ok",)]}
+
+    @app.get("/missing")
+    async def missing():
+        return {}
+
+    app.add_middleware(MetricsMiddleware, duration=duration, in_flight=in_flight, paths=paths)
+    return TestClient(app), duration, in_flight
+
+
+def test_middleware_labels_endpoint_and_status():
+    client, duration, in_flight = metered_app(["/ok"])
+
+    assert client.get("/ok").json() == {"in_flight": 1}
+    client.get("/unknown/path")
+    client.get("/missing")
+
+    # Пути не из списка сводятся к "other"; статус берётся из ответа
+    assert set(duration._values) == {("/ok", "200"), ("other", "404"), ("other", "200")}
+    assert duration._values[("/ok", "200")][2] == 1
+    assert in_flight._values == {("/ok",): 0, ("other",): 0}
@@ -0,0 +1,64 @@
+from prompt import PromptBuilder, event_key
+
+
+def make_event(**fields):
+    event = {
+        "id": "1",
+        "title": "Standup",
+        "start_time": "2024-05-01T10:00:00Z",
+        "end_time": "2024-05-01T10:15:00Z",
+        "location": "Room 1",
+    }
+    event.update(fields)
+    return event
+
+
+def test_event_key_accepts_unhashable_fields():
+    location = {"displayName": "Room 1", "geo": [55.7, 37.6]}
+    key = event_key(make_event(location=location))
+
+    hash(key)
+    assert key == event_key(make_event(location=dict(reversed(list(location.items())))))
+    assert key != event_key(make_event(location={"displayName": "Room 2"}))
+
+
+def test_event_key_changes_with_rendered_fields():
+    assert event_key(make_event()) == event_key(make_event())
+    assert event_key(make_event()) != event_key(make_event(end_time="2024-05-01T10:30:00Z"))
+
+
+def test_calendar_with_dict_location_is_rendered():
+    builder = PromptBuilder()
+    calendar = [make_event(), make_event(id="2", title="Review", location={"displayName": "HQ"})]
+
+    prompt, calendar_tokens, dropped = builder.build_with_usage(calendar, today="May 01, 2024")
+
+    assert "Standup" in prompt["content"]
+    assert "Review" in prompt["content"]
+    assert "Error loading calendar events" not in prompt["content"]
+    assert calendar_tokens > 0
+    assert dropped == 0
+
+
+def test_unchanged_calendar_is_served_from_cache():
+    builder = PromptBuilder()
+    calendar = [make_event(), make_event(id="2", title="Review")]
+
+    first = builder.build(calendar, today="May 01, 2024")
+    second = builder.build([dict(e) for e in calendar], today="May 01, 2024")
+    builder.build([make_event(), make_event(id="2", title="Retro")], today="May 01, 2024")
+
+    assert first == second
+    assert builder.stats()["prompt_hits"] == 1
+    # Во втором промпте переформатировано только изменившееся событие
+    assert builder.stats()["line_misses"] == 3
+    assert builder.stats()["line_hits"] == 1
+
+
+def test_line_cache_is_bounded():
+    builder = PromptBuilder(max_events=2, max_prompts=1)
+    builder.build([make_event(id=str(i)) for i in range(5)], today="May 01, 2024")
+    builder.build([make_event(id="9")], today="May 01, 2024")
+
+    assert builder.stats()["event_lines"] == 2
+    assert builder.stats()["prompts"] == 1
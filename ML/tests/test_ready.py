@@ -0,0 +1,56 @@
+import asyncio
+import logging
+
+import pytest
+from fastapi.testclient import TestClient
+
+import chat
+from transcriber import TranscriptionEngine
+
+
+@pytest.fixture
+def warmup_enabled(monkeypatch):
+    monkeypatch.setattr(chat, "VOICE_ENABLED", True)
+    monkeypatch.setattr(chat, "WARMUP_ON_STARTUP", True)
+    monkeypatch.setattr(chat, "voice_pipeline", None)
+    monkeypatch.setattr(chat, "warmup", None)
+
+
+def test_failed_warmup_keeps_chat_ready(warmup_enabled, monkeypatch, caplog):
+    async def failing_start(self):
+        self.state = "failed"
+        self.error = "No module named 'torch'"
+        raise ModuleNotFoundError(self.error)
+
+    monkeypatch.setattr(TranscriptionEngine, "_start", failing_start)
+
+    with caplog.at_level(logging.ERROR, logger="chat"), TestClient(chat.app) as client:
+        response = client.get("/ready")
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "degraded"
+    assert response.json()["models"]["whisper"] == "failed"
+    assert response.json()["whisper_error"] == "No module named 'torch'"
+    assert any(record.message == "Whisper warmup failed, voice is degraded" and record.exc_info
+               for record in caplog.records)
+
+
+def test_ready_waits_for_warmup(warmup_enabled, monkeypatch):
+    loaded = asyncio.Event()
+
+    async def slow_start(self):
+        self.state = "loading"
+        await loaded.wait()
+        self.state = "ready"
+
+    monkeypatch.setattr(TranscriptionEngine, "_start", slow_start)
+
+    with TestClient(chat.app) as client:
+        assert client.get("/ready").status_code == 503
+        client.portal.call(loaded.set)
+        for _ in range(50):
+            response = client.get("/ready")
+            if response.status_code == 200:
+                break
+        assert response.json()["status"] == "ready"
+        assert response.json()["models"]["whisper"] == "ready"
@@ -0,0 +1,107 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import chat
+import sessions as sessions_module
+from sessions import SessionStore
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(sessions_module.time, "monotonic", clock)
+    return clock
+
+
+@pytest.fixture
+def client(monkeypatch):
+    prompts = []
+
+    async def fake_complete(messages):
+        prompts.append(messages)
+        return f"reply {len(prompts)}"
+
+    monkeypatch.setattr(chat, "sessions", SessionStore())
+    monkeypatch.setattr(chat, "complete", fake_complete)
+    monkeypatch.setattr(chat.fast_path, "enabled", False)
+    client = TestClient(chat.app)
+    client.prompts = prompts
+    return client
+
+
+def test_session_expires_after_idle_ttl(clock):
+    store = SessionStore(ttl=60)
+    store.create("c1")
+
+    clock.now += 59
+    assert store.get("c1") is not None
+    clock.now += 59
+    assert store.get("c1") is not None  # обращение продлевает TTL
+    clock.now += 61
+    assert store.get("c1") is None
+    assert store.stats()["expirations"] == 1
+
+
+def test_least_recently_used_session_is_evicted_and_history_is_capped():
+    store = SessionStore(max_sessions=2, max_history=3)
+    first = store.create("c1")
+    store.create("c2")
+    store.get("c1")
+    store.create("c3")
+
+    assert store.get("c2") is None
+    assert store.stats()["evictions"] == 1
+
+    store.set_history(first, [{"role": "user", "content": str(i)} for i in range(5)])
+    store.append(first, {"role": "assistant", "content": "5"})
+    assert [m["content"] for m in first.history] == ["3", "4", "5"]
+
+
+def test_unknown_conversation_requires_resync(client):
+    response = client.post("/chat", json={"message": "hello", "conversation_id": "c1"})
+
+    assert response.status_code == 409
+    assert response.json()["detail"] == {"error": "conversation_not_found", "resync": ["history", "calendar"]}
+
+
+def test_resync_restores_the_conversation(client):
+    history = [{"role": "user", "content": "earlier"}, {"role": "llm", "content": "answer"}]
+
+    response = client.post("/chat", json={
+        "message": "hello", "conversation_id": "c1", "history": history,
+        "calendar": [], "calendar_version": "v1",
+    })
+    assert response.status_code == 200
+    assert response.json()["conversation_id"] == "c1"
+
+    # Дальше достаточно нового сообщения: история и календарь берутся из сессии
+    response = client.post("/chat", json={"message": "and now?", "conversation_id": "c1", "calendar_version": "v1"})
+    assert response.status_code == 200
+    contents = [m["content"] for m in client.prompts[-1][1:]]
+    assert contents == ["earlier", "answer", "hello", "reply 1", "and now?"]
+
+
+def test_changed_calendar_version_requires_calendar(client):
+    client.post("/chat", json={
+        "message": "hello", "conversation_id": "c1", "history": [], "calendar": [], "calendar_version": "v1",
+    })
+
+    response = client.post("/chat", json={"message": "again", "conversation_id": "c1", "calendar_version": "v2"})
+
+    assert response.status_code == 409
+    assert response.json()["detail"] == {"error": "calendar_outdated", "resync": ["calendar"]}
+
+
+def test_stream_reports_resync_before_the_stream_starts(client):
+    response = client.post("/chat/stream", json={"message": "hello", "conversation_id": "lost"})
+
+    assert response.status_code == 409
+    assert response.json()["detail"]["error"] == "conversation_not_found"
@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+
+from singleflight import SingleFlight
+
+
+async def test_concurrent_calls_share_one_result():
+    single_flight = SingleFlight()
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return "reply"
+
+    results = await asyncio.gather(*(single_flight.do("key", fetch) for _ in range(5)))
+
+    assert results == ["reply"] * 5
+    assert calls == 1
+    assert single_flight.stats() == {"calls": 1, "coalesced": 4, "in_flight": 0}
+
+
+async def test_result_is_not_cached_after_completion():
+    single_flight = SingleFlight()
+    replies = iter(["first", "second"])
+
+    async def fetch():
+        return next(replies)
+
+    assert await single_flight.do("key", fetch) == "first"
+    assert await single_flight.do("key", fetch) == "second"
+    assert single_flight.stats()["coalesced"] == 0
+
+
+async def test_error_reaches_every_waiter():
+    single_flight = SingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream failed")
+
+    results = await asyncio.gather(
+        *(single_flight.do("key", fetch) for _ in range(3)), return_exceptions=True)
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert single_flight.in_flight == 0
+
+
+async def test_cancelled_caller_does_not_cancel_the_shared_call():
+    single_flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def fetch():
+        await release.wait()
+        return "reply"
+
+    first = asyncio.create_task(single_flight.do("key", fetch))
+    second = asyncio.create_task(single_flight.do("key", fetch))
+    await asyncio.sleep(0)
+
+    first.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await first
+    release.set()
+
+    assert await second == "reply"
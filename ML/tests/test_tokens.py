@@ -0,0 +1,80 @@
+from prompt import PromptBuilder
+from tokens import (
+    MESSAGE_OVERHEAD,
+    TokenBudget,
+    assemble_messages,
+    count_tokens,
+    fit_history,
+    normalize_history,
+    truncate_to_tokens,
+)
+
+
+def test_count_tokens_handles_list_content():
+    parts = [
+        {"type": "text", "text": "Move my meeting"},
+        {"type": "image_url", "image_url": {"url": "https://example.com/a.png"}},
+        {"type": "text", "text": "to Friday"},
+    ]
+
+    assert count_tokens(parts) == count_tokens("Move my meeting\nto Friday")
+    assert count_tokens(None) == 0
+    assert count_tokens(42) == 1
+
+
+def test_normalize_history_flattens_list_content():
+    history = [
+        {"role": "user", "content": [{"type": "text", "text": "hello"}]},
+        {"role": "llm", "content": "hi"},
+        {"role": "user"},
+    ]
+
+    assert normalize_history(history) == [
+        {"role": "user", "content": "hello"},
+        {"role": "assistant", "content": "hi"},
+    ]
+
+
+def test_truncate_keeps_head_or_tail():
+    text = " ".join(f"word{i}" for i in range(100))
+
+    head = truncate_to_tokens(text, 10)
+    tail = truncate_to_tokens(text, 10, keep="tail")
+
+    assert head.startswith("word0") and head.endswith("...")
+    assert tail.startswith("...") and tail.endswith("word99")
+    # Многоточие тоже занимает токены и не выводит за бюджет
+    assert count_tokens(head) <= 10 and count_tokens(tail) <= 10
+    assert truncate_to_tokens(text, 0) == ""
+    assert truncate_to_tokens("short", 10) == "short"
+
+
+def test_fit_history_drops_oldest_first():
+    history = [{"role": "user", "content": f"message number {i}"} for i in range(10)]
+    cost = count_tokens(history[0]["content"]) + MESSAGE_OVERHEAD
+
+    kept, used, dropped = fit_history(history, cost * 3)
+
+    assert kept == history[-3:]
+    assert used == cost * 3
+    assert dropped == 7
+
+
+def test_assemble_messages_stays_within_budget():
+    budget = TokenBudget(context=600, completion_reserve=100, calendar=100, history=200, message=50)
+    calendar = [
+        {"id": str(i), "title": f"Event {i}", "start_time": "2024-05-01T10:00:00Z",
+         "end_time": "2024-05-01T11:00:00Z", "location": "Room"}
+        for i in range(50)
+    ]
+    history = [{"role": "user", "content": [{"type": "text", "text": "earlier message " * 10}]}] * 20
+
+    messages, usage = assemble_messages(PromptBuilder(), calendar, history, "what now? " * 100, budget)
+
+    assert usage["calendar"] <= budget.calendar
+    assert usage["events_dropped"] > 0
+    assert usage["history_dropped"] > 0
+    assert usage["message"] <= budget.message + MESSAGE_OVERHEAD
+    assert usage["total"] <= budget.context - budget.completion_reserve
+    assert usage["total"] == sum(count_tokens(m["content"]) + MESSAGE_OVERHEAD for m in messages)
+    assert all(isinstance(m["content"], str) for m in messages)
@@ -0,0 +1,70 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import transcriber
+from transcriber import TranscriberStopped, TranscriptionEngine
+
+
+def running_engine(workers):
+    # Вместо процессов с Whisper — потоки: проверяется диспетчеризация, а не модель
+    engine = TranscriptionEngine(workers=workers)
+    engine._executor = ThreadPoolExecutor(max_workers=workers)
+    engine.state = "ready"
+    return engine
+
+
+async def test_clips_run_in_parallel_on_all_workers(monkeypatch):
+    def fake_transcribe(audio, language):
+        time.sleep(0.2)
+        return f"{audio}:{language}"
+
+    monkeypatch.setattr(transcriber, "_transcribe", fake_transcribe)
+    engine = running_engine(workers=4)
+
+    started = time.monotonic()
+    texts = await asyncio.gather(*(engine.transcribe(f"clip{i}") for i in range(4)))
+    elapsed = time.monotonic() - started
+
+    assert texts == ["clip0:en", "clip1:en", "clip2:en", "clip3:en"]
+    assert elapsed < 0.6
+    assert engine.stats()["submitted"] == 4
+    assert engine.stats()["in_flight"] == 0
+    await engine.shutdown()
+
+
+async def test_worker_errors_reach_the_caller(monkeypatch):
+    def fake_transcribe(audio, language):
+        raise ValueError("bad audio")
+
+    monkeypatch.setattr(transcriber, "_transcribe", fake_transcribe)
+    engine = running_engine(workers=1)
+
+    with pytest.raises(ValueError, match="bad audio"):
+        await engine.transcribe("clip")
+    await engine.shutdown()
+
+
+async def test_shutdown_fails_pending_clips(monkeypatch):
+    release = threading.Event()
+
+    def fake_transcribe(audio, language):
+        release.wait(5)
+        return audio
+
+    monkeypatch.setattr(transcriber, "_transcribe", fake_transcribe)
+    engine = running_engine(workers=1)
+    tasks = [asyncio.create_task(engine.transcribe(f"clip{i}")) for i in range(3)]
+    await asyncio.sleep(0.05)
+    assert engine.stats()["in_flight"] == 3
+
+    await engine.shutdown()
+    results = await asyncio.wait_for(asyncio.gather(*tasks, return_exceptions=True), 1)
+    release.set()
+
+    assert all(isinstance(result, TranscriberStopped) for result in results)
+    assert engine.stats()["in_flight"] == 0
+    assert engine.state == "not_loaded"
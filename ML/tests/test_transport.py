@@ -0,0 +1,144 @@
+import asyncio
+
+import httpx
+import pytest
+
+import transport
+from transport import CircuitBreaker, CircuitOpenError, ResilientTransport, RetryPolicy, parse_retry_after
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(transport.time, "monotonic", clock)
+    return clock
+
+
+def open_breaker(**kwargs):
+    breaker = CircuitBreaker(window=4, min_calls=4, failure_ratio=0.5, open_seconds=10, **kwargs)
+    for success in (True, False, True, False):
+        breaker.allow()
+        breaker.record(success)
+    return breaker
+
+
+def test_breaker_opens_at_failure_ratio(clock):
+    breaker = CircuitBreaker(window=4, min_calls=4, failure_ratio=0.5, open_seconds=10)
+    for success in (False, False, True):
+        breaker.record(success)
+    assert breaker.state == "closed"  # окно ещё не набрало min_calls
+
+    breaker.record(True)
+    assert breaker.state == "open"
+    assert breaker.opens == 1
+
+    with pytest.raises(CircuitOpenError) as error:
+        breaker.allow()
+    assert error.value.retry_after == 10
+    assert breaker.rejected == 1
+
+
+def test_half_open_lets_one_probe_through(clock):
+    breaker = open_breaker()
+    clock.now += 10
+
+    breaker.allow()
+    assert breaker.state == "half_open"
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+
+    breaker.record(True)
+    assert breaker.state == "closed"
+    breaker.allow()
+
+
+def test_failed_probe_reopens(clock):
+    breaker = open_breaker()
+    clock.now += 10
+    breaker.allow()
+
+    breaker.record(False)
+
+    assert breaker.state == "open"
+    assert breaker.opens == 2
+    assert breaker.retry_after() == 10
+
+
+def test_cancelled_probe_frees_the_probe_slot(clock):
+    breaker = open_breaker()
+    clock.now += 10
+    breaker.allow()
+
+    breaker.release()
+
+    breaker.allow()
+    assert breaker.state == "half_open"
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after("-1") == 0.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+async def test_transport_retries_then_opens_breaker():
+    statuses = iter([503, 200, 503, 503])
+    sent = 0
+
+    async def send():
+        nonlocal sent
+        sent += 1
+        return httpx.Response(next(statuses), headers={"Retry-After": "0"})
+
+    llm = ResilientTransport(
+        retry=RetryPolicy(max_attempts=3, base_delay=0),
+        breaker=CircuitBreaker(window=4, min_calls=4, failure_ratio=0.75, open_seconds=10),
+    )
+
+    assert (await llm.call(send)).status_code == 200
+    assert llm.retries == 1 and llm.retry_after_honored == 1
+
+    # Третья ошибка в окне из четырёх размыкает breaker: следующий повтор отклоняется без отправки
+    with pytest.raises(CircuitOpenError):
+        await llm.call(send)
+    assert sent == 4
+    with pytest.raises(CircuitOpenError):
+        await llm.call(send)
+    assert sent == 4
+    assert llm.stats()["breaker"] == {"state": "open", "opens": 1, "rejected": 2}
+
+
+async def test_cancelled_caller_cancels_the_hedged_attempt():
+    started = asyncio.Event()
+    cancelled = asyncio.Event()
+
+    async def send():
+        started.set()
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    llm = ResilientTransport(hedge=True, hedge_min_delay=30)
+    for _ in range(llm.latency.min_samples):
+        llm.latency.add(0.01)
+
+    call = asyncio.create_task(llm.call(send))
+    await started.wait()
+    call.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await call
+
+    await asyncio.wait_for(cancelled.wait(), 1)
+    assert llm.hedges == 0
@@ -0,0 +1,122 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import transcriber
+import voice
+from audio import SAMPLE_RATE
+from transcriber import TranscriptionEngine
+from vad import VADConfig, detect_speech
+from voice import VoicePipeline
+
+
+def tone(seconds, amplitude=0.3):
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (amplitude * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+
+def silence(seconds, rng=np.random.default_rng(0)):
+    return (0.001 * rng.standard_normal(int(seconds * SAMPLE_RATE))).astype(np.float32)
+
+
+def test_detect_speech_finds_separate_utterances():
+    audio = np.concatenate([silence(1), tone(1), silence(1.5), tone(0.8), silence(1)])
+
+    segments = detect_speech(audio)
+
+    assert len(segments) == 2
+    first, second = segments
+    # Границы с запасом pad_ms, но не захватывают длинную паузу между фразами
+    assert 0.7 <= first.start <= 1.0 and 2.0 <= first.end <= 2.3
+    assert 3.2 <= second.start <= 3.5 and 4.3 <= second.end <= 4.6
+
+
+def test_detect_speech_ignores_clicks_and_short_pauses():
+    audio = np.concatenate([
+        silence(1), tone(0.05), silence(1),          # щелчок короче min_speech_ms
+        tone(1), silence(0.2), tone(1), silence(1),  # пауза короче min_silence_ms
+    ])
+
+    segments = detect_speech(audio)
+
+    assert len(segments) == 1
+    assert 1.8 <= segments[0].start <= 2.1
+    assert segments[0].duration >= 2.2
+
+
+def test_detect_speech_splits_long_speech():
+    audio = np.concatenate([tone(5), silence(0.1), tone(5)])
+
+    segments = detect_speech(audio, VADConfig(max_segment_s=4.0))
+
+    assert len(segments) >= 3
+    assert all(segment.duration <= 4.0 + 1e-6 for segment in segments)
+    assert segments[0].start == 0 and abs(segments[-1].end - len(audio) / SAMPLE_RATE) < 0.05
+
+
+def test_detect_speech_on_silence_and_empty_audio():
+    assert detect_speech(np.zeros(SAMPLE_RATE, dtype=np.float32)) == []
+    assert detect_speech(np.zeros(0, dtype=np.float32)) == []
+
+
+async def test_segments_are_transcribed_in_parallel(monkeypatch):
+    def fake_transcribe(audio, language):
+        time.sleep(0.2)
+        return f"{len(audio) // SAMPLE_RATE}s"
+
+    monkeypatch.setattr(transcriber, "_transcribe", fake_transcribe)
+    engine = TranscriptionEngine(workers=3)
+    engine._executor = ThreadPoolExecutor(max_workers=3)
+    engine.state = "ready"
+    pipeline = VoicePipeline(engine, VADConfig())
+    audio = np.concatenate([tone(1), silence(1), tone(2), silence(1), tone(3)])
+    segments = detect_speech(audio)
+    assert len(segments) == 3
+
+    started = time.monotonic()
+    text = await pipeline.transcribe_speech(audio, segments)
+    elapsed = time.monotonic() - started
+
+    # Сегменты расходятся по воркерам, а текст собирается в порядке записи
+    assert text == "1s 2s 3s"
+    assert elapsed < 0.5
+    await engine.shutdown()
+
+
+class FailingEngine:
+    model_name = "tiny"
+
+    async def transcribe(self, audio, language):
+        raise AssertionError("Whisper must not be called")
+
+
+async def test_no_speech_gives_empty_transcript_without_whisper(monkeypatch):
+    monkeypatch.setattr(voice, "decode_audio", lambda data: silence(3))
+    pipeline = VoicePipeline(FailingEngine(), VADConfig())
+
+    result = await pipeline.transcribe(b"wav")
+
+    assert result["transcription"] == ""
+    assert result["segments"] == []
+    assert result["speech_seconds"] == 0
+
+
+async def test_disabled_vad_transcribes_the_whole_clip(monkeypatch):
+    clip = silence(2)
+    heard = []
+
+    class Engine:
+        async def transcribe(self, audio, language):
+            heard.append(len(audio))
+            return "hello"
+
+    monkeypatch.setattr(voice, "decode_audio", lambda data: clip)
+    pipeline = VoicePipeline(Engine(), VADConfig(enabled=False))
+
+    result = await pipeline.transcribe(b"wav")
+
+    assert result["transcription"] == "hello"
+    assert heard == [len(clip)]
+    assert result["speech_seconds"] == 2
@@ -0,0 +1,38 @@
+import time
+from contextlib import contextmanager
+
+
+class StageTimer:
+    """
+    Время по этапам обработки одного запроса. Отдаётся клиенту в заголовке
+    Server-Timing (prompt;dur=1.4, upstream;dur=312.0), его читает bench/load_test.py.
+    """
+
+    def __init__(self):
+        self.stages = {}
+
+    @contextmanager
+    def stage(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - started
+
+    def header(self):
+        return ", ".join(f"{name};dur={seconds * 1000:.1f}" for name, seconds in self.stages.items())
+
+
+def parse_server_timing(value):
+    """Обратное преобразование: 'prompt;dur=1.4, upstream;dur=312.0' -> {'prompt': 1.4, ...} в мс."""
+    stages = {}
+    for part in (value or "").split(","):
+        name, _, params = part.strip().partition(";")
+        for param in params.split(";"):
+            key, _, dur = param.strip().partition("=")
+            if name and key == "dur":
+                try:
+                    stages[name] = float(dur)
+                except ValueError:
+                    pass
+    return stages
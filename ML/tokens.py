@@ -0,0 +1,160 @@
+import math
+import os
+import re
+from dataclasses import dataclass
+
+
+# Приближение BPE-токенизатора: слово ~ 1 токен на каждые 4 символа, знак препинания = 1 токен.
+# Для llama3 на английском и русском тексте ошибка обычно в пределах 10-15%.
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+CHARS_PER_TOKEN = 4
+MESSAGE_OVERHEAD = 4  # служебные токены роли и разделителей на каждое сообщение
+ELLIPSIS = "..."
+
+
+def content_text(content):
+    """
+    Текст сообщения. Кроме строки content может прийти в OpenAI-формате списком частей
+    [{"type": "text", "text": ...}, {"type": "image_url", ...}]: берутся только текстовые части.
+    """
+    if content is None:
+        return ""
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        parts = []
+        for part in content:
+            if isinstance(part, str):
+                parts.append(part)
+            elif isinstance(part, dict) and isinstance(part.get("text"), str):
+                parts.append(part["text"])
+        return "\n".join(parts)
+    return str(content)
+
+
+def count_tokens(text):
+    text = content_text(text)
+    if not text:
+        return 0
+    total = 0
+    for piece in _TOKEN_RE.findall(text):
+        total += math.ceil(len(piece) / CHARS_PER_TOKEN)
+    return total
+
+
+ELLIPSIS_TOKENS = count_tokens(ELLIPSIS)
+
+
+def truncate_to_tokens(text, max_tokens, keep="head"):
+    """
+    Обрезает текст до max_tokens; keep="tail" оставляет конец вместо начала.
+    Многоточие на месте обрезки входит в бюджет.
+    """
+    text = content_text(text)
+    if max_tokens <= 0:
+        return ""
+    if count_tokens(text) <= max_tokens:
+        return text
+    limit = max_tokens - ELLIPSIS_TOKENS
+    if limit <= 0:
+        return ""
+    pieces = list(_TOKEN_RE.finditer(text))
+    total = 0
+    if keep == "tail":
+        pieces.reverse()
+    for match in pieces:
+        total += math.ceil(len(match.group()) / CHARS_PER_TOKEN)
+        if total > limit:
+            if keep == "tail":
+                return ELLIPSIS + text[match.end():]
+            return text[:match.start()].rstrip() + ELLIPSIS
+    return text
+
+
+@dataclass
+class TokenBudget:
+    context: int = 8192
+    completion_reserve: int = 1024
+    calendar: int = 3000
+    history: int = 2500
+    message: int = 1000
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            context=int(os.getenv("PROMPT_CONTEXT_TOKENS", cls.context)),
+            completion_reserve=int(os.getenv("PROMPT_COMPLETION_RESERVE", cls.completion_reserve)),
+            calendar=int(os.getenv("PROMPT_CALENDAR_TOKENS", cls.calendar)),
+            history=int(os.getenv("PROMPT_HISTORY_TOKENS", cls.history)),
+            message=int(os.getenv("PROMPT_MESSAGE_TOKENS", cls.message)),
+        )
+
+
+def normalize_history(history):
+    messages = []
+    for hist_msg in history or []:
+        if isinstance(hist_msg, dict) and 'role' in hist_msg and 'content' in hist_msg:
+            # Убеждаемся что роль корректная для Groq API
+            role = hist_msg['role']
+            if role == 'llm':
+                role = 'assistant'  # Groq использует 'assistant' вместо 'llm'
+            # Модель принимает только текст: составной content сводится к строке
+            messages.append({"role": role, "content": content_text(hist_msg['content'])})
+    return messages
+
+
+def fit_history(history, max_tokens):
+    """
+    Берёт сообщения с конца, пока они помещаются в бюджет: самые старые отбрасываются первыми.
+    Сообщение на границе бюджета обрезается с начала, если от него остаётся хоть что-то осмысленное.
+    Возвращает (сообщения, токены, отброшено).
+    """
+    kept = []
+    used = 0
+    for msg in reversed(history):
+        cost = count_tokens(msg["content"]) + MESSAGE_OVERHEAD
+        if used + cost <= max_tokens:
+            kept.append(msg)
+            used += cost
+            continue
+        remaining = max_tokens - used - MESSAGE_OVERHEAD
+        if remaining >= 32:
+            content = truncate_to_tokens(msg["content"], remaining, keep="tail")
+            kept.append({"role": msg["role"], "content": content})
+            used += count_tokens(content) + MESSAGE_OVERHEAD
+        break
+    kept.reverse()
+    return kept, used, len(history) - len(kept)
+
+
+def assemble_messages(builder, calendar, history, message, budget):
+    """
+    Собирает список сообщений для LLM в рамках бюджета токенов.
+    Неизрасходованная часть бюджета календаря переходит истории.
+    Возвращает (messages, usage).
+    """
+    message = truncate_to_tokens(message, budget.message)
+    message_tokens = count_tokens(message) + MESSAGE_OVERHEAD
+
+    system_prompt, calendar_tokens, events_dropped = builder.build_with_usage(
+        calendar, max_calendar_tokens=budget.calendar)
+    system_tokens = count_tokens(system_prompt["content"]) + MESSAGE_OVERHEAD
+
+    history_budget = min(
+        budget.history + max(0, budget.calendar - calendar_tokens),
+        budget.context - budget.completion_reserve - system_tokens - message_tokens,
+    )
+    history, history_tokens, history_dropped = fit_history(
+        normalize_history(history), max(0, history_budget))
+
+    messages = [system_prompt, *history, {"role": "user", "content": message}]
+    usage = {
+        "system": system_tokens - calendar_tokens,
+        "calendar": calendar_tokens,
+        "history": history_tokens,
+        "message": message_tokens,
+        "total": system_tokens + history_tokens + message_tokens,
+        "events_dropped": events_dropped,
+        "history_dropped": history_dropped,
+    }
+    return messages, usage
@@ -0,0 +1,141 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from audio import SAMPLE_RATE
+
+logger = logging.getLogger(__name__)
+
+# Модель живёт в процессе-воркере; в основном процессе whisper и torch не импортируются
+_worker_model = None
+
+
+def _init_worker(model_name, threads):
+    global _worker_model
+    import torch
+    import whisper
+
+    # Каждый воркер получает свою долю ядер, чтобы процессы не дрались за один пул потоков
+    torch.set_num_threads(threads)
+    torch.set_num_interop_threads(1)
+    _worker_model = whisper.load_model(model_name)
+
+
+def _ping():
+    return os.getpid()
+
+
+def _transcribe(audio, language):
+    return _worker_model.transcribe(audio, language=language, fp16=False)["text"].strip()
+
+
+class TranscriberStopped(RuntimeError):
+    """Движок остановлен, пока клип ждал воркера или распознавался."""
+
+
+class TranscriptionEngine:
+    """
+    Пул процессов с предзагруженной моделью Whisper.
+    Каждый клип — отдельная задача пула: сегменты одной записи и одновременные запросы
+    распознаются параллельно на всех воркерах, лишние ждут в очереди пула.
+    Пакетное декодирование нескольких клипов за один вызов whisper.transcribe не поддерживает.
+    """
+
+    def __init__(self, model_name="tiny", workers=1, threads_per_worker=1):
+        self.model_name = model_name
+        self.workers = workers
+        self.threads_per_worker = threads_per_worker
+        self._executor = None
+        self._start_lock = asyncio.Lock()
+        self._pending = set()
+        self.state = "not_loaded"  # not_loaded -> loading -> ready | failed
+        self.error = None
+        self.submitted = 0
+
+    @classmethod
+    def from_env(cls):
+        cpus = os.cpu_count() or 1
+        workers = int(os.getenv("WHISPER_WORKERS", max(1, cpus // 2)))
+        return cls(
+            model_name=os.getenv("WHISPER_MODEL", "tiny"),
+            workers=workers,
+            threads_per_worker=int(os.getenv("WHISPER_THREADS_PER_WORKER", max(1, cpus // workers))),
+        )
+
+    async def start(self):
+        async with self._start_lock:
+            if self._executor is None:
+                await self._start()
+
+    async def _start(self):
+        self.state = "loading"
+        self.error = None
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.model_name, self.threads_per_worker),
+        )
+        # Поднимаем все воркеры сразу, чтобы модель загрузилась до первого запроса
+        loop = asyncio.get_running_loop()
+        try:
+            await asyncio.gather(*(loop.run_in_executor(self._executor, _ping) for _ in range(self.workers)))
+        except Exception as e:
+            self.state = "failed"
+            self.error = str(e)
+            await self.shutdown()
+            raise
+        self.state = "ready"
+        logger.info("Transcription engine ready", extra={
+            "workers": self.workers, "threads_per_worker": self.threads_per_worker, "model": self.model_name})
+
+    async def shutdown(self):
+        if self.state == "ready":
+            self.state = "not_loaded"
+        executor, self._executor = self._executor, None
+        # Ожидающие клипы получают ошибку сразу, а не висят до таймаута клиента
+        for future in list(self._pending):
+            if not future.done():
+                future.set_exception(TranscriberStopped("Transcription engine is shutting down"))
+        self._pending.clear()
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    async def transcribe(self, audio, language="en"):
+        if self._executor is None:
+            await self.start()
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        task = self._executor.submit(_transcribe, audio, language)
+        self.submitted += 1
+        self._pending.add(future)
+        task.add_done_callback(lambda done: loop.call_soon_threadsafe(self._resolve, future, done))
+        try:
+            return await future
+        finally:
+            self._pending.discard(future)
+            # Запрос отменён клиентом: клип, ещё не взятый воркером, снимается с очереди пула
+            task.cancel()
+
+    @staticmethod
+    def _resolve(future, task):
+        if future.done():
+            return
+        if task.cancelled():
+            future.set_exception(TranscriberStopped("Transcription was cancelled"))
+        elif task.exception() is not None:
+            future.set_exception(task.exception())
+        else:
+            future.set_result(task.result())
+
+    def stats(self):
+        return {
+            "model": self.model_name,
+            "state": self.state,
+            "workers": self.workers,
+            "threads_per_worker": self.threads_per_worker,
+            "submitted": self.submitted,
+            "in_flight": len(self._pending),
+        }
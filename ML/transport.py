@@ -0,0 +1,287 @@
+import asyncio
+import email.utils
+import logging
+import os
+import random
+import time
+from collections import deque
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Копия этой политики живёт в backend/app/core/llm_transport.py (сервисы не делят код):
+# исправления и значения по умолчанию нужно держать одинаковыми в обоих файлах.
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(Exception):
+    """Провайдер признан недоступным: запрос отклонён без обращения к сети."""
+
+    def __init__(self, retry_after):
+        super().__init__(f"Circuit breaker is open, retry in {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value):
+    """Retry-After в секундах: поддерживаются оба формата заголовка (число и HTTP-дата)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+class RetryPolicy:
+    """Экспоненциальная задержка с полным джиттером; Retry-After от провайдера имеет приоритет."""
+
+    def __init__(self, max_attempts=3, base_delay=0.25, max_delay=4.0, budget=20.0):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = budget  # суммарное время на все попытки, секунды
+
+    def delay(self, attempt, retry_after=None):
+        if retry_after is not None:
+            return retry_after
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+class CircuitBreaker:
+    """
+    Считает долю ошибок в скользящем окне последних вызовов. Если она выше порога,
+    breaker размыкается и запросы сразу отклоняются; после паузы пропускается
+    один пробный запрос, и по его исходу breaker замыкается или снова размыкается.
+    """
+
+    def __init__(self, window=20, min_calls=10, failure_ratio=0.5, open_seconds=15.0):
+        self.window = deque(maxlen=window)
+        self.min_calls = min_calls
+        self.failure_ratio = failure_ratio
+        self.open_seconds = open_seconds
+        self.state = "closed"  # closed -> open -> half_open -> closed | open
+        self.opened_at = 0.0
+        self.opens = 0
+        self.rejected = 0
+        self._probe = False
+
+    def retry_after(self):
+        return max(0.0, self.opened_at + self.open_seconds - time.monotonic())
+
+    def allow(self):
+        if self.state == "open":
+            if self.retry_after() > 0:
+                self.rejected += 1
+                raise CircuitOpenError(self.retry_after())
+            self.state = "half_open"
+            self._probe = False
+        if self.state == "half_open":
+            if self._probe:
+                self.rejected += 1
+                raise CircuitOpenError(self.open_seconds)
+            self._probe = True
+
+    def release(self):
+        """Пробный запрос отменён, не дойдя до результата: следующий снова может стать пробным."""
+        if self.state == "half_open":
+            self._probe = False
+
+    def record(self, success):
+        if self.state == "half_open":
+            self._probe = False
+            if success:
+                self.state = "closed"
+                self.window.clear()
+            else:
+                self._open()
+            return
+        self.window.append(success)
+        failures = self.window.count(False)
+        if len(self.window) >= self.min_calls and failures / len(self.window) >= self.failure_ratio:
+            self._open()
+
+    def _open(self):
+        self.state = "open"
+        self.opened_at = time.monotonic()
+        self.opens += 1
+        self.window.clear()
+
+
+class LatencyTracker:
+    """Последние N длительностей успешных вызовов для оценки p95."""
+
+    def __init__(self, size=200, min_samples=20):
+        self.samples = deque(maxlen=size)
+        self.min_samples = min_samples
+
+    def add(self, seconds):
+        self.samples.append(seconds)
+
+    def percentile(self, p):
+        if len(self.samples) < self.min_samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+
+class ResilientTransport:
+    """
+    Обёртка над отправкой запроса к LLM: повторы с backoff, circuit breaker
+    и (опционально) хеджирование — второй такой же запрос после p95 задержки,
+    берётся тот ответ, что пришёл первым.
+    send — корутинная функция без аргументов, возвращающая httpx.Response.
+    """
+
+    def __init__(self, retry=None, breaker=None, hedge=False, hedge_percentile=0.95, hedge_min_delay=0.5):
+        self.retry = retry or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+        self.latency = LatencyTracker()
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_delay = hedge_min_delay
+        self.attempts = 0
+        self.retries = 0
+        self.retry_after_honored = 0
+        self.failures = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            retry=RetryPolicy(
+                max_attempts=int(os.getenv("LLM_RETRY_ATTEMPTS", "3")),
+                base_delay=float(os.getenv("LLM_RETRY_BASE_DELAY", "0.25")),
+                max_delay=float(os.getenv("LLM_RETRY_MAX_DELAY", "4")),
+                budget=float(os.getenv("LLM_RETRY_BUDGET", "20")),
+            ),
+            breaker=CircuitBreaker(
+                window=int(os.getenv("LLM_BREAKER_WINDOW", "20")),
+                min_calls=int(os.getenv("LLM_BREAKER_MIN_CALLS", "10")),
+                failure_ratio=float(os.getenv("LLM_BREAKER_FAILURE_RATIO", "0.5")),
+                open_seconds=float(os.getenv("LLM_BREAKER_OPEN_SECONDS", "15")),
+            ),
+            hedge=os.getenv("LLM_HEDGE", "0") == "1",
+        )
+
+    @staticmethod
+    def is_failure(response):
+        return response.status_code in RETRY_STATUSES
+
+    async def call(self, send, hedge=None):
+        """
+        Выполняет запрос с повторами. Возвращает последний ответ (в том числе неуспешный —
+        его разбирает вызывающий код) или пробрасывает сетевую ошибку последней попытки.
+        """
+        hedge = self.hedge if hedge is None else hedge
+        deadline = time.monotonic() + self.retry.budget
+        attempt = 0
+        while True:
+            self.breaker.allow()
+            error = None
+            response = None
+            try:
+                response = await (self._hedged(send) if hedge else self._attempt(send))
+            except httpx.TransportError as e:
+                error = e
+            except BaseException:
+                self.breaker.release()
+                raise
+            success = error is None and not self.is_failure(response)
+            self.breaker.record(success)
+            if success:
+                return response
+
+            self.failures += 1
+            attempt += 1
+            retry_after = parse_retry_after(response.headers.get("Retry-After")) if response is not None else None
+            delay = self.retry.delay(attempt - 1, retry_after)
+            if attempt >= self.retry.max_attempts or time.monotonic() + delay > deadline:
+                if error is not None:
+                    raise error
+                return response
+
+            if retry_after is not None:
+                self.retry_after_honored += 1
+            self.retries += 1
+            if response is not None:
+                await response.aclose()
+            logger.info("LLM request failed, retrying", extra={
+                "error": str(error) if error is not None else response.status_code,
+                "attempt": attempt,
+                "delay": round(delay, 3),
+            })
+            await asyncio.sleep(delay)
+
+    async def _attempt(self, send):
+        self.attempts += 1
+        started = time.monotonic()
+        response = await send()
+        if not self.is_failure(response):
+            self.latency.add(time.monotonic() - started)
+        return response
+
+    async def _hedged(self, send):
+        threshold = self.latency.percentile(self.hedge_percentile)
+        first = asyncio.ensure_future(self._attempt(send))
+        if threshold is None:
+            return await first
+        try:
+            done, _ = await asyncio.wait({first}, timeout=max(self.hedge_min_delay, threshold))
+        except asyncio.CancelledError:
+            # asyncio.wait не отменяет ожидаемые задачи: без этого запрос ушёл бы в фон
+            first.cancel()
+            raise
+        if done:
+            return first.result()
+
+        self.hedges += 1
+        second = asyncio.ensure_future(self._attempt(send))
+        tasks = (first, second)
+        winner = None
+        try:
+            # Берём первый удачный ответ; если первым пришла ошибка, ждём второй
+            pending = set(tasks)
+            while pending and winner is None:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if winner is None and task.exception() is None and not self.is_failure(task.result()):
+                        winner = task
+            if winner is None:
+                # Обе попытки неудачны: отдаём ответ, если он есть, иначе ошибку второй
+                winner = next((t for t in tasks if t.exception() is None), second)
+            elif winner is second:
+                self.hedge_wins += 1
+            return winner.result()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+                elif task is not winner and not task.cancelled() and task.exception() is None:
+                    # Ответ проигравшей попытки не нужен, освобождаем соединение
+                    await task.result().aclose()
+
+    def stats(self):
+        p95 = self.latency.percentile(0.95)
+        return {
+            "attempts": self.attempts,
+            "retries": self.retries,
+            "retry_after_honored": self.retry_after_honored,
+            "failures": self.failures,
+            "hedging": self.hedge,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "latency_p95": round(p95, 3) if p95 is not None else None,
+            "breaker": {
+                "state": self.breaker.state,
+                "opens": self.breaker.opens,
+                "rejected": self.breaker.rejected,
+            },
+        }
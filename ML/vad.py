@@ -0,0 +1,119 @@
+import os
+from dataclasses import dataclass
+
+import numpy as np
+
+from audio import SAMPLE_RATE
+
+
+@dataclass
+class VADConfig:
+    enabled: bool = True
+    frame_ms: int = 30
+    min_db: float = -45.0         # тише этого уровня — всегда тишина
+    margin_db: float = 12.0       # насколько речь должна быть громче фонового шума
+    min_speech_ms: int = 200      # более короткие всплески считаются щелчками
+    min_silence_ms: int = 600     # паузы короче этого не разрывают сегмент
+    pad_ms: int = 200             # запас по краям, чтобы не обрезать начало и конец слов
+    max_segment_s: float = 30.0   # длинная речь режется на паузах не длиннее окна Whisper
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            enabled=os.getenv("VAD_ENABLED", "1") != "0",
+            min_db=float(os.getenv("VAD_MIN_DB", cls.min_db)),
+            margin_db=float(os.getenv("VAD_MARGIN_DB", cls.margin_db)),
+            min_silence_ms=int(os.getenv("VAD_MIN_SILENCE_MS", cls.min_silence_ms)),
+            max_segment_s=float(os.getenv("VAD_MAX_SEGMENT_SECONDS", cls.max_segment_s)),
+        )
+
+
+@dataclass
+class Segment:
+    start: float  # секунды от начала записи
+    end: float
+
+    @property
+    def duration(self):
+        return self.end - self.start
+
+    def slice(self, audio, sr=SAMPLE_RATE):
+        return audio[int(self.start * sr):int(self.end * sr)]
+
+    def as_dict(self):
+        return {"start": round(self.start, 3), "end": round(self.end, 3)}
+
+
+def frame_energy_db(audio, frame_len):
+    n_frames = len(audio) // frame_len
+    if n_frames == 0:
+        return np.empty(0, dtype=np.float32)
+    frames = audio[:n_frames * frame_len].reshape(n_frames, frame_len)
+    rms = np.sqrt(np.mean(frames * frames, axis=1) + 1e-12)
+    return 20 * np.log10(rms)
+
+
+def _split_long(start, end, energy, max_frames):
+    """Режет отрезок кадров [start, end) длиннее max_frames в самом тихом кадре второй половины окна."""
+    pieces = []
+    while end - start > max_frames:
+        lo = start + max_frames // 2
+        hi = start + max_frames
+        cut = lo + int(np.argmin(energy[lo:hi]))
+        pieces.append((start, cut))
+        start = cut
+    pieces.append((start, end))
+    return pieces
+
+
+def detect_speech(audio, config=None, sr=SAMPLE_RATE):
+    """
+    Энергетический детектор речи: кадры громче порога (шумовой фон + запас)
+    склеиваются в сегменты, короткие паузы внутри речи игнорируются.
+    Возвращает список Segment, отсортированный по времени.
+    """
+    config = config or VADConfig()
+    frame_len = int(sr * config.frame_ms / 1000)
+    energy = frame_energy_db(audio, frame_len)
+    if energy.size == 0:
+        return []
+
+    noise_floor = float(np.percentile(energy, 10))
+    peak = float(energy.max())
+    threshold = max(config.min_db, min(noise_floor + config.margin_db, peak - 20))
+    speech = energy > threshold
+
+    min_speech = max(1, config.min_speech_ms // config.frame_ms)
+    min_silence = max(1, config.min_silence_ms // config.frame_ms)
+    pad = config.pad_ms // config.frame_ms
+    max_frames = max(1, int(config.max_segment_s * 1000 / config.frame_ms))
+
+    # Границы непрерывных участков речи
+    edges = np.diff(np.concatenate(([0], speech.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+
+    merged = []
+    for start, end in zip(starts, ends):
+        if merged and start - merged[-1][1] < min_silence:
+            merged[-1][1] = end
+        else:
+            merged.append([start, end])
+
+    padded = []
+    n_frames = energy.size
+    for start, end in merged:
+        if end - start < min_speech:
+            continue
+        start = max(0, int(start) - pad)
+        end = min(n_frames, int(end) + pad)
+        if padded and start <= padded[-1][1]:
+            padded[-1][1] = end
+        else:
+            padded.append([start, end])
+
+    segments = []
+    for start, end in padded:
+        for piece_start, piece_end in _split_long(start, end, energy, max_frames):
+            segments.append(Segment(piece_start * frame_len / sr, piece_end * frame_len / sr))
+    return segments
@@ -0,0 +1,72 @@
+import asyncio
+import logging
+
+from starlette.concurrency import run_in_threadpool
+
+from audio import SAMPLE_RATE, decode_audio
+from transcriber import TranscriptionEngine
+from vad import VADConfig, detect_speech
+
+logger = logging.getLogger(__name__)
+
+
+class VoicePipeline:
+    """Декодирование, поиск речи и распознавание загруженного аудио."""
+
+    def __init__(self, engine, vad_config):
+        self.engine = engine
+        self.vad_config = vad_config
+
+    @classmethod
+    def from_env(cls):
+        return cls(TranscriptionEngine.from_env(), VADConfig.from_env())
+
+    @property
+    def model_name(self):
+        return self.engine.model_name
+
+    def prepare(self, data):
+        """Декодирует загрузку и находит в ней участки речи; без VAD сегментов нет (None)."""
+        audio = decode_audio(data)
+        segments = detect_speech(audio, self.vad_config) if self.vad_config.enabled else None
+        return audio, segments
+
+    async def transcribe_speech(self, audio, segments, language='en'):
+        """
+        В Whisper уходят только найденные участки речи; если детектор ничего не нашёл,
+        транскрипт пустой: на тишине и шуме Whisper выдаёт галлюцинации вроде "Thank you."
+        С выключенным VAD (segments is None) распознаётся вся запись.
+        Каждый сегмент — отдельная задача пула, так что сегменты распознаются параллельно.
+        """
+        if segments is None:
+            return await self.engine.transcribe(audio, language=language)
+        if not segments:
+            return ""
+        texts = await asyncio.gather(*(
+            self.engine.transcribe(segment.slice(audio), language=language) for segment in segments
+        ))
+        return " ".join(text for text in texts if text)
+
+    async def transcribe(self, data, language='en'):
+        audio, segments = await run_in_threadpool(self.prepare, data)
+        audio_seconds = len(audio) / SAMPLE_RATE
+        speech_seconds = sum(segment.duration for segment in segments) if segments is not None else audio_seconds
+        logger.info("Voice request", extra={
+            "audio_seconds": round(audio_seconds, 1),
+            "speech_seconds": round(speech_seconds, 1),
+            "segments": len(segments) if segments is not None else None,
+        })
+        # Распознавание идёт в пуле процессов, event loop не блокируется
+        text = await self.transcribe_speech(audio, segments, language)
+        return {
+            "transcription": text,
+            "audio_seconds": round(audio_seconds, 3),
+            "speech_seconds": round(speech_seconds, 3),
+            "segments": [segment.as_dict() for segment in segments or []],
+        }
+
+    async def shutdown(self):
+        await self.engine.shutdown()
+
+    def stats(self):
+        return self.engine.stats()
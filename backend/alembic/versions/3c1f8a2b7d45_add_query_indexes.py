@@ -0,0 +1,52 @@
+"""Add indexes for hot event, reminder and interaction queries
+
+Revision ID: 3c1f8a2b7d45
+Revises: df7e9d27ea9d
+Create Date: 2026-10-17 10:00:00.000000
+
+Индексы строятся через CREATE INDEX CONCURRENTLY: таблицы остаются доступны
+на запись, пока идёт построение. CONCURRENTLY не работает внутри транзакции,
+поэтому команды выполняются в autocommit_block. Если построение прервётся,
+PostgreSQL оставит индекс в состоянии INVALID — его нужно удалить
+(DROP INDEX CONCURRENTLY) и повторить миграцию.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c1f8a2b7d45'
+down_revision: Union[str, None] = 'df7e9d27ea9d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (имя, таблица, колонки) — совпадают с индексами в app/database/models/models.py
+INDEXES = [
+    # EventService.get_events_by_user, get_events_by_date_range
+    ('ix_events_user_id_start_time', 'events', ['user_id', 'start_time']),
+    # ReminderService.get_upcoming_reminders
+    ('ix_reminders_remind_at', 'reminders', ['remind_at']),
+    # ReminderService.get_reminders_by_event, delete_reminders_by_event
+    ('ix_reminders_event_id', 'reminders', ['event_id']),
+    # AI_InteractionService.get_recent_interactions, get_ai_interactions_by_user
+    ('ix_ai_interactions_user_id_created_at', 'ai_interactions', ['user_id', 'created_at']),
+    # User_SettingsService.get_by_user_id
+    ('ix_user_settings_user_id', 'user_settings', ['user_id']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
@@ -0,0 +1,45 @@
+"""Make ai_interactions.created_at NOT NULL and index the intent list
+
+Revision ID: 5d2a7c9e4f18
+Revises: 8e4b2d6f1a93
+Create Date: 2026-10-17 14:00:00.000000
+
+Списки взаимодействий листаются курсором по (created_at, id). Сравнение
+кортежей с NULL не истинно, поэтому строки с пустым created_at выпадали бы
+со страниц без ошибки: такие строки заполняются текущим временем, и колонка
+становится NOT NULL. SET NOT NULL проверяет таблицу под эксклюзивной
+блокировкой.
+
+Индекс (intent, created_at, id) обслуживает список по намерению в том же
+порядке, что и курсор; строится CONCURRENTLY, как в 3c1f8a2b7d45.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d2a7c9e4f18'
+down_revision: Union[str, None] = '8e4b2d6f1a93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('UPDATE ai_interactions SET created_at = now() WHERE created_at IS NULL')
+    op.alter_column('ai_interactions', 'created_at', existing_type=sa.DateTime(timezone=True), nullable=False)
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_ai_interactions_intent_created_at', 'ai_interactions', ['intent', 'created_at', 'id'],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_ai_interactions_intent_created_at', table_name='ai_interactions',
+                      postgresql_concurrently=True)
+    op.alter_column('ai_interactions', 'created_at', existing_type=sa.DateTime(timezone=True), nullable=True)
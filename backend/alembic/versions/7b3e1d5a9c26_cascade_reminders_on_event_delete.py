@@ -0,0 +1,46 @@
+"""Delete reminders together with their event (ON DELETE CASCADE)
+
+Revision ID: 7b3e1d5a9c26
+Revises: 5d2a7c9e4f18
+Create Date: 2026-10-17 15:00:00.000000
+
+Без каскада удаление события с напоминаниями падало на внешнем ключе, а
+пакетное удаление обходило это отдельным DELETE по reminders. Теперь оба пути
+удаляют событие одним запросом, напоминания удаляет база.
+
+Новый ключ создаётся NOT VALID (без проверки существующих строк под
+эксклюзивной блокировкой), транзакция фиксируется, и VALIDATE CONSTRAINT идёт
+отдельно под SHARE UPDATE EXCLUSIVE. В одной транзакции с ADD CONSTRAINT
+эксклюзивная блокировка держалась бы и на время проверки.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b3e1d5a9c26'
+down_revision: Union[str, None] = '5d2a7c9e4f18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _replace_fk(ondelete: Union[str, None]) -> None:
+    op.drop_constraint('reminders_event_id_fkey', 'reminders', type_='foreignkey')
+    op.create_foreign_key(
+        'reminders_event_id_fkey', 'reminders', 'events', ['event_id'], ['id'],
+        ondelete=ondelete, postgresql_not_valid=True,
+    )
+    with op.get_context().autocommit_block():
+        op.execute('ALTER TABLE reminders VALIDATE CONSTRAINT reminders_event_id_fkey')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _replace_fk('CASCADE')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _replace_fk(None)
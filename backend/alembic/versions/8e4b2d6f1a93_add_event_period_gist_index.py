@@ -0,0 +1,51 @@
+"""Add events.period tstzrange column with a GiST index for window queries
+
+Revision ID: 8e4b2d6f1a93
+Revises: 3c1f8a2b7d45
+Create Date: 2026-10-17 12:00:00.000000
+
+Выборка событий за окно (неделя, месяц) ищет пересечение интервалов:
+start_time < конец окна AND end_time > начало окна. B-tree по двум колонкам
+такое условие эффективно не покрывает, поэтому интервал события хранится
+в генерируемой колонке period, а индекс GiST по (user_id, period) находит
+пересечения за один проход по индексу. Для uuid в GiST нужен btree_gist.
+
+Добавление STORED-колонки перезаписывает таблицу events под эксклюзивной
+блокировкой; сам индекс строится CONCURRENTLY.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e4b2d6f1a93'
+down_revision: Union[str, None] = '3c1f8a2b7d45'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+    op.add_column('events', sa.Column(
+        'period',
+        postgresql.TSTZRANGE(),
+        sa.Computed("tstzrange(start_time, greatest(start_time, end_time), '[]')", persisted=True),
+        nullable=True,
+    ))
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_events_user_id_period', 'events', ['user_id', 'period'],
+            postgresql_using='gist', postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Расширение btree_gist не удаляется: им могут пользоваться другие объекты базы
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_events_user_id_period', table_name='events', postgresql_concurrently=True)
+    op.drop_column('events', 'period')
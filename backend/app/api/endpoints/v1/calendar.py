@@ -3,18 +3,21 @@ from fastapi.responses import Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 import httpx
+import logging
 import os
 from typing import Optional, List
 from datetime import datetime
 import uuid
 from fastapi.encoders import jsonable_encoder
 
+from app.core.http_clients import ML_CHAT_TIMEOUT, get_ml_client
 from app.database.session import get_db
 from app.database import models, schemas
 from app.utils.deps import get_current_user
 from app.services.event import EventService
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 ML_SERVICE_URL = os.getenv("ML_SERVICE_URL", "http://localhost:8001/chat")
 
@@ -27,6 +30,7 @@ class ChatRequest(BaseModel):
 
 def serialize_event(event):
     return {
+        "id": str(event.id),
         "summary": event.title,
         "start": event.start_time.isoformat() if event.start_time else "",
         "end": event.end_time.isoformat() if event.end_time else "",
@@ -37,7 +41,8 @@ def serialize_event(event):
 async def interpret_and_create_event(
     request: CalendarInterpretRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    current_user: models.User = Depends(get_current_user),
+    client: httpx.AsyncClient = Depends(get_ml_client)
 ):
 
     result = await db.execute(
@@ -45,20 +50,19 @@ async def interpret_and_create_event(
     )
     events = result.fetchall()
     calendar = [serialize_event(e) for e in [row for row in events]]
-    print("calendar to send:", calendar)
+    logger.debug("Sending calendar to ML service", extra={"user_id": str(current_user.id), "events": len(calendar)})
     payload = {
         "message": request.text,
         "calendar": calendar
     }
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                ML_SERVICE_URL,
-                json=payload,
-                timeout=30.0
-            )
-            response.raise_for_status()
-            ml_response_data = response.json()
+        response = await client.post(
+            ML_SERVICE_URL,
+            json=payload,
+            timeout=ML_CHAT_TIMEOUT
+        )
+        response.raise_for_status()
+        ml_response_data = response.json()
     except httpx.RequestError as e:
         raise HTTPException(status_code=503, detail=f"Could not connect to the ML service: {e}")
     except Exception as e:
@@ -72,8 +76,8 @@ async def get_tasks(
     current_user: models.User = Depends(get_current_user)
 ):
     event_service = EventService(db)
-    events = await event_service.get_events_by_user(uuid.UUID(str(current_user.id)))
-    return events
+    page = await event_service.get_events_by_user(uuid.UUID(str(current_user.id)))
+    return page.items
 
 @router.post("/set_task", response_model=schemas.Event)
 async def set_task(
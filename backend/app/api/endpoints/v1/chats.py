@@ -2,11 +2,13 @@ from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
 from typing import List
 from motor.motor_asyncio import AsyncIOMotorClient
+import logging
 import os 
 
 from app.database import schemas
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 MONGO_URI = os.getenv("MONGO_URL")
 
@@ -17,50 +19,46 @@ collection = db["chat_history"]
 @router.post("/add_message")
 async def add_message(data: schemas.AddMessageRequest):
     try:
-        print(f"Adding message for user {data.user_id}: {data.role} - {data.content[:50]}...")
+        logger.debug("Adding chat message", extra={"user_id": data.user_id, "role": data.role, "chars": len(data.content)})
         chat = await collection.find_one({"user_id": data.user_id})
         message = {
             "role": data.role, 
             "content": data.content
         }
         if chat:
-            print(f"Updating existing chat for user {data.user_id}")
             await collection.update_one(
                 {"user_id": data.user_id},
                 {"$push": {"messages": message}}
             )
         else:
-            print(f"Creating new chat for user {data.user_id}")
+            logger.info("Creating chat history", extra={"user_id": data.user_id})
             await collection.insert_one({
                 "user_id": data.user_id,
                 "messages": [message]
             })
         return {"success": True}
     except Exception as e:
-        print(f"Error adding message for user {data.user_id}: {str(e)}")
+        logger.exception("Error adding chat message", extra={"user_id": data.user_id})
         # Return success to keep chat working even if storage fails
         return {"success": True, "warning": f"Message not stored: {str(e)}"}
 
 @router.get("/get_messages")
 async def get_message(user_id: str= Query(...)):
-    print(f"Getting messages for user {user_id}")
     chat = await collection.find_one({"user_id": user_id})
     if chat:
         messages = chat.get("messages", [])
-        print(f"Found {len(messages)} messages for user {user_id}")
+        logger.debug("Loaded chat history", extra={"user_id": user_id, "messages": len(messages)})
         return messages
     else:
-        print(f"No chat found for user {user_id}")
         return []
 
 @router.delete("/delete_messages")
 async def delete_messages(user_id: str = Query(...)):
     try:
-        print(f"Deleting messages for user {user_id}")
         result = await collection.delete_one({"user_id": user_id})
-        print(f"Deleted {result.deleted_count} chat records for user {user_id}")
+        logger.info("Deleted chat history", extra={"user_id": user_id, "deleted": result.deleted_count})
         return {"success": True, "deleted_count": result.deleted_count}
     except Exception as e:
-        print(f"Error deleting messages for user {user_id}: {str(e)}")
+        logger.exception("Error deleting chat history", extra={"user_id": user_id})
         # Return success even if deletion fails
         return {"success": True, "warning": f"Delete operation failed: {str(e)}"}
\ No newline at end of file
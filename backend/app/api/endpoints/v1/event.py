@@ -1,12 +1,14 @@
-from fastapi import APIRouter, Depends, status, Response
+from fastapi import APIRouter, Depends, Query, status, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
 import uuid
 
+from app.core.config import settings
 from app.services.event import EventService
 from app.database.session import get_db
 from app.database import schemas, models
 from app.utils import deps
+from app.database.pagination import set_next_cursor
 
 router = APIRouter()
 
@@ -22,14 +24,50 @@ async def create_event(
 
 @router.get("/", response_model=List[schemas.Event])
 async def read_events_for_user(
+    response: Response,
     db: AsyncSession = Depends(get_db), 
     current_user: models.User = Depends(deps.get_current_user),
-    skip: int = 0, 
-    limit: int = 100
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=settings.PAGE_MAX_LIMIT),
+    cursor: Optional[str] = None
 ):
-    """Get all events for the current user."""
+    """Get events for the current user. Pass the X-Next-Cursor header value as `cursor` for the next page."""
     event_service = EventService(db)
-    return await event_service.get_events_by_user(user_id=current_user.id, skip=skip, limit=limit)
+    page = await event_service.get_events_by_user(user_id=current_user.id, skip=skip, limit=limit, cursor=cursor)
+    return set_next_cursor(response, page)
+
+# Пакетные маршруты объявлены до /{event_id}, иначе "bulk" разбирался бы как id события
+@router.post("/bulk", response_model=schemas.EventBulkResult)
+async def create_events_bulk(
+    body: schemas.EventBulkCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: models.User = Depends(deps.get_current_user)
+):
+    """Create many events in one transaction. Invalid items are reported in `errors` by index."""
+    event_service = EventService(db)
+    return await event_service.bulk_create(body.events, user_id=current_user.id)
+
+@router.patch("/bulk", response_model=schemas.EventBulkResult)
+async def update_events_bulk(
+    body: schemas.EventBulkUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: models.User = Depends(deps.get_current_user)
+):
+    """Update many events (each item: `id` plus the fields to change) in one transaction."""
+    event_service = EventService(db)
+    return await event_service.bulk_update(body.events, current_user=current_user)
+
+# POST /bulk-delete дублирует DELETE /bulk: тело у DELETE часть прокси и клиентов отбрасывает
+@router.delete("/bulk", response_model=schemas.EventBulkResult)
+@router.post("/bulk-delete", response_model=schemas.EventBulkResult)
+async def delete_events_bulk(
+    body: schemas.EventBulkDelete,
+    db: AsyncSession = Depends(get_db),
+    current_user: models.User = Depends(deps.get_current_user)
+):
+    """Delete many events in one transaction; their reminders are removed by the FK cascade."""
+    event_service = EventService(db)
+    return await event_service.bulk_delete(body.ids, current_user=current_user)
 
 @router.get("/{event_id}", response_model=schemas.Event)
 async def read_event(
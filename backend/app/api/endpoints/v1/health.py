@@ -1,8 +1,24 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 from fastapi.responses import JSONResponse
 
+from app.core.http_clients import http_clients
+from app.core.llm_transport import llm_transport
+from app.database import models
+from app.utils.deps import get_current_user
+
 health_router = APIRouter()
 
 @health_router.get("", tags=["health"])
 def health_check():
-    return JSONResponse(content={"status": "ok"})
\ No newline at end of file
+    return JSONResponse(content={"status": "ok"})
+
+
+@health_router.get("/http", tags=["health"])
+def http_pool_stats(current_user: models.User = Depends(get_current_user)):
+    """
+    Использование пулов общих HTTP-клиентов: запросы в полёте, пик, таймауты ожидания пула;
+    для LLM — ещё повторы, хеджирование и состояние circuit breaker.
+    Внутренняя информация о внешних зависимостях, поэтому только для вошедших пользователей,
+    в отличие от открытой проверки живости выше.
+    """
+    return JSONResponse(content={**http_clients.stats(), "llm_transport": llm_transport.stats()})
@@ -1,40 +1,78 @@
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import Response
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import Response, StreamingResponse
 from fastapi.encoders import jsonable_encoder
 import httpx
 import os
 from typing import Optional, List
 
+from app.core.http_clients import ML_CHAT_TIMEOUT, ML_STREAM_TIMEOUT, get_ml_client
 from app.database import schemas
 
 router = APIRouter()
 
 ML_SERVICE_URL = os.getenv("ML_SERVICE_URL", "http://localhost:8001/chat")
+ML_STREAM_URL = os.getenv("ML_STREAM_URL", f"{ML_SERVICE_URL}/stream")
 
 @router.post("/chat")
 async def chat_with_llm(
     req: schemas.LLM_ChatRequest,
+    client: httpx.AsyncClient = Depends(get_ml_client),
 ):
     payload = {
         "message": req.message,
     }
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                ML_SERVICE_URL,
-                json=payload,
-                timeout=30.0
-            )
-            response.raise_for_status()
-            ml_response_data = response.json()
-
-            llm_chat_response = schemas.LLM_ChatResponse(**ml_response_data)
-
-            return Response(
-                content=jsonable_encoder(llm_chat_response.model_dump()),
-                media_type="application/json"
-            )
+        response = await client.post(
+            ML_SERVICE_URL,
+            json=payload,
+            timeout=ML_CHAT_TIMEOUT
+        )
+        response.raise_for_status()
+        ml_response_data = response.json()
+
+        llm_chat_response = schemas.LLM_ChatResponse(**ml_response_data)
+
+        return Response(
+            content=jsonable_encoder(llm_chat_response.model_dump()),
+            media_type="application/json"
+        )
     except httpx.RequestError as e:
         raise HTTPException(status_code=503, detail=f"Could not connect to the ML service: {e}")
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error getting response from ML service or processing event: {e}") 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error getting response from ML service or processing event: {e}") 
+
+@router.post("/chat/stream")
+async def chat_with_llm_stream(
+    req: schemas.LLM_ChatRequest,
+    client: httpx.AsyncClient = Depends(get_ml_client),
+):
+    """Relay the ML service's SSE stream to the client chunk by chunk, without buffering."""
+    payload = {
+        "message": req.message,
+    }
+    try:
+        upstream = await client.send(
+            client.build_request("POST", ML_STREAM_URL, json=payload, timeout=ML_STREAM_TIMEOUT),
+            stream=True
+        )
+    except httpx.RequestError as e:
+        raise HTTPException(status_code=503, detail=f"Could not connect to the ML service: {e}")
+
+    if upstream.status_code >= 400:
+        detail = (await upstream.aread()).decode(errors="replace")
+        await upstream.aclose()
+        raise HTTPException(status_code=502, detail=f"Error getting response from ML service: {detail}")
+
+    async def relay():
+        try:
+            async for chunk in upstream.aiter_raw():
+                yield chunk
+        finally:
+            # Соединение возвращается в общий пул
+            await upstream.aclose()
+
+    return StreamingResponse(
+        relay(),
+        media_type=upstream.headers.get("content-type", "text/event-stream"),
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
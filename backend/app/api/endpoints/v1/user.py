@@ -1,12 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Response
+from fastapi import APIRouter, Depends, HTTPException, Query, status, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
 import uuid
 
+from app.core.config import settings
 from app.services.user import UserService
 from app.database.session import get_db
 from app.database import schemas, models
 from app.utils import deps
+from app.database.pagination import set_next_cursor
 
 router = APIRouter()
 
@@ -24,10 +26,17 @@ async def create_user(user: schemas.UserCreate, db: AsyncSession = Depends(get_d
     return await user_service.create(user_in=user)
 
 @router.get("/", response_model=List[schemas.User], dependencies=[Depends(deps.get_current_user)])
-async def read_users(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_db)):
-    """Get a list of users. (Protected)"""
+async def read_users(
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=settings.PAGE_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """Get a list of users ordered by email. (Protected) The next page cursor is in X-Next-Cursor."""
     user_service = UserService(db)
-    return await user_service.get_users(skip=skip, limit=limit)
+    page = await user_service.get_users(skip=skip, limit=limit, cursor=cursor)
+    return set_next_cursor(response, page)
 
 @router.get("/{user_id}", response_model=schemas.User, dependencies=[Depends(deps.get_current_user)])
 async def read_user(user_id: uuid.UUID, db: AsyncSession = Depends(get_db)):
@@ -13,6 +13,7 @@ from ..database.schemas import UserCreate
 from app.services.user import UserService
 from .jwt import create_access_token
 from ..core import settings
+from ..core.http_clients import get_google_client
 
 router = APIRouter()
 
@@ -40,7 +41,11 @@ async def google_login(request: Request):
 
 
 @router.get("/google/callback")
-async def google_callback(request: Request, db: AsyncSession = Depends(get_db)):
+async def google_callback(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    client: httpx.AsyncClient = Depends(get_google_client),
+):
     user_info = None
     redirect_to_frontend = None
 
@@ -75,9 +80,8 @@ async def google_callback(request: Request, db: AsyncSession = Depends(get_db)):
             'redirect_uri': settings.GOOGLE_REDIRECT_URI,
             'grant_type': 'authorization_code'
         }
-        async with httpx.AsyncClient() as client:
-            token_response = await client.post(token_url, data=token_data)
-            token_json = token_response.json()
+        token_response = await client.post(token_url, data=token_data)
+        token_json = token_response.json()
         
         access_token = token_json.get('access_token')
         id_token_raw = token_json.get('id_token')
@@ -1,6 +1,6 @@
-from typing import Optional, List
+from typing import Literal, Optional, List
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from pydantic import PostgresDsn, AnyHttpUrl
+from pydantic import PostgresDsn, AnyHttpUrl, model_validator
 import secrets
 
 
@@ -14,7 +14,24 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8
 
     ML_SERVICE_URL: str = "http://ego-ai-ml-service:8001/chat"
+
+    # Максимум элементов в одном запросе /events/bulk
+    MAX_BULK_EVENTS: int = 500
+
+    # Общие HTTP-клиенты к ML-сервису и Google, см. app/core/http_clients.py
+    ML_MAX_CONNECTIONS: int = 100
+    ML_MAX_KEEPALIVE: int = 20
+    ML_TIMEOUT: float = 30.0
+    ML_STREAM_READ_TIMEOUT: float = 60.0
+    GOOGLE_MAX_CONNECTIONS: int = 10
+    GOOGLE_TIMEOUT: float = 10.0
+    HTTP_CONNECT_TIMEOUT: float = 3.0
+    HTTP_POOL_TIMEOUT: float = 5.0
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0
     
+    # Размер страницы в списочных эндпоинтах (limit), см. app/database/pagination.py
+    PAGE_MAX_LIMIT: int = 1000
+
     FRONTEND_URL: str = "http://localhost:3000"
     BACKEND_CORS_ORIGINS: str = "http://localhost:3000"
     
@@ -26,9 +43,45 @@ class Settings(BaseSettings):
     MONGO_URL: Optional[str] = None
 
     GROQ_API_KEY: Optional[str] = None
+    # groq | openai (любой OpenAI-совместимый сервер, в т.ч. ML/fake_llm.py)
+    LLM_BACKEND: Literal["groq", "openai"] = "groq"
+    # Для groq по умолчанию адрес Groq; для openai адрес обязателен, иначе сервис не стартует
+    LLM_API_URL: Optional[str] = None
+    LLM_API_KEY: Optional[str] = None
+    LLM_MODEL: str = "llama3-70b-8192"
+    LLM_TIMEOUT: float = 30.0
+    LLM_MAX_CONNECTIONS: int = 20
+    # Повторы, circuit breaker и хеджирование, см. app/core/llm_transport.py.
+    # Имена и значения по умолчанию совпадают с ML/transport.py: один набор переменных для обоих сервисов
+    LLM_RETRY_ATTEMPTS: int = 3
+    LLM_RETRY_BASE_DELAY: float = 0.25
+    LLM_RETRY_MAX_DELAY: float = 4.0
+    LLM_RETRY_BUDGET: float = 20.0
+    LLM_BREAKER_WINDOW: int = 20
+    LLM_BREAKER_MIN_CALLS: int = 10
+    LLM_BREAKER_FAILURE_RATIO: float = 0.5
+    LLM_BREAKER_OPEN_SECONDS: float = 15.0
+    LLM_HEDGE: bool = False
+
+    # Логи: JSON через очередь и фоновый поток, см. app/core/logging.py
+    LOG_LEVEL: str = "INFO"
+    LOG_LEVELS: str = "sqlalchemy.engine=WARNING,httpx=WARNING,db.session=WARNING"
+    LOG_SAMPLING: str = ""
+    LOG_FORMAT: str = "json"
+    LOG_MAX_CHARS: int = 1000
+    LOG_QUEUE_SIZE: int = 10000
+    SQL_ECHO: bool = False
 
     model_config = SettingsConfigDict(env_file=".env", case_sensitive=True, extra='ignore')
 
+    @model_validator(mode="after")
+    def check_llm_api_url(self) -> "Settings":
+        if not self.LLM_API_URL:
+            if self.LLM_BACKEND == "openai":
+                raise ValueError("LLM_API_URL is required when LLM_BACKEND=openai")
+            self.LLM_API_URL = "https://api.groq.com/openai/v1/chat/completions"
+        return self
+
     @property
     def backend_cors_origins_list(self) -> List[str]:
         origins = []
@@ -0,0 +1,183 @@
+import logging
+import time
+from typing import Any, Dict, Optional
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class _TrackedStream(httpx.AsyncByteStream):
+    """Тело ответа: запрос считается в полёте, пока тело не дочитано и не закрыто."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, on_close):
+        self._stream = stream
+        self._on_close = on_close
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            on_close, self._on_close = self._on_close, None
+            if on_close is not None:
+                on_close()
+
+
+class TrackedTransport(httpx.AsyncBaseTransport):
+    """
+    Транспорт httpx со счётчиками использования пула: сколько запросов в полёте
+    (держат соединение или ждут его), максимум за время жизни, сколько раз не
+    дождались свободного соединения (PoolTimeout) и сколько завершились ошибкой.
+    Пик выше max_connections означает, что запросы стояли в очереди пула.
+    """
+
+    def __init__(self, name: str, limits: httpx.Limits, **kwargs: Any):
+        self.name = name
+        self.limits = limits
+        self._transport = httpx.AsyncHTTPTransport(limits=limits, **kwargs)
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.requests = 0
+        self.errors = 0
+        self.pool_timeouts = 0
+        self.total_seconds = 0.0
+
+    def _release(self, started: float) -> None:
+        self.in_flight -= 1
+        self.total_seconds += time.perf_counter() - started
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+        self.requests += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            response = await self._transport.handle_async_request(request)
+        except httpx.PoolTimeout:
+            self.pool_timeouts += 1
+            self.errors += 1
+            self._release(started)
+            logger.warning("HTTP pool exhausted", extra={"client": self.name, "in_flight": self.in_flight})
+            raise
+        except BaseException:
+            self.errors += 1
+            self._release(started)
+            raise
+        response.stream = _TrackedStream(response.stream, lambda: self._release(started))
+        return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_connections": self.limits.max_connections,
+            "max_keepalive_connections": self.limits.max_keepalive_connections,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "requests": self.requests,
+            "errors": self.errors,
+            "pool_timeouts": self.pool_timeouts,
+            "avg_seconds": round(self.total_seconds / self.requests, 4) if self.requests else 0.0,
+        }
+
+
+class HTTPClients:
+    """
+    Долгоживущие httpx-клиенты приложения: к ML-сервису, к LLM-провайдеру и к Google.
+    Соединения переиспользуются между запросами (keep-alive), вместо нового пула,
+    DNS-запроса и TCP-рукопожатия на каждый запрос. Создаются в lifespan
+    приложения и закрываются при остановке.
+    """
+
+    def __init__(self) -> None:
+        self.ml: Optional[httpx.AsyncClient] = None
+        self.llm: Optional[httpx.AsyncClient] = None
+        self.google: Optional[httpx.AsyncClient] = None
+        self._transports: Dict[str, TrackedTransport] = {}
+
+    def _create(self, name: str, limits: httpx.Limits, timeout: httpx.Timeout) -> httpx.AsyncClient:
+        transport = TrackedTransport(name, limits, retries=1)
+        self._transports[name] = transport
+        return httpx.AsyncClient(transport=transport, timeout=timeout)
+
+    def start(self) -> None:
+        if self.ml is None or self.ml.is_closed:
+            self.ml = self._create(
+                "ml",
+                httpx.Limits(
+                    max_connections=settings.ML_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.ML_MAX_KEEPALIVE,
+                    keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+                ),
+                httpx.Timeout(settings.ML_TIMEOUT, connect=settings.HTTP_CONNECT_TIMEOUT,
+                              pool=settings.HTTP_POOL_TIMEOUT),
+            )
+        if self.llm is None or self.llm.is_closed:
+            self.llm = self._create(
+                "llm",
+                httpx.Limits(
+                    max_connections=settings.LLM_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.LLM_MAX_CONNECTIONS,
+                    keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+                ),
+                httpx.Timeout(settings.LLM_TIMEOUT, connect=settings.HTTP_CONNECT_TIMEOUT,
+                              pool=settings.HTTP_POOL_TIMEOUT),
+            )
+        if self.google is None or self.google.is_closed:
+            self.google = self._create(
+                "google",
+                httpx.Limits(
+                    max_connections=settings.GOOGLE_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.GOOGLE_MAX_CONNECTIONS,
+                    keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+                ),
+                httpx.Timeout(settings.GOOGLE_TIMEOUT, connect=settings.HTTP_CONNECT_TIMEOUT,
+                              pool=settings.HTTP_POOL_TIMEOUT),
+            )
+
+    async def aclose(self) -> None:
+        for client in (self.ml, self.llm, self.google):
+            if client is not None:
+                await client.aclose()
+        self.ml = None
+        self.llm = None
+        self.google = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {name: transport.stats() for name, transport in self._transports.items()}
+
+
+http_clients = HTTPClients()
+
+# Таймауты отдельных маршрутов к ML-сервису
+ML_CHAT_TIMEOUT = httpx.Timeout(settings.ML_TIMEOUT, connect=settings.HTTP_CONNECT_TIMEOUT,
+                                pool=settings.HTTP_POOL_TIMEOUT)
+# Для потока ограничено ожидание очередного куска, а не время всего ответа
+ML_STREAM_TIMEOUT = httpx.Timeout(settings.ML_TIMEOUT, read=settings.ML_STREAM_READ_TIMEOUT,
+                                  connect=settings.HTTP_CONNECT_TIMEOUT, pool=settings.HTTP_POOL_TIMEOUT)
+
+
+def get_ml_client() -> httpx.AsyncClient:
+    # Без lifespan (например, в тестах) клиенты создаются при первом обращении
+    if http_clients.ml is None:
+        http_clients.start()
+    return http_clients.ml
+
+
+def get_llm_client() -> httpx.AsyncClient:
+    if http_clients.llm is None:
+        http_clients.start()
+    return http_clients.llm
+
+
+def get_google_client() -> httpx.AsyncClient:
+    if http_clients.google is None:
+        http_clients.start()
+    return http_clients.google
@@ -1,7 +1,17 @@
+import atexit
+import copy
+import datetime
+import json
 import logging
+import logging.handlers
+import queue
+import random
+import sys
 from logging.handlers import RotatingFileHandler
-import os
 from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from app.core.config import settings
 
 LOG_DIR = Path(__file__).parent.parent.parent / "logs"
 LOG_DIR.mkdir(exist_ok=True)
@@ -9,21 +19,167 @@ LOG_DIR.mkdir(exist_ok=True)
 LOG_FILE = LOG_DIR / "app.log"
 
 LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-formatter = logging.Formatter(LOG_FORMAT)
 
-console_handler = logging.StreamHandler()
-console_handler.setFormatter(formatter)
-console_handler.setLevel(logging.INFO)
+# Атрибуты самой LogRecord; всё остальное пришло через extra= и попадает в JSON отдельными полями
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "taskName"}
 
-file_handler = RotatingFileHandler(
-    LOG_FILE, maxBytes=5 * 1024 * 1024, backupCount=5, encoding='utf-8'
-)
-file_handler.setFormatter(formatter)
-file_handler.setLevel(logging.INFO)
 
-logger = logging.getLogger("ego_ai_app")
-logger.setLevel(logging.INFO)
+def truncate(value: Any, max_chars: int = 1000, max_items: int = 20) -> Any:
+    """Ограничивает размер значения: длинные строки обрезаются, у списков и словарей остаётся начало."""
+    if isinstance(value, str):
+        if len(value) <= max_chars:
+            return value
+        return f"{value[:max_chars]}...(+{len(value) - max_chars} chars)"
+    if isinstance(value, (list, tuple)):
+        items = [truncate(item, max_chars, max_items) for item in value[:max_items]]
+        if len(value) > max_items:
+            items.append(f"...(+{len(value) - max_items} items)")
+        return items
+    if isinstance(value, dict):
+        pairs = list(value.items())
+        result = {str(k): truncate(v, max_chars, max_items) for k, v in pairs[:max_items]}
+        if len(pairs) > max_items:
+            result["..."] = f"+{len(pairs) - max_items} keys"
+        return result
+    return value
+
+
+class JsonFormatter(logging.Formatter):
+    """Одна запись — одна строка JSON: время, уровень, логгер, сообщение и поля из extra."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.datetime.fromtimestamp(record.created, tz=datetime.timezone.utc)
+                  .isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Пропускает только долю записей ниже WARNING для указанных логгеров и их потомков."""
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+
+    def rate_for(self, name: str) -> float:
+        while name:
+            if name in self.rates:
+                return self.rates[name]
+            name = name.rpartition(".")[0]
+        return 1.0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rate_for(record.name)
+        return rate >= 1.0 or random.random() < rate
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    Кладёт запись в очередь и сразу возвращается: форматирование и запись в файл
+    выполняет фоновый поток QueueListener, event loop не ждёт диск.
+    При переполнении очереди записи отбрасываются.
+    """
+
+    def __init__(self, log_queue: queue.Queue, max_chars: int = 1000, max_items: int = 20):
+        super().__init__(log_queue)
+        self.max_chars = max_chars
+        self.max_items = max_items
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Сообщение, стек и поля extra фиксируются в потоке запроса, пока объекты не изменились
+        record = copy.copy(record)
+        record.msg = truncate(record.getMessage(), self.max_chars)
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        for key, value in list(vars(record).items()):
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                setattr(record, key, truncate(value, self.max_chars, self.max_items))
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
 
-if not logger.handlers:
-    logger.addHandler(console_handler)
-    logger.addHandler(file_handler) 
+
+def parse_mapping(spec: str, convert: Callable[[str], Any]) -> Dict[str, Any]:
+    """'app.services=DEBUG,sqlalchemy.engine=WARNING' -> {'app.services': 'DEBUG', ...}"""
+    result = {}
+    for part in (spec or "").split(","):
+        name, sep, value = part.strip().partition("=")
+        if sep and name:
+            result[name.strip()] = convert(value.strip())
+    return result
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def setup_logging() -> logging.handlers.QueueListener:
+    """
+    Настраивает корневой логгер по настройкам LOG_*: QueueHandler в потоке запроса,
+    консоль и файл с ротацией — в фоновом QueueListener. Повторный вызов ничего не делает.
+    """
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    log_queue: queue.Queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+    handler = NonBlockingQueueHandler(log_queue, max_chars=settings.LOG_MAX_CHARS)
+    if settings.LOG_SAMPLING:
+        handler.addFilter(SamplingFilter(parse_mapping(settings.LOG_SAMPLING, float)))
+
+    formatter = JsonFormatter() if settings.LOG_FORMAT == "json" else logging.Formatter(LOG_FORMAT)
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setFormatter(formatter)
+    file_handler = RotatingFileHandler(
+        LOG_FILE, maxBytes=5 * 1024 * 1024, backupCount=5, encoding='utf-8'
+    )
+    file_handler.setFormatter(formatter)
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(settings.LOG_LEVEL.upper())
+    for name, level in parse_mapping(settings.LOG_LEVELS, str.upper).items():
+        logging.getLogger(name).setLevel(level)
+    # uvicorn уже поставил свои синхронные обработчики; его логи тоже идут через очередь
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        logging.getLogger(name).handlers.clear()
+        logging.getLogger(name).propagate = True
+
+    _listener = logging.handlers.QueueListener(
+        log_queue, console_handler, file_handler, respect_handler_level=True
+    )
+    _listener.start()
+    atexit.register(stop_logging)
+    return _listener
+
+
+def stop_logging() -> None:
+    """Дописывает оставшиеся в очереди записи и останавливает фоновый поток."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+logger = logging.getLogger("ego_ai_app")
@@ -4,6 +4,7 @@ from typing import Optional, List
 from datetime import datetime, timedelta
 from ..models.models import AI_Interaction
 from ..schemas.schemas import AI_InteractionCreate
+from app.database.pagination import Page, paginate
 
 async def get_ai_interaction(db: AsyncSession, interaction_id: str) -> Optional[AI_Interaction]:
     result = await db.execute(select(AI_Interaction).where(AI_Interaction.id == interaction_id))
@@ -13,23 +14,25 @@ async def get_ai_interactions_by_user(
     db: AsyncSession, 
     user_id: str, 
     skip: int = 0, 
-    limit: int = 100
-) -> List[AI_Interaction]:
-    result = await db.execute(select(AI_Interaction).where(
-        AI_Interaction.user_id == user_id
-    ).offset(skip).limit(limit))
-    return list(result.scalars().all())
+    limit: int = 100,
+    cursor: Optional[str] = None
+) -> Page:
+    return await paginate(
+        db, select(AI_Interaction).where(AI_Interaction.user_id == user_id),
+        [AI_Interaction.created_at, AI_Interaction.id], limit, cursor=cursor, skip=skip, descending=True,
+    )
 
 async def get_ai_interactions_by_intent(
     db: AsyncSession, 
     intent: str, 
     skip: int = 0, 
-    limit: int = 100
-) -> List[AI_Interaction]:
-    result = await db.execute(select(AI_Interaction).where(
-        AI_Interaction.intent == intent
-    ).offset(skip).limit(limit))
-    return list(result.scalars().all())
+    limit: int = 100,
+    cursor: Optional[str] = None
+) -> Page:
+    return await paginate(
+        db, select(AI_Interaction).where(AI_Interaction.intent == intent),
+        [AI_Interaction.created_at, AI_Interaction.id], limit, cursor=cursor, skip=skip, descending=True,
+    )
 
 async def create_ai_interaction(db: AsyncSession, interaction: AI_InteractionCreate) -> AI_Interaction:
     db_interaction = AI_Interaction(**interaction.dict())
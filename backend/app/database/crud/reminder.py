@@ -1,9 +1,10 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import delete, select
 from typing import Optional, List
 from datetime import datetime
 from ..models.models import Reminder
 from ..schemas.schemas import ReminderCreate, ReminderUpdate
+from app.database.writes import commit_returning, delete_returning, update_returning
 
 async def get_reminder(db: AsyncSession, reminder_id: str) -> Optional[Reminder]:
     result = await db.execute(select(Reminder).where(Reminder.id == reminder_id))
@@ -32,31 +33,20 @@ async def create_reminder(db: AsyncSession, reminder: ReminderCreate) -> Reminde
     return db_reminder
 
 async def update_reminder(db: AsyncSession, reminder_id: str, reminder: ReminderUpdate) -> Optional[Reminder]:
-    db_reminder = await get_reminder(db, reminder_id)
+    db_reminder = await update_returning(db, Reminder, (Reminder.id == reminder_id,), reminder.dict(exclude_unset=True))
     if not db_reminder:
         return None
-    
-    update_data = reminder.dict(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(db_reminder, key, value)
-    
-    await db.commit()
-    await db.refresh(db_reminder)
-    return db_reminder
+    return await commit_returning(db, db_reminder)
 
 async def delete_reminder(db: AsyncSession, reminder_id: str) -> bool:
-    db_reminder = await get_reminder(db, reminder_id)
-    if not db_reminder:
+    if await delete_returning(db, Reminder, (Reminder.id == reminder_id,)) is None:
         return False
-    
-    await db.delete(db_reminder)
     await db.commit()
     return True
 
 async def delete_reminders_by_event(db: AsyncSession, event_id: str) -> bool:
-    result = await db.execute(select(Reminder).where(Reminder.event_id == event_id))
-    reminders = result.scalars().all()
-    for reminder in reminders:
-        await db.delete(reminder)
+    await db.execute(
+        delete(Reminder).where(Reminder.event_id == event_id).execution_options(synchronize_session=False)
+    )
     await db.commit()
     return True 
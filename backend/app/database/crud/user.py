@@ -3,6 +3,8 @@ from sqlalchemy import select
 from typing import Optional, List
 from ..models.models import User
 from ..schemas.schemas import UserCreate, UserUpdate
+from app.database.pagination import Page, paginate
+from app.database.writes import commit_returning, delete_returning, update_returning
 from passlib.context import CryptContext
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -15,9 +17,8 @@ async def get_user_by_email(db: AsyncSession, email: str) -> Optional[User]:
     result = await db.execute(select(User).where(User.email == email))
     return result.scalar_one_or_none()
 
-async def get_users(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[User]:
-    result = await db.execute(select(User).offset(skip).limit(limit))
-    return list(result.scalars().all())
+async def get_users(db: AsyncSession, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> Page:
+    return await paginate(db, select(User), [User.email, User.id], limit, cursor=cursor, skip=skip)
 
 async def create_user(db: AsyncSession, user: UserCreate) -> User:
     hashed_password = pwd_context.hash(user.password)
@@ -32,27 +33,18 @@ async def create_user(db: AsyncSession, user: UserCreate) -> User:
     return db_user
 
 async def update_user(db: AsyncSession, user_id: str, user: UserUpdate) -> Optional[User]:
-    db_user = await get_user(db, user_id)
-    if not db_user:
-        return None
-    
     update_data = user.dict(exclude_unset=True)
     if "password" in update_data:
         update_data["pass_hash"] = pwd_context.hash(update_data.pop("password"))
-    
-    for key, value in update_data.items():
-        setattr(db_user, key, value)
-    
-    await db.commit()
-    await db.refresh(db_user)
-    return db_user
 
-async def delete_user(db: AsyncSession, user_id: str) -> bool:
-    db_user = await get_user(db, user_id)
+    db_user = await update_returning(db, User, (User.id == user_id,), update_data)
     if not db_user:
+        return None
+    return await commit_returning(db, db_user)
+
+async def delete_user(db: AsyncSession, user_id: str) -> bool:
+    if await delete_returning(db, User, (User.id == user_id,)) is None:
         return False
-    
-    await db.delete(db_user)
     await db.commit()
     return True
 
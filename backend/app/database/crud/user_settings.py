@@ -3,6 +3,7 @@ from sqlalchemy import select
 from typing import Optional
 from ..models.models import User_Settings
 from ..schemas.schemas import User_SettingsCreate, User_SettingsUpdate
+from app.database.writes import commit_returning, delete_returning, update_returning
 
 async def get_user_settings(db: AsyncSession, user_id: str) -> Optional[User_Settings]:
     result = await db.execute(select(User_Settings).where(User_Settings.user_id == user_id))
@@ -20,23 +21,14 @@ async def update_user_settings(
     user_id: str, 
     settings: User_SettingsUpdate
 ) -> Optional[User_Settings]:
-    db_settings = await get_user_settings(db, user_id)
+    db_settings = await update_returning(
+        db, User_Settings, (User_Settings.user_id == user_id,), settings.dict(exclude_unset=True))
     if not db_settings:
         return None
-    
-    update_data = settings.dict(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(db_settings, key, value)
-    
-    await db.commit()
-    await db.refresh(db_settings)
-    return db_settings
+    return await commit_returning(db, db_settings)
 
 async def delete_user_settings(db: AsyncSession, user_id: str) -> bool:
-    db_settings = await get_user_settings(db, user_id)
-    if not db_settings:
+    if await delete_returning(db, User_Settings, (User_Settings.user_id == user_id,)) is None:
         return False
-    
-    await db.delete(db_settings)
     await db.commit()
     return True 
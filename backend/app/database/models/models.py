@@ -1,5 +1,5 @@
-from sqlalchemy import Column, String, DateTime, Boolean, ForeignKey, Text, JSON
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, DateTime, Boolean, ForeignKey, Text, JSON, Index, Computed, and_
+from sqlalchemy.dialects.postgresql import UUID, TSTZRANGE
 from sqlalchemy.sql import func
 import uuid
 from ..base import Base
@@ -28,13 +28,41 @@ class Event(Base):
     type = Column(String, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Интервал события для GiST-индекса; greatest() защищает от end_time < start_time,
+    # на которых tstzrange() выдал бы ошибку
+    period = Column(
+        TSTZRANGE,
+        Computed("tstzrange(start_time, greatest(start_time, end_time), '[]')", persisted=True),
+    )
+
+    __table_args__ = (
+        # События пользователя по порядку начала
+        Index("ix_events_user_id_start_time", "user_id", "start_time"),
+        # Окна календаря (неделя, месяц): пересечение интервалов, нужен btree_gist для user_id
+        Index("ix_events_user_id_period", "user_id", "period", postgresql_using="gist"),
+    )
+
+    @classmethod
+    def overlaps(cls, window_start, window_end):
+        """
+        События, пересекающиеся с окном [window_start, window_end): начались до конца окна
+        и закончились после его начала. Условие по period выбирает кандидатов по GiST-индексу,
+        сравнение start_time/end_time уточняет границы.
+        """
+        window = func.tstzrange(window_start, window_end, "[)")
+        return and_(
+            cls.period.op("&&")(window),
+            cls.start_time < window_end,
+            cls.end_time > window_start,
+        )
 
 class Reminder(Base):
     __tablename__ = "reminders"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    event_id = Column(UUID(as_uuid=True), ForeignKey("events.id"), nullable=False)
-    remind_at = Column(DateTime(timezone=True), nullable=False)
+    # Напоминания удаляются вместе с событием на стороне базы
+    event_id = Column(UUID(as_uuid=True), ForeignKey("events.id", ondelete="CASCADE"), nullable=False, index=True)
+    remind_at = Column(DateTime(timezone=True), nullable=False, index=True)
     method = Column(String, nullable=False)  # email, popup
 
 class AI_Interaction(Base):
@@ -46,13 +74,21 @@ class AI_Interaction(Base):
     intent = Column(String)
     entities = Column(JSON)
     response_text = Column(Text, nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Часть ключа курсора (created_at, id): NULL выпал бы из сравнения кортежей
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        # Последние взаимодействия пользователя: фильтр по user_id, сортировка по created_at
+        Index("ix_ai_interactions_user_id_created_at", "user_id", "created_at"),
+        # Список по намерению в порядке курсора
+        Index("ix_ai_interactions_intent_created_at", "intent", "created_at", "id"),
+    )
 
 class User_Settings(Base):
     __tablename__ = "user_settings"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
     timezone = Column(String, nullable=False)
     language = Column(String, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,104 @@
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import Any, List, NamedTuple, Optional, Sequence
+
+from fastapi import Response
+from sqlalchemy import Select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.exception_handlers import BadRequestError
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class Page(NamedTuple):
+    items: List[Any]
+    next_cursor: Optional[str]
+
+
+def _to_json(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def _from_json(value: Any, python_type: type) -> Any:
+    if value is None:
+        return None
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is uuid.UUID:
+        return uuid.UUID(value)
+    return value
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Непрозрачный курсор: значения ключа сортировки последней строки страницы."""
+    raw = json.dumps([_to_json(v) for v in values], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: Sequence[Any]) -> List[Any]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError("cursor does not match the sort key")
+        return [_from_json(v, column.type.python_type) for v, column in zip(values, columns)]
+    except (ValueError, TypeError) as e:
+        raise BadRequestError(f"Invalid cursor: {e}")
+
+
+async def paginate(
+    db: AsyncSession,
+    stmt: Select,
+    columns: Sequence[Any],
+    limit: int,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    descending: bool = False,
+) -> Page:
+    """
+    Keyset-пагинация по (ключ сортировки..., id): следующая страница начинается
+    строго после последней строки предыдущей, поэтому страница N стоит столько же,
+    сколько первая, а порядок стабилен при вставках. Последняя колонка в columns
+    должна быть уникальной (обычно id), и все колонки — NOT NULL: строка с NULL
+    в ключе не проходит сравнение кортежей и молча пропадает со страниц.
+
+    Без курсора работает прежний skip (OFFSET) — для обратной совместимости,
+    но уже в том же стабильном порядке. С курсором skip не применяется.
+    limit проверяется и здесь, а не только в эндпоинтах: сервисы вызывают paginate напрямую.
+    """
+    if not 1 <= limit <= settings.PAGE_MAX_LIMIT:
+        raise BadRequestError(f"limit must be between 1 and {settings.PAGE_MAX_LIMIT}")
+    if skip < 0:
+        raise BadRequestError("skip must not be negative")
+    if cursor:
+        key = tuple_(*columns)
+        after = tuple_(*decode_cursor(cursor, columns))
+        stmt = stmt.where(key < after if descending else key > after)
+    elif skip:
+        stmt = stmt.offset(skip)
+    stmt = stmt.order_by(*(column.desc() if descending else column.asc() for column in columns))
+
+    # Лишняя строка говорит, есть ли следующая страница, без отдельного COUNT
+    result = await db.execute(stmt.limit(limit + 1))
+    items = list(result.scalars().all())
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        last = items[-1]
+        next_cursor = encode_cursor([getattr(last, column.key) for column in columns])
+    return Page(items, next_cursor)
+
+
+def set_next_cursor(response: Response, page: Page) -> List[Any]:
+    """Курсор следующей страницы уходит в заголовке: тело ответа остаётся прежним списком."""
+    if page.next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    return page.items
@@ -1,6 +1,7 @@
 from .schemas import (
     User, UserCreate, UserUpdate,
     Event, EventCreate, EventUpdate,
+    EventBulkCreate, EventBulkUpdate, EventBulkUpdateItem, EventBulkDelete, BulkItemError, EventBulkResult,
     Reminder, ReminderCreate, ReminderUpdate,
     AI_Interaction, AI_InteractionCreate,
     User_Settings, User_SettingsCreate, User_SettingsUpdate,
@@ -13,6 +14,7 @@ from .schemas import (
 __all__ = [
     "User", "UserCreate", "UserUpdate",
     "Event", "EventCreate", "EventUpdate",
+    "EventBulkCreate", "EventBulkUpdate", "EventBulkUpdateItem", "EventBulkDelete", "BulkItemError", "EventBulkResult",
     "Reminder", "ReminderCreate", "ReminderUpdate",
     "AI_Interaction", "AI_InteractionCreate",
     "User_Settings", "User_SettingsCreate", "User_SettingsUpdate",
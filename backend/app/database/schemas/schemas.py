@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr, UUID4
+from pydantic import BaseModel, EmailStr, UUID4, model_validator
 from typing import Optional, Dict, Any, List
 from datetime import datetime
 
@@ -64,6 +64,39 @@ class Event(EventBase):
         from_attributes = True
 
 
+# Пакетные операции: элементы проверяются по отдельности, ошибки возвращаются по индексу
+class EventBulkCreate(BaseModel):
+    events: List[Dict[str, Any]]
+
+class EventBulkUpdate(BaseModel):
+    events: List[Dict[str, Any]]  # EventUpdate + обязательный id
+
+class EventBulkUpdateItem(EventUpdate):
+    id: UUID4
+
+    # Явный null для NOT NULL колонки иначе дошёл бы до БД и откатил всю пачку
+    @model_validator(mode="after")
+    def reject_null_required_fields(self):
+        nulls = [name for name in ("title", "type", "start_time", "end_time")
+                 if name in self.model_fields_set and getattr(self, name) is None]
+        if nulls:
+            raise ValueError(f"{', '.join(nulls)} may not be null")
+        return self
+
+class EventBulkDelete(BaseModel):
+    ids: List[UUID4]
+
+class BulkItemError(BaseModel):
+    index: int
+    id: Optional[UUID4] = None
+    detail: str
+
+class EventBulkResult(BaseModel):
+    events: List[Event] = []
+    deleted: List[UUID4] = []
+    errors: List[BulkItemError] = []
+
+
 class ReminderBase(BaseModel):
     remind_at: datetime
     method: str
@@ -10,13 +10,13 @@ logger = logging.getLogger("db.session")
 
 SQLALCHEMY_DATABASE_URL = str(settings.DATABASE_URL)
 
-logger.info(f"[DB] Creating async engine with URL: {SQLALCHEMY_DATABASE_URL}")
-engine = create_async_engine(SQLALCHEMY_DATABASE_URL, echo=True)
+engine = create_async_engine(SQLALCHEMY_DATABASE_URL, echo=settings.SQL_ECHO)
+logger.info(f"[DB] Created async engine with URL: {engine.url.render_as_string(hide_password=True)}")
 AsyncSessionLocal = async_sessionmaker(autocommit=False, autoflush=False, bind=engine, class_=AsyncSession)
 
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
-    logger.info("[DB] Opening new AsyncSession")
+    logger.debug("[DB] Opening new AsyncSession")
     async with AsyncSessionLocal() as session:
         yield session
-    logger.info("[DB] Closed AsyncSession")
+    logger.debug("[DB] Closed AsyncSession")
@@ -0,0 +1,58 @@
+from typing import Any, Dict, Optional, Sequence
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def returning_objects(model: Any, stmt: Any) -> Any:
+    """
+    ORM-объекты из INSERT/UPDATE ... RETURNING всех колонок таблицы. populate_existing
+    перезаписывает и объект, уже загруженный в сессию: иначе у него остались бы старые
+    значения колонок, которые вычисляет база (updated_at, генерируемые колонки).
+    """
+    return (
+        select(model)
+        .from_statement(stmt.returning(*model.__table__.c))
+        .execution_options(populate_existing=True)
+    )
+
+
+async def update_returning(
+    db: AsyncSession,
+    model: Any,
+    criteria: Sequence[Any],
+    values: Dict[str, Any],
+) -> Optional[Any]:
+    """
+    UPDATE ... SET ... WHERE criteria RETURNING *: изменение и чтение результата
+    одним запросом, без предварительного SELECT. Проверка прав (например,
+    user_id = текущий пользователь) входит в criteria. None — ни одна строка не подошла.
+    """
+    if not values:
+        # Обновлять нечего: SET без колонок не собрать, достаточно прочитать строку
+        return (await db.scalars(select(model).where(*criteria))).one_or_none()
+    stmt = returning_objects(model, update(model.__table__).where(*criteria).values(**values))
+    return (await db.scalars(stmt)).one_or_none()
+
+
+async def delete_returning(db: AsyncSession, model: Any, criteria: Sequence[Any]) -> Optional[Any]:
+    """DELETE ... WHERE criteria RETURNING id. None — ни одна строка не подошла."""
+    stmt = (
+        delete(model)
+        .where(*criteria)
+        .returning(model.id)
+        .execution_options(synchronize_session=False)
+    )
+    return (await db.execute(stmt)).scalar_one_or_none()
+
+
+async def commit_returning(db: AsyncSession, obj: Optional[Any]) -> Optional[Any]:
+    """
+    Зафиксировать транзакцию, сохранив объект из RETURNING читаемым. Его значения уже
+    актуальны, поэтому объект отсоединяется от сессии вместо refresh после commit —
+    иначе commit сбросил бы атрибуты и понадобился бы ещё один SELECT.
+    """
+    if obj is not None:
+        db.expunge(obj)
+    await db.commit()
+    return obj
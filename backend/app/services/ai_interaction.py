@@ -6,6 +6,10 @@ from sqlalchemy import select
 from app.core.exception_handlers import NotFoundError, DatabaseError
 from app.database.models.models import AI_Interaction
 from app.database.schemas.schemas import AI_InteractionCreate
+from app.database.pagination import Page, paginate
+
+# Новые взаимодействия первыми; id делает порядок однозначным
+SORT_KEY = [AI_Interaction.created_at, AI_Interaction.id]
 
 
 class AI_InteractionService:
@@ -24,25 +28,29 @@ class AI_InteractionService:
         self, 
         user_id: str, 
         skip: int = 0, 
-        limit: int = 100
-    ) -> List[AI_Interaction]:
-        """Получить список взаимодействий с ИИ по ID пользователя"""
-        result = await self.db.execute(select(AI_Interaction).filter(
-            AI_Interaction.user_id == user_id
-        ).offset(skip).limit(limit))
-        return list(result.scalars().all())
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> Page:
+        """Получить страницу взаимодействий с ИИ по ID пользователя"""
+        return await paginate(
+            self.db,
+            select(AI_Interaction).filter(AI_Interaction.user_id == user_id),
+            SORT_KEY, limit, cursor=cursor, skip=skip, descending=True,
+        )
 
     async def get_ai_interactions_by_intent(
         self, 
         intent: str, 
         skip: int = 0, 
-        limit: int = 100
-    ) -> List[AI_Interaction]:
-        """Получить список взаимодействий с ИИ по намерению"""
-        result = await self.db.execute(select(AI_Interaction).filter(
-            AI_Interaction.intent == intent
-        ).offset(skip).limit(limit))
-        return list(result.scalars().all())
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> Page:
+        """Получить страницу взаимодействий с ИИ по намерению"""
+        return await paginate(
+            self.db,
+            select(AI_Interaction).filter(AI_Interaction.intent == intent),
+            SORT_KEY, limit, cursor=cursor, skip=skip, descending=True,
+        )
 
     async def create(self, interaction_in: AI_InteractionCreate) -> AI_Interaction:
         """Создать новое взаимодействие с ИИ"""
@@ -1,11 +1,35 @@
 import uuid
-from typing import Optional, List
+from collections import defaultdict
+from typing import Any, Dict, Optional, List, Sequence, Tuple
 from datetime import datetime
+from pydantic import ValidationError
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import any_, column, delete, insert, literal, select, update, values
 
-from app.core.exception_handlers import NotFoundError, DatabaseError, ForbiddenError
+from app.core.config import settings
+from app.core.exception_handlers import NotFoundError, DatabaseError, ForbiddenError, BadRequestError
 from app.database import models, schemas
+from app.database.pagination import Page, paginate
+from app.database.writes import commit_returning, delete_returning, returning_objects, update_returning
+
+
+def _id_array(ids: Sequence[uuid.UUID]):
+    """Список id одним параметром-массивом: `id = ANY($1)` вместо IN с параметром на каждый id."""
+    return any_(literal(list(ids), ARRAY(UUID(as_uuid=True))))
+
+
+def _validation_detail(error: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(map(str, e['loc']))}: {e['msg']}" for e in error.errors())
+
+
+def _time_order_error(start_time: datetime, end_time: datetime) -> Optional[str]:
+    try:
+        if end_time < start_time:
+            return "end_time must be after start_time"
+    except TypeError:
+        return "start_time and end_time must both include a timezone or both omit it"
+    return None
 
 
 class EventService:
@@ -24,10 +48,20 @@ class EventService:
             
         return event
 
-    async def get_events_by_user(self, user_id: uuid.UUID, skip: int = 0, limit: int = 100) -> List[models.Event]:
-        """Получить список событий пользователя"""
-        result = await self.db.execute(select(models.Event).filter(models.Event.user_id == user_id).offset(skip).limit(limit))
-        return list(result.scalars().all())
+    async def get_events_by_user(
+        self,
+        user_id: uuid.UUID,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> Page:
+        """Получить страницу событий пользователя по порядку начала"""
+        return await paginate(
+            self.db,
+            select(models.Event).filter(models.Event.user_id == user_id),
+            [models.Event.start_time, models.Event.id],
+            limit, cursor=cursor, skip=skip,
+        )
 
     async def get_events_by_date_range(
         self, 
@@ -35,11 +69,10 @@ class EventService:
         start_date: datetime, 
         end_date: datetime
     ) -> List[models.Event]:
-        """Получить события пользователя в заданном диапазоне дат"""
+        """Получить события пользователя, пересекающиеся с диапазоном дат"""
         result = await self.db.execute(select(models.Event).filter(
             models.Event.user_id == user_id,
-            models.Event.start_time >= start_date,
-            models.Event.end_time <= end_date
+            models.Event.overlaps(start_date, end_date)
         ))
         return list(result.scalars().all())
 
@@ -58,26 +91,210 @@ class EventService:
             await self.db.rollback()
             raise DatabaseError(f"Error creating event: {str(e)}")
 
+    async def _raise_not_owned(self, event_id: uuid.UUID) -> None:
+        """Запись не затронула ни одной строки: события нет или оно чужое."""
+        owner_id = await self.db.scalar(select(models.Event.user_id).where(models.Event.id == event_id))
+        if owner_id is None:
+            raise NotFoundError(f"Event with id {event_id} not found")
+        raise ForbiddenError("You are not authorized to access this event.")
+
     async def update(self, event_id: uuid.UUID, event_in: schemas.EventUpdate, current_user: models.User) -> models.Event:
-        """Обновить событие с проверкой прав."""
-        event = await self.get_by_id(event_id, current_user) # The check is already here
+        """Обновить событие одним UPDATE ... RETURNING; права проверяются в WHERE."""
+        update_data = event_in.model_dump(exclude_unset=True)
         try:
-            update_data = event_in.model_dump(exclude_unset=True)
-            for field, value in update_data.items():
-                setattr(event, field, value)
-            await self.db.commit()
-            await self.db.refresh(event)
-            return event
+            event = await update_returning(
+                self.db, models.Event,
+                (models.Event.id == event_id, models.Event.user_id == current_user.id),
+                update_data,
+            )
+            if event is not None:
+                await commit_returning(self.db, event)
         except Exception as e:
             await self.db.rollback()
             raise DatabaseError(f"Error updating event: {str(e)}")
+        if event is None:
+            await self._raise_not_owned(event_id)
+        return event
 
     async def delete(self, event_id: uuid.UUID, current_user: models.User) -> None:
-        """Удалить событие с проверкой прав."""
-        event = await self.get_by_id(event_id, current_user)
+        """Удалить событие одним DELETE ... RETURNING id; права проверяются в WHERE."""
         try:
-            await self.db.delete(event)
+            deleted = await delete_returning(
+                self.db, models.Event,
+                (models.Event.id == event_id, models.Event.user_id == current_user.id),
+            )
+            if deleted is not None:
+                await self.db.commit()
+        except Exception as e:
+            await self.db.rollback()
+            raise DatabaseError(f"Error deleting event: {str(e)}")
+        if deleted is None:
+            await self._raise_not_owned(event_id)
+
+    # --- Пакетные операции -------------------------------------------------------
+    # Каждый элемент проверяется отдельно: ошибки возвращаются по индексу в запросе,
+    # остальные элементы применяются одним SQL-запросом в одной транзакции.
+
+    def _check_bulk_size(self, count: int) -> None:
+        if count > settings.MAX_BULK_EVENTS:
+            raise BadRequestError(f"Too many events in one request: {count}, maximum is {settings.MAX_BULK_EVENTS}")
+
+    async def _existing(self, ids: Sequence[uuid.UUID]) -> Dict[uuid.UUID, Any]:
+        """Владелец и время существующих событий по id — для проверок до записи."""
+        if not ids:
+            return {}
+        result = await self.db.execute(
+            select(models.Event.id, models.Event.user_id, models.Event.start_time, models.Event.end_time)
+            .where(models.Event.id == _id_array(ids))
+        )
+        return {row.id: row for row in result}
+
+    @staticmethod
+    def _ownership_error(index: int, event_id: uuid.UUID, row: Any, current_user: models.User) -> Optional[schemas.BulkItemError]:
+        if row is None:
+            return schemas.BulkItemError(index=index, id=event_id, detail=f"Event with id {event_id} not found")
+        if row.user_id != current_user.id:
+            return schemas.BulkItemError(index=index, id=event_id, detail="You are not authorized to access this event.")
+        return None
+
+    async def bulk_create(self, items: List[Dict[str, Any]], user_id: uuid.UUID) -> schemas.EventBulkResult:
+        """Создать события одним INSERT ... VALUES (...), (...) RETURNING."""
+        self._check_bulk_size(len(items))
+        rows, errors = [], []
+        for index, raw in enumerate(items):
+            try:
+                event_in = schemas.EventCreate.model_validate(raw)
+            except ValidationError as e:
+                errors.append(schemas.BulkItemError(index=index, detail=_validation_detail(e)))
+                continue
+            time_error = _time_order_error(event_in.start_time, event_in.end_time)
+            if time_error:
+                errors.append(schemas.BulkItemError(index=index, detail=time_error))
+                continue
+            rows.append({**event_in.model_dump(), "user_id": user_id})
+
+        if not rows:
+            return schemas.EventBulkResult(errors=errors)
+        try:
+            result = await self.db.scalars(
+                insert(models.Event).returning(models.Event, sort_by_parameter_order=True), rows
+            )
+            # Ответ собирается до commit: после него атрибуты объектов сбрасываются
+            created = [schemas.Event.model_validate(event) for event in result.all()]
+            await self.db.commit()
+        except Exception as e:
+            await self.db.rollback()
+            raise DatabaseError(f"Error creating events: {str(e)}")
+        return schemas.EventBulkResult(events=created, errors=errors)
+
+    async def _update_group(
+        self, fields: Tuple[str, ...], changes: List[Tuple[uuid.UUID, Dict[str, Any]]], user_id: uuid.UUID
+    ) -> List[models.Event]:
+        """
+        UPDATE events SET f = changes.f ... FROM (VALUES (...), ...) AS changes
+        WHERE events.id = changes.id AND events.user_id = :user_id RETURNING events.*
+        """
+        table = models.Event.__table__
+        data = values(
+            column("id", UUID(as_uuid=True)),
+            *(column(name, table.c[name].type) for name in fields),
+            name="changes",
+        ).data([(event_id, *(item[name] for name in fields)) for event_id, item in changes])
+        stmt = returning_objects(
+            models.Event,
+            update(table)
+            .where(table.c.id == data.c.id, table.c.user_id == user_id)
+            .values({name: data.c[name] for name in fields}),
+        )
+        return list((await self.db.scalars(stmt)).all())
+
+    async def bulk_update(self, items: List[Dict[str, Any]], current_user: models.User) -> schemas.EventBulkResult:
+        """
+        Обновить события через UPDATE ... FROM (VALUES ...). Элементы с одинаковым набором
+        полей идут одним запросом; обычный перенос пачки событий — ровно один запрос.
+        """
+        self._check_bulk_size(len(items))
+        parsed, errors = [], []
+        for index, raw in enumerate(items):
+            try:
+                parsed.append((index, schemas.EventBulkUpdateItem.model_validate(raw)))
+            except ValidationError as e:
+                errors.append(schemas.BulkItemError(index=index, detail=_validation_detail(e)))
+
+        existing = await self._existing([item.id for _, item in parsed])
+        groups: Dict[Tuple[str, ...], List[Tuple[uuid.UUID, Dict[str, Any]]]] = defaultdict(list)
+        order: Dict[uuid.UUID, int] = {}
+        for index, item in parsed:
+            row = existing.get(item.id)
+            error = self._ownership_error(index, item.id, row, current_user)
+            if error is None and item.id in order:
+                error = schemas.BulkItemError(index=index, id=item.id, detail="Duplicate event id in this request")
+            changes = item.model_dump(exclude_unset=True, exclude={"id"})
+            if error is None and not changes:
+                error = schemas.BulkItemError(index=index, id=item.id, detail="No fields to update")
+            if error is None:
+                time_error = _time_order_error(
+                    changes.get("start_time", row.start_time), changes.get("end_time", row.end_time))
+                if time_error:
+                    error = schemas.BulkItemError(index=index, id=item.id, detail=time_error)
+            if error is not None:
+                errors.append(error)
+                continue
+            order[item.id] = index
+            groups[tuple(sorted(changes))].append((item.id, changes))
+
+        if not groups:
+            return schemas.EventBulkResult(errors=sorted(errors, key=lambda e: e.index))
+        try:
+            updated = []
+            for fields, changes in groups.items():
+                updated.extend(await self._update_group(fields, changes, current_user.id))
+            events = sorted((schemas.Event.model_validate(event) for event in updated), key=lambda e: order[e.id])
+            await self.db.commit()
+        except Exception as e:
+            await self.db.rollback()
+            raise DatabaseError(f"Error updating events: {str(e)}")
+        # Событие могли удалить между проверкой и UPDATE
+        returned = {event.id for event in events}
+        errors.extend(
+            schemas.BulkItemError(index=index, id=event_id, detail=f"Event with id {event_id} not found")
+            for event_id, index in order.items() if event_id not in returned
+        )
+        return schemas.EventBulkResult(events=events, errors=sorted(errors, key=lambda e: e.index))
+
+    async def bulk_delete(self, ids: List[uuid.UUID], current_user: models.User) -> schemas.EventBulkResult:
+        """Удалить события через DELETE ... WHERE id = ANY(...); напоминания удаляет каскад FK."""
+        self._check_bulk_size(len(ids))
+        existing = await self._existing(ids)
+        errors, allowed = [], {}
+        for index, event_id in enumerate(ids):
+            error = self._ownership_error(index, event_id, existing.get(event_id), current_user)
+            if error is None and event_id in allowed:
+                error = schemas.BulkItemError(index=index, id=event_id, detail="Duplicate event id in this request")
+            if error is not None:
+                errors.append(error)
+                continue
+            allowed[event_id] = index
+
+        if not allowed:
+            return schemas.EventBulkResult(errors=sorted(errors, key=lambda e: e.index))
+        try:
+            result = await self.db.execute(
+                delete(models.Event)
+                .where(models.Event.id == _id_array(list(allowed)), models.Event.user_id == current_user.id)
+                .returning(models.Event.id)
+                .execution_options(synchronize_session=False)
+            )
+            deleted = set(result.scalars().all())
             await self.db.commit()
         except Exception as e:
             await self.db.rollback()
-            raise DatabaseError(f"Error deleting event: {str(e)}") 
+            raise DatabaseError(f"Error deleting events: {str(e)}")
+        errors.extend(
+            schemas.BulkItemError(index=index, id=event_id, detail=f"Event with id {event_id} not found")
+            for event_id, index in allowed.items() if event_id not in deleted
+        )
+        return schemas.EventBulkResult(
+            deleted=[event_id for event_id in allowed if event_id in deleted],
+            errors=sorted(errors, key=lambda e: e.index),
+        )
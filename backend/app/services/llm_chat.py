@@ -1,38 +1,54 @@
-import os
-import requests
-from typing import List, Dict, Any
+import logging
+from typing import List, Dict, Optional
 
-from app.core.config import settings
+import httpx
 from fastapi import HTTPException
 
+from app.core.config import settings
+from app.core.http_clients import get_llm_client
+from app.core.llm_transport import CircuitOpenError, ResilientTransport, llm_transport
+
+logger = logging.getLogger(__name__)
+
+
 class LLMChatService:
-    def __init__(self):
-        self.api_key = settings.GROQ_API_KEY
-        self.api_url = "https://api.groq.com/openai/v1/chat/completions"
-        self.model_name = "llama3-70b-8192"
+    def __init__(self, client: Optional[httpx.AsyncClient] = None, transport: Optional[ResilientTransport] = None):
+        self.backend = settings.LLM_BACKEND
+        self.api_key = settings.LLM_API_KEY or settings.GROQ_API_KEY
+        self.api_url = settings.LLM_API_URL
+        self.model_name = settings.LLM_MODEL
+        # Общий клиент приложения и общий транспорт: повторы с backoff и Retry-After,
+        # circuit breaker и хеджирование, как у ML-сервиса
+        self.client = client or get_llm_client()
+        self.transport = transport or llm_transport
 
-    def chat(self, messages: List[Dict[str, str]]) -> str:
-        if not self.api_key:
+    async def chat(self, messages: List[Dict[str, str]]) -> str:
+        if not self.api_key and self.backend == "groq":
             raise ValueError("GROQ_API_KEY is not set in the .env")
 
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
         json_data = {
             "model": self.model_name,
             "messages": messages,
             "temperature": 0.5
         }
 
+        response = None
         try:
-            response = requests.post(self.api_url, headers=headers, json=json_data)
+            response = await self.transport.call(
+                lambda: self.client.post(self.api_url, headers=headers, json=json_data))
             response.raise_for_status() # Raise an exception for HTTP errors (4xx or 5xx)
             return response.json()['choices'][0]['message']['content'].strip()
-        except requests.exceptions.RequestException as e:
-            # Log the error and re-raise or handle as appropriate for your application
-            print(f"Error interacting with Groq API: {e}")
+        except CircuitOpenError as e:
+            # Провайдер деградировал: отвечаем сразу, не дожидаясь таймаута
+            logger.warning("LLM API unavailable", extra={"backend": self.backend, "error": str(e)})
+            raise HTTPException(status_code=503, detail=str(e),
+                                headers={"Retry-After": str(max(1, round(e.retry_after)))})
+        except httpx.HTTPError as e:
+            logger.error("Error interacting with LLM API", extra={"backend": self.backend, "error": str(e)})
             raise HTTPException(status_code=500, detail=f"Failed to get response from LLM: {e}")
         except KeyError as e:
-            print(f"KeyError in parsing LLM response: {e}. Full response: {response.json()}")
-            raise HTTPException(status_code=500, detail=f"Unexpected LLM response format: {e}") 
+            logger.error("Unexpected LLM response format", extra={"error": str(e), "body": response.text})
+            raise HTTPException(status_code=500, detail=f"Unexpected LLM response format: {e}")
@@ -1,11 +1,12 @@
 from typing import Optional, List
 from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import delete, select
 
 from app.core.exception_handlers import NotFoundError, DatabaseError
 from app.database.models.models import Reminder
 from app.database.schemas.schemas import ReminderCreate, ReminderUpdate
+from app.database.writes import commit_returning, delete_returning, update_returning
 
 
 class ReminderService:
@@ -50,33 +51,34 @@ class ReminderService:
             raise DatabaseError(f"Error creating reminder: {str(e)}")
 
     async def update(self, reminder_id: str, reminder_in: ReminderUpdate) -> Reminder:
-        """Обновить напоминание"""
-        reminder = await self.get_by_id(reminder_id)
+        """Обновить напоминание одним UPDATE ... RETURNING"""
+        update_data = reminder_in.model_dump(exclude_unset=True)
         try:
-            update_data = reminder_in.model_dump(exclude_unset=True)
-            for field, value in update_data.items():
-                setattr(reminder, field, value)
-            await self.db.commit()
-            await self.db.refresh(reminder)
-            return reminder
+            reminder = await update_returning(self.db, Reminder, (Reminder.id == reminder_id,), update_data)
+            if reminder is not None:
+                await commit_returning(self.db, reminder)
         except Exception as e:
             await self.db.rollback()
             raise DatabaseError(f"Error updating reminder: {str(e)}")
+        if reminder is None:
+            raise NotFoundError(f"Reminder with id {reminder_id} not found")
+        return reminder
 
     async def delete(self, reminder_id: str) -> None:
-        """Удалить напоминание"""
-        reminder = await self.get_by_id(reminder_id)
+        """Удалить напоминание одним DELETE ... RETURNING id"""
         try:
-            await self.db.delete(reminder)
-            await self.db.commit()
+            deleted = await delete_returning(self.db, Reminder, (Reminder.id == reminder_id,))
+            if deleted is not None:
+                await self.db.commit()
         except Exception as e:
             await self.db.rollback()
             raise DatabaseError(f"Error deleting reminder: {str(e)}")
+        if deleted is None:
+            raise NotFoundError(f"Reminder with id {reminder_id} not found")
 
     async def delete_reminders_by_event(self, event_id: str) -> None:
-        """Удалить все напоминания, связанные с событием"""
-        result = await self.db.execute(select(Reminder).where(Reminder.event_id == event_id))
-        reminders = result.scalars().all()
-        for reminder in reminders:
-            await self.db.delete(reminder)
-        await self.db.commit() 
+        """Удалить все напоминания, связанные с событием, одним DELETE"""
+        await self.db.execute(
+            delete(Reminder).where(Reminder.event_id == event_id).execution_options(synchronize_session=False)
+        )
+        await self.db.commit()
@@ -5,6 +5,8 @@ import uuid
 
 from app.core.exception_handlers import NotFoundError, DatabaseError, ForbiddenError, BadRequestError
 from app.database import models, schemas
+from app.database.pagination import Page, paginate
+from app.database.writes import commit_returning, delete_returning, update_returning
 from passlib.context import CryptContext
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -52,43 +54,40 @@ class UserService:
         if current_user.id != user_id:
             raise ForbiddenError("You are not authorized to update this user.")
 
-        user = await self.get_by_id(user_id)
-        if not user:
-            raise NotFoundError(f"User with id {user_id} not found")
-            
-        try:
-            update_data = user_in.model_dump(exclude_unset=True)
-            if 'password' in update_data:
-                update_data['pass_hash'] = self._hash_password(update_data['password'])
-                del update_data['password']
+        update_data = user_in.model_dump(exclude_unset=True)
+        if 'password' in update_data:
+            update_data['pass_hash'] = self._hash_password(update_data['password'])
+            del update_data['password']
 
-            for field, value in update_data.items():
-                setattr(user, field, value)
-            
-            await self.db.commit()
-            await self.db.refresh(user)
-            return user
+        try:
+            user = await update_returning(self.db, models.User, (models.User.id == user_id,), update_data)
+            if user is not None:
+                await commit_returning(self.db, user)
         except Exception as e:
             await self.db.rollback()
             raise DatabaseError(f"Error updating user: {str(e)}")
+        if user is None:
+            raise NotFoundError(f"User with id {user_id} not found")
+        return user
 
     async def delete(self, user_id: uuid.UUID, current_user: models.User) -> None:
         """Удалить пользователя с проверкой прав."""
         if current_user.id != user_id:
             raise ForbiddenError("You are not authorized to delete this user.")
 
-        user = await self.get_by_id(user_id)
-        if not user:
-            raise NotFoundError(f"User with id {user_id} not found")
-
         try:
-            await self.db.delete(user)
-            await self.db.commit()
+            deleted = await delete_returning(self.db, models.User, (models.User.id == user_id,))
+            if deleted is not None:
+                await self.db.commit()
         except Exception as e:
             await self.db.rollback()
             raise DatabaseError(f"Error deleting user: {str(e)}")
+        if deleted is None:
+            raise NotFoundError(f"User with id {user_id} not found")
 
-    async def get_users(self, skip: int = 0, limit: int = 100) -> List[models.User]:
-        """Получить список пользователей (может требовать прав администратора)."""
-        result = await self.db.execute(select(models.User).offset(skip).limit(limit))
-        return list(result.scalars().all())
+    async def get_users(self, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> Page:
+        """Получить страницу пользователей по email (может требовать прав администратора)."""
+        return await paginate(
+            self.db, select(models.User), [models.User.email, models.User.id],
+            limit, cursor=cursor, skip=skip,
+        )
@@ -5,6 +5,7 @@ from sqlalchemy import select
 from app.core.exception_handlers import NotFoundError, DatabaseError
 from app.database.models.models import User_Settings
 from app.database.schemas.schemas import User_SettingsCreate, User_SettingsUpdate
+from app.database.writes import commit_returning, delete_returning, update_returning
 
 
 class User_SettingsService:
@@ -32,25 +33,28 @@ class User_SettingsService:
             raise DatabaseError(f"Error creating user settings: {str(e)}")
 
     async def update(self, user_id: str, settings_in: User_SettingsUpdate) -> User_Settings:
-        """Обновить настройки пользователя"""
-        settings = await self.get_by_user_id(user_id)
+        """Обновить настройки пользователя одним UPDATE ... RETURNING"""
+        update_data = settings_in.model_dump(exclude_unset=True)
         try:
-            update_data = settings_in.model_dump(exclude_unset=True)
-            for field, value in update_data.items():
-                setattr(settings, field, value)
-            await self.db.commit()
-            await self.db.refresh(settings)
-            return settings
+            settings = await update_returning(
+                self.db, User_Settings, (User_Settings.user_id == user_id,), update_data)
+            if settings is not None:
+                await commit_returning(self.db, settings)
         except Exception as e:
             await self.db.rollback()
             raise DatabaseError(f"Error updating user settings: {str(e)}")
+        if settings is None:
+            raise NotFoundError(f"User settings for user_id {user_id} not found")
+        return settings
 
     async def delete(self, user_id: str) -> None:
-        """Удалить настройки пользователя"""
-        settings = await self.get_by_user_id(user_id)
+        """Удалить настройки пользователя одним DELETE ... RETURNING id"""
         try:
-            await self.db.delete(settings)
-            await self.db.commit()
+            deleted = await delete_returning(self.db, User_Settings, (User_Settings.user_id == user_id,))
+            if deleted is not None:
+                await self.db.commit()
         except Exception as e:
             await self.db.rollback()
-            raise DatabaseError(f"Error deleting user settings: {str(e)}") 
+            raise DatabaseError(f"Error deleting user settings: {str(e)}")
+        if deleted is None:
+            raise NotFoundError(f"User settings for user_id {user_id} not found")
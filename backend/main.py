@@ -1,3 +1,5 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.sessions import SessionMiddleware
@@ -5,7 +7,8 @@ import logging
 import json
 
 from app.core import settings
-from app.core.logging import logger
+from app.core.http_clients import http_clients
+from app.core.logging import setup_logging, stop_logging
 from app.api import api_router
 from app.core.exception_handlers import add_exception_handlers
 
@@ -13,12 +16,25 @@ from app.core.exception_handlers import add_exception_handlers
 # from app.database import Base, engine 
 # Base.metadata.create_all(bind=engine)
 
-logging.basicConfig(level=logging.INFO)
+setup_logging()
 logger = logging.getLogger("main")
 logger.info("[APP] FastAPI app is starting up...")
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    logger.info(f"Starting {settings.PROJECT_NAME}")
+    # Общие HTTP-клиенты к ML-сервису и Google живут столько же, сколько приложение
+    http_clients.start()
+    yield
+    logger.info("HTTP client pool usage", extra={"pools": http_clients.stats()})
+    await http_clients.aclose()
+    stop_logging()
+
+
 app = FastAPI(
-    title=settings.PROJECT_NAME
+    title=settings.PROJECT_NAME,
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -38,12 +54,9 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Курсор следующей страницы списков, см. app/database/pagination.py
+    expose_headers=["X-Next-Cursor"],
 )
 
 
 app.include_router(api_router, prefix=settings.API_V1_STR)
-
-@app.on_event("startup")
-async def on_startup():
-    logger.info(f"Starting {settings.PROJECT_NAME}")
-
@@ -37,18 +37,21 @@ test_engine = create_async_engine(
 )
 TestAsyncSessionLocal = async_sessionmaker(autocommit=False, autoflush=False, bind=test_engine, class_=AsyncSession)
 
-# Эта фикстура больше не нужна, pytest-asyncio управляет циклом событий автоматически
-# @pytest.fixture(scope="session")
-# def event_loop():
-#     """Create a session-scoped event loop for async tests."""
-#     policy = asyncio.get_event_loop_policy()
-#     loop = policy.new_event_loop()
-#     yield loop
-#     loop.close()
+# Один цикл событий на всю сессию: движок и StaticPool создаются в session-фикстуре,
+# и соединение asyncpg нельзя использовать из цикла другого теста
+@pytest.fixture(scope="session")
+def event_loop():
+    """Create a session-scoped event loop for async tests."""
+    policy = asyncio.get_event_loop_policy()
+    loop = policy.new_event_loop()
+    yield loop
+    loop.close()
 
 @pytest.fixture(scope="session", autouse=True)
 async def setup_test_db():
     async with test_engine.begin() as conn:
+        # GiST-индекс по (user_id, period) у events требует btree_gist, как и миграция 8e4b2d6f1a93
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS btree_gist"))
         await conn.run_sync(Base.metadata.create_all)
     yield
     async with test_engine.begin() as conn:
@@ -61,4 +61,20 @@ async def test_protected_endpoint_access_with_malformed_token(client: AsyncClien
 # async def test_google_login_redirect(client: AsyncClient):
 #     response = await client.get("/api/v1/auth/google-login")
 #     assert response.status_code == 307 # Temporary Redirect
-#     assert "accounts.google.com" in response.headers["location"] 
\ No newline at end of file
+#     assert "accounts.google.com" in response.headers["location"]
+
+
+@pytest.mark.asyncio
+async def test_http_pool_stats_require_authentication(client: AsyncClient, db_session: AsyncSession):
+    response = await client.get("/api/v1/health/http")
+    assert response.status_code == 401
+
+    from app.auth.jwt import create_access_token
+    from app.services.user import UserService
+    user = await UserService(db_session).create(user_in=UserCreate(
+        email="http_stats_user@example.com", password="secure_password", name="Stats User"))
+    client.cookies.set("access_token", create_access_token(data={"sub": str(user.id)}))
+
+    response = await client.get("/api/v1/health/http")
+    assert response.status_code == 200
+    assert set(response.json()) <= {"ml", "llm", "google", "llm_transport"}
@@ -0,0 +1,111 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import HTTPException
+from pydantic import ValidationError
+
+from app.core.config import Settings
+from app.core.llm_transport import CircuitBreaker, ResilientTransport, RetryPolicy
+from app.services.llm_chat import LLMChatService
+
+
+def llm_client(statuses):
+    """Клиент, который отвечает кодами из statuses по очереди, а после них — успехом."""
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        status = statuses[len(calls) - 1] if len(calls) <= len(statuses) else 200
+        if status != 200:
+            return httpx.Response(status, headers={"Retry-After": "0"})
+        return httpx.Response(200, json={"choices": [{"message": {"content": " hello "}}]})
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler)), calls
+
+
+def transport(**breaker):
+    return ResilientTransport(
+        retry=RetryPolicy(max_attempts=3, base_delay=0, max_delay=0),
+        breaker=CircuitBreaker(**breaker),
+    )
+
+
+@pytest.mark.asyncio
+async def test_llm_chat_retries_transient_errors(monkeypatch):
+    monkeypatch.setattr("app.core.config.settings.LLM_API_KEY", "test-key")
+    client, calls = llm_client([429, 503])
+    llm = transport()
+
+    answer = await LLMChatService(client=client, transport=llm).chat([{"role": "user", "content": "hi"}])
+
+    assert answer == "hello"
+    assert len(calls) == 3
+    assert llm.stats()["retries"] == 2
+    assert llm.stats()["retry_after_honored"] == 2
+
+
+@pytest.mark.asyncio
+async def test_llm_chat_fails_fast_when_breaker_opens(monkeypatch):
+    monkeypatch.setattr("app.core.config.settings.LLM_API_KEY", "test-key")
+    client, calls = llm_client([503] * 100)
+    llm = transport(window=4, min_calls=4, failure_ratio=0.5, open_seconds=60)
+    service = LLMChatService(client=client, transport=llm)
+
+    with pytest.raises(HTTPException) as first:
+        await service.chat([{"role": "user", "content": "hi"}])
+    assert first.value.status_code == 500
+    with pytest.raises(HTTPException) as second:
+        await service.chat([{"role": "user", "content": "hi"}])
+
+    # Breaker разомкнулся на четвёртой ошибке: дальше запросы не уходят в сеть
+    assert second.value.status_code == 503
+    assert int(second.value.headers["Retry-After"]) > 0
+    assert len(calls) == 4
+    assert llm.stats()["breaker"]["state"] == "open"
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_cancels_the_hedged_attempt():
+    started, cancelled = asyncio.Event(), asyncio.Event()
+
+    async def send() -> httpx.Response:
+        started.set()
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    llm = ResilientTransport(hedge=True, hedge_min_delay=30)
+    for _ in range(llm.latency.min_samples):
+        llm.latency.add(0.01)
+
+    call = asyncio.create_task(llm.call(send))
+    await started.wait()
+    call.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await call
+
+    await asyncio.wait_for(cancelled.wait(), 1)
+    assert llm.stats()["hedges"] == 0
+
+
+def test_llm_backend_is_validated(monkeypatch):
+    monkeypatch.setenv("LLM_BACKEND", "grok")
+    with pytest.raises(ValidationError):
+        Settings()
+
+
+def test_openai_backend_requires_api_url(monkeypatch):
+    monkeypatch.setenv("LLM_BACKEND", "openai")
+    monkeypatch.delenv("LLM_API_URL", raising=False)
+    with pytest.raises(ValidationError, match="LLM_API_URL"):
+        Settings(_env_file=None)
+
+    monkeypatch.setenv("LLM_API_URL", "http://fake-llm:8002/v1/chat/completions")
+    assert Settings(_env_file=None).LLM_API_URL == "http://fake-llm:8002/v1/chat/completions"
+
+    monkeypatch.setenv("LLM_BACKEND", "groq")
+    monkeypatch.delenv("LLM_API_URL")
+    assert Settings(_env_file=None).LLM_API_URL == "https://api.groq.com/openai/v1/chat/completions"
@@ -1,11 +1,16 @@
+import uuid
 import pytest
 from httpx import AsyncClient
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
 from app.services.user import UserService
+from app.services.event import EventService
+from app.core.config import settings
+from app.core.exception_handlers import BadRequestError, ForbiddenError, NotFoundError
 
-from app.database.models.models import Event, User
-from app.database.schemas.schemas import EventCreate, UserCreate
+from app.database.models.models import Event, Reminder, User
+from app.database.schemas.schemas import EventCreate, EventUpdate, UserCreate
 
 
 @pytest.mark.asyncio
@@ -353,4 +358,249 @@ async def test_delete_event_other_user_forbidden(authenticated_client: AsyncClie
 
     response = await authenticated_client.delete(f"/api/v1/events/{other_event_id}")
     assert response.status_code == 404 # Should be 404 Not Found or 403 Forbidden
-    assert response.json() == {"detail": f"Event with id {other_event_id} not found"} 
\ No newline at end of file
+    assert response.json() == {"detail": f"Event with id {other_event_id} not found"} 
+
+
+@pytest.mark.asyncio
+async def test_events_by_date_range_returns_overlapping_events(db_session: AsyncSession):
+    user = await _service_user(db_session, "overlapuser@example.com")
+    event_service = EventService(db_session)
+
+    def event(title, start, end):
+        return EventCreate(title=title, start_time=start, end_time=end, type="other")
+
+    # Окно — неделя 2024-11-04 .. 2024-11-11
+    window_start = datetime.fromisoformat("2024-11-04T00:00:00+00:00")
+    window_end = datetime.fromisoformat("2024-11-11T00:00:00+00:00")
+    for item in [
+        event("inside", "2024-11-05T10:00:00+00:00", "2024-11-05T11:00:00+00:00"),
+        event("crosses start", "2024-11-03T22:00:00+00:00", "2024-11-04T01:00:00+00:00"),
+        event("crosses end", "2024-11-10T23:00:00+00:00", "2024-11-11T02:00:00+00:00"),
+        event("spans window", "2024-11-01T00:00:00+00:00", "2024-11-20T00:00:00+00:00"),
+        event("ends at window start", "2024-11-03T23:00:00+00:00", "2024-11-04T00:00:00+00:00"),
+        event("starts at window end", "2024-11-11T00:00:00+00:00", "2024-11-11T01:00:00+00:00"),
+        event("before", "2024-10-01T10:00:00+00:00", "2024-10-01T11:00:00+00:00"),
+        event("after", "2024-12-01T10:00:00+00:00", "2024-12-01T11:00:00+00:00"),
+    ]:
+        await event_service.create(item, user.id)
+
+    events = await event_service.get_events_by_date_range(user.id, window_start, window_end)
+
+    assert sorted(e.title for e in events) == ["crosses end", "crosses start", "inside", "spans window"]
+
+
+@pytest.mark.asyncio
+async def test_events_by_user_cursor_is_stable_for_equal_start_times(db_session: AsyncSession):
+    user = await _service_user(db_session, "cursoruser@example.com")
+    event_service = EventService(db_session)
+    # Одинаковое время начала: порядок внутри группы задаёт id
+    for i in range(5):
+        await event_service.create(EventCreate(
+            title=f"Same start {i}", start_time="2024-11-05T10:00:00+00:00",
+            end_time="2024-11-05T11:00:00+00:00", type="other"), user.id)
+
+    first = await event_service.get_events_by_user(user.id, limit=2)
+    second = await event_service.get_events_by_user(user.id, limit=2, cursor=first.next_cursor)
+    third = await event_service.get_events_by_user(user.id, limit=2, cursor=second.next_cursor)
+
+    ids = [e.id for e in first.items + second.items + third.items]
+    assert len(ids) == 5 and len(set(ids)) == 5
+    assert ids == sorted(ids)
+    assert third.next_cursor is None
+
+
+async def _service_user(db_session: AsyncSession, email: str) -> User:
+    user = await UserService(db_session).create(user_in=UserCreate(email=email, password="testpass", name="Service User"))
+    # Несвязанная с сессией копия: commit в следующих вызовах сервиса сбросил бы атрибуты,
+    # а ленивая загрузка в асинхронной сессии недоступна
+    return User(id=user.id, email=user.email, name=user.name)
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_reports_invalid_items(db_session: AsyncSession):
+    user = await _service_user(db_session, "bulkcreate@example.com")
+    event_service = EventService(db_session)
+
+    result = await event_service.bulk_create([
+        {"title": "First", "start_time": "2024-11-05T10:00:00+00:00", "end_time": "2024-11-05T11:00:00+00:00", "type": "focus"},
+        {"title": "No times", "type": "other"},
+        {"title": "Reversed", "start_time": "2024-11-05T12:00:00+00:00", "end_time": "2024-11-05T11:00:00+00:00", "type": "other"},
+        {"title": "Second", "start_time": "2024-11-06T10:00:00+00:00", "end_time": "2024-11-06T11:00:00+00:00", "type": "tasks"},
+    ], user.id)
+
+    assert [e.title for e in result.events] == ["First", "Second"]
+    assert all(e.user_id == user.id for e in result.events)
+    assert [e.index for e in result.errors] == [1, 2]
+    assert "end_time must be after start_time" in result.errors[1].detail
+
+    page = await event_service.get_events_by_user(user.id)
+    assert [e.title for e in page.items] == ["First", "Second"]
+
+
+@pytest.mark.asyncio
+async def test_bulk_update_moves_events_and_skips_foreign(db_session: AsyncSession):
+    owner = await _service_user(db_session, "bulkupdate@example.com")
+    stranger = await _service_user(db_session, "bulkstranger@example.com")
+    event_service = EventService(db_session)
+    created = await event_service.bulk_create([
+        {"title": f"Event {i}", "start_time": f"2024-11-0{i + 1}T10:00:00+00:00",
+         "end_time": f"2024-11-0{i + 1}T11:00:00+00:00", "type": "other"}
+        for i in range(3)
+    ], owner.id)
+    foreign = await event_service.bulk_create([
+        {"title": "Not yours", "start_time": "2024-11-01T10:00:00+00:00", "end_time": "2024-11-01T11:00:00+00:00", "type": "other"}
+    ], stranger.id)
+    ids = [e.id for e in created.events]
+    # События загружены в сессию до UPDATE: результат всё равно должен прийти из RETURNING
+    loaded = await event_service.get_events_by_user(owner.id)
+    assert all(e.updated_at is None for e in loaded.items)
+
+    result = await event_service.bulk_update([
+        {"id": str(ids[0]), "start_time": "2024-12-01T10:00:00+00:00", "end_time": "2024-12-01T11:00:00+00:00"},
+        {"id": str(ids[1]), "start_time": "2024-12-02T10:00:00+00:00", "end_time": "2024-12-02T11:00:00+00:00"},
+        {"id": str(ids[2]), "title": "Renamed"},
+        {"id": str(foreign.events[0].id), "title": "Hijacked"},
+        {"id": str(ids[2]), "end_time": "2024-11-01T00:00:00+00:00"},
+    ], owner)
+
+    assert [e.id for e in result.events] == ids
+    assert result.events[0].start_time.isoformat().startswith("2024-12-01")
+    assert result.events[2].title == "Renamed"
+    assert all(e.updated_at is not None for e in result.events)
+    assert [e.index for e in result.errors] == [3, 4]
+
+    untouched = await db_session.get(Event, foreign.events[0].id)
+    await db_session.refresh(untouched)
+    assert untouched.title == "Not yours"
+
+
+@pytest.mark.asyncio
+async def test_bulk_update_rejects_null_required_fields(db_session: AsyncSession):
+    user = await _service_user(db_session, "bulknull@example.com")
+    event_service = EventService(db_session)
+    created = await event_service.bulk_create([
+        {"title": f"Event {i}", "start_time": "2024-11-05T10:00:00+00:00",
+         "end_time": "2024-11-05T11:00:00+00:00", "type": "other"}
+        for i in range(2)
+    ], user.id)
+    ids = [e.id for e in created.events]
+
+    result = await event_service.bulk_update([
+        {"id": str(ids[0]), "title": None},
+        {"id": str(ids[1]), "start_time": None, "description": None},
+        {"id": str(ids[1]), "location": "Room 1"},
+    ], user)
+
+    # Ошибочные элементы не откатывают остальную пачку
+    assert [e.id for e in result.events] == [ids[1]]
+    assert [e.index for e in result.errors] == [0, 1]
+    assert "title may not be null" in result.errors[0].detail
+    assert "start_time may not be null" in result.errors[1].detail
+
+
+@pytest.mark.asyncio
+async def test_bulk_delete_removes_own_events(db_session: AsyncSession):
+    user = await _service_user(db_session, "bulkdelete@example.com")
+    event_service = EventService(db_session)
+    created = await event_service.bulk_create([
+        {"title": f"Event {i}", "start_time": "2024-11-05T10:00:00+00:00",
+         "end_time": "2024-11-05T11:00:00+00:00", "type": "other"}
+        for i in range(3)
+    ], user.id)
+    ids = [e.id for e in created.events]
+    missing = uuid.uuid4()
+    db_session.add_all([
+        Reminder(event_id=ids[0], remind_at=datetime.fromisoformat("2024-11-05T09:45:00+00:00"), method="popup"),
+        Reminder(event_id=ids[1], remind_at=datetime.fromisoformat("2024-11-05T09:45:00+00:00"), method="popup"),
+    ])
+    await db_session.commit()
+
+    result = await event_service.bulk_delete([ids[0], missing, ids[2], ids[0]], user)
+
+    assert result.deleted == [ids[0], ids[2]]
+    assert [(e.index, e.id) for e in result.errors] == [(1, missing), (3, ids[0])]
+    assert result.errors[1].detail == "Duplicate event id in this request"
+    page = await event_service.get_events_by_user(user.id)
+    assert [e.id for e in page.items] == [ids[1]]
+    # Напоминание удалённого события ушло по каскаду, у оставшегося — на месте
+    remaining = await db_session.scalars(select(Reminder.event_id).where(Reminder.event_id.in_(ids)))
+    assert remaining.all() == [ids[1]]
+
+
+@pytest.mark.asyncio
+async def test_bulk_rejects_oversized_batch(db_session: AsyncSession, monkeypatch):
+    user = await _service_user(db_session, "bulklimit@example.com")
+    monkeypatch.setattr(settings, "MAX_BULK_EVENTS", 2)
+    with pytest.raises(BadRequestError):
+        await EventService(db_session).bulk_create([{"title": "x"}] * 3, user.id)
+
+
+@pytest.mark.asyncio
+async def test_update_event_single_statement_checks_owner(db_session: AsyncSession):
+    owner = await _service_user(db_session, "writeowner@example.com")
+    stranger = await _service_user(db_session, "writestranger@example.com")
+    event_service = EventService(db_session)
+    event = await event_service.create(EventCreate(
+        title="Mine", start_time="2024-11-05T10:00:00+00:00",
+        end_time="2024-11-05T11:00:00+00:00", type="other"), owner.id)
+    event_id = event.id
+
+    updated = await event_service.update(event_id, EventUpdate(title="Renamed"), owner)
+    # Значения пришли из RETURNING и читаются после commit без refresh
+    assert updated.title == "Renamed"
+    assert updated.updated_at is not None
+    assert updated.period is not None
+
+    with pytest.raises(ForbiddenError):
+        await event_service.update(event_id, EventUpdate(title="Hijacked"), stranger)
+    with pytest.raises(NotFoundError):
+        await event_service.update(uuid.uuid4(), EventUpdate(title="Nobody"), owner)
+
+    stored = await event_service.get_by_id(event_id, owner)
+    assert stored.title == "Renamed"
+
+
+@pytest.mark.asyncio
+async def test_delete_event_single_statement_checks_owner(db_session: AsyncSession):
+    owner = await _service_user(db_session, "deleteowner@example.com")
+    stranger = await _service_user(db_session, "deletestranger@example.com")
+    event_service = EventService(db_session)
+    event = await event_service.create(EventCreate(
+        title="Mine", start_time="2024-11-05T10:00:00+00:00",
+        end_time="2024-11-05T11:00:00+00:00", type="other"), owner.id)
+    event_id = event.id
+
+    db_session.add(Reminder(event_id=event_id, remind_at=datetime.fromisoformat("2024-11-05T09:45:00+00:00"), method="popup"))
+    await db_session.commit()
+
+    with pytest.raises(ForbiddenError):
+        await event_service.delete(event_id, stranger)
+    # Событие с напоминанием удаляется одним DELETE: напоминание удаляет каскад FK
+    await event_service.delete(event_id, owner)
+    assert (await db_session.scalars(select(Reminder).where(Reminder.event_id == event_id))).all() == []
+    with pytest.raises(NotFoundError):
+        await event_service.delete(event_id, owner)
+
+
+@pytest.mark.asyncio
+async def test_events_page_rejects_bad_limit(client: AsyncClient, db_session: AsyncSession):
+    user = await _service_user(db_session, "limituser@example.com")
+    event_service = EventService(db_session)
+    await event_service.create(EventCreate(
+        title="Only event", start_time="2024-11-05T10:00:00+00:00",
+        end_time="2024-11-05T11:00:00+00:00", type="other"), user.id)
+
+    # Сервис вызывает paginate напрямую, без проверки Query: limit=0 раньше падал на items[-1]
+    with pytest.raises(BadRequestError):
+        await event_service.get_events_by_user(user.id, limit=0)
+    with pytest.raises(BadRequestError):
+        await event_service.get_events_by_user(user.id, limit=-1)
+
+    from app.auth.jwt import create_access_token
+    client.cookies.set("access_token", create_access_token(data={"sub": str(user.id)}))
+    for params in ({"limit": 0}, {"limit": -5}, {"limit": settings.PAGE_MAX_LIMIT + 1}, {"skip": -1}):
+        response = await client.get(f"{settings.API_V1_STR}/events/", params=params)
+        assert response.status_code == 422, params
+    response = await client.get(f"{settings.API_V1_STR}/events/", params={"limit": 1})
+    assert response.status_code == 200
+    assert len(response.json()) == 1
@@ -0,0 +1,172 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable
+
+import pytest
+from sqlalchemy import event, insert, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.models.models import AI_Interaction, Event, Reminder, User, User_Settings
+from app.services.ai_interaction import AI_InteractionService
+from app.services.event import EventService
+from app.services.reminder import ReminderService
+from app.services.user_settings import User_SettingsService
+
+
+USERS = 1000
+EVENTS_PER_USER = 10
+# Один пользователь с длинной историей: для него видно, что страница списка идёт
+# по порядку индекса, а окно календаря не перебирает все события до конца окна
+HEAVY_EVENTS = 5000
+BASE_TIME = datetime(2024, 7, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+async def seeded(db_session: AsyncSession):
+    """
+    Набор данных, на котором планировщику выгоднее индекс, чем полный просмотр:
+    тысяча пользователей, у каждого несколько событий, напоминаний и взаимодействий.
+    На таблице в пару страниц PostgreSQL честно выбрал бы Seq Scan.
+    """
+    users = [
+        {"id": uuid.uuid4(), "email": f"index_user_{i}@example.com", "pass_hash": "x", "name": f"User {i}"}
+        for i in range(USERS)
+    ]
+    events, reminders, interactions, settings = [], [], [], []
+    for n, user in enumerate(users):
+        settings.append({"id": uuid.uuid4(), "user_id": user["id"], "timezone": "UTC", "language": "en"})
+        for i in range(EVENTS_PER_USER):
+            start = BASE_TIME + timedelta(hours=i * 7 + n)
+            event_id = uuid.uuid4()
+            events.append({
+                "id": event_id, "user_id": user["id"], "title": f"Event {i}",
+                "start_time": start, "end_time": start + timedelta(hours=1), "type": "other",
+            })
+            reminders.append({
+                "id": uuid.uuid4(), "event_id": event_id,
+                "remind_at": start - timedelta(minutes=15), "method": "popup",
+            })
+            interactions.append({
+                "id": uuid.uuid4(), "user_id": user["id"], "input_text": "hi", "response_text": "hello",
+                "intent": f"intent_{i}", "created_at": start,
+            })
+
+    heavy_user = {"id": uuid.uuid4(), "email": "index_heavy_user@example.com", "pass_hash": "x", "name": "Heavy"}
+    for i in range(HEAVY_EVENTS):
+        start = BASE_TIME + timedelta(hours=i)
+        events.append({
+            "id": uuid.uuid4(), "user_id": heavy_user["id"], "title": f"Heavy {i}",
+            "start_time": start, "end_time": start + timedelta(minutes=30), "type": "other",
+        })
+    users.append(heavy_user)
+
+    await db_session.execute(insert(User), users)
+    await db_session.execute(insert(User_Settings), settings)
+    await db_session.execute(insert(Event), events)
+    await db_session.execute(insert(Reminder), reminders)
+    await db_session.execute(insert(AI_Interaction), interactions)
+    for table in ("users", "user_settings", "events", "reminders", "ai_interactions"):
+        await db_session.execute(text(f"ANALYZE {table}"))
+    return {
+        "user_id": users[USERS // 2]["id"],
+        "heavy_user_id": heavy_user["id"],
+        "event_id": reminders[len(reminders) // 2]["event_id"],
+    }
+
+
+async def explain_service_query(db_session: AsyncSession, call: Callable[[], Awaitable[Any]]) -> str:
+    """
+    EXPLAIN того SELECT, который сервис действительно отправляет в базу: SQL и параметры
+    перехватываются на пути к драйверу. Если запрос сервиса изменится и перестанет
+    попадать в индекс, тест это заметит.
+    """
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    engine = db_session.bind.sync_engine
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        await call()
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    assert len(statements) == 1, statements
+    statement, parameters = statements[0]
+    connection = await db_session.connection()
+    result = await connection.exec_driver_sql(f"EXPLAIN {statement}", parameters)
+    return "\n".join(row[0] for row in result)
+
+
+def assert_index_scan(plan: str, table: str, index: str):
+    assert f"Seq Scan on {table}" not in plan, plan
+    assert index in plan, plan
+
+
+@pytest.mark.asyncio
+async def test_events_by_user_uses_index(db_session: AsyncSession, seeded):
+    plan = await explain_service_query(
+        db_session, lambda: EventService(db_session).get_events_by_user(seeded["heavy_user_id"]))
+    assert_index_scan(plan, "events", "ix_events_user_id_start_time")
+
+
+@pytest.mark.asyncio
+async def test_events_by_date_range_uses_index(db_session: AsyncSession, seeded):
+    # Неделя в середине длинной истории: B-tree по (user_id, start_time) прошёл бы
+    # все события до конца окна, GiST по (user_id, period) находит только пересечения
+    window_start = BASE_TIME + timedelta(days=100)
+    plan = await explain_service_query(
+        db_session,
+        lambda: EventService(db_session).get_events_by_date_range(
+            seeded["heavy_user_id"], window_start, window_start + timedelta(days=7)),
+    )
+    assert_index_scan(plan, "events", "ix_events_user_id_period")
+    assert "ix_events_user_id_start_time" not in plan, plan
+
+
+@pytest.mark.asyncio
+async def test_upcoming_reminders_use_index(db_session: AsyncSession, seeded):
+    plan = await explain_service_query(
+        db_session,
+        lambda: ReminderService(db_session).get_upcoming_reminders(
+            BASE_TIME + timedelta(days=2), BASE_TIME + timedelta(days=2, hours=2)),
+    )
+    assert_index_scan(plan, "reminders", "ix_reminders_remind_at")
+
+
+@pytest.mark.asyncio
+async def test_reminders_by_event_use_index(db_session: AsyncSession, seeded):
+    plan = await explain_service_query(
+        db_session, lambda: ReminderService(db_session).get_reminders_by_event(seeded["event_id"]))
+    assert_index_scan(plan, "reminders", "ix_reminders_event_id")
+
+
+@pytest.mark.asyncio
+async def test_recent_interactions_use_index(db_session: AsyncSession, seeded):
+    plan = await explain_service_query(
+        db_session, lambda: AI_InteractionService(db_session).get_recent_interactions(seeded["user_id"]))
+    assert_index_scan(plan, "ai_interactions", "ix_ai_interactions_user_id_created_at")
+
+
+@pytest.mark.asyncio
+async def test_interactions_by_user_use_index(db_session: AsyncSession, seeded):
+    plan = await explain_service_query(
+        db_session, lambda: AI_InteractionService(db_session).get_ai_interactions_by_user(seeded["user_id"]))
+    assert_index_scan(plan, "ai_interactions", "ix_ai_interactions_user_id_created_at")
+
+
+@pytest.mark.asyncio
+async def test_interactions_by_intent_use_index(db_session: AsyncSession, seeded):
+    plan = await explain_service_query(
+        db_session, lambda: AI_InteractionService(db_session).get_ai_interactions_by_intent("intent_3"))
+    assert_index_scan(plan, "ai_interactions", "ix_ai_interactions_intent_created_at")
+    # Порядок курсора берётся из индекса, без сортировки всех строк намерения
+    assert "Sort" not in plan, plan
+
+
+@pytest.mark.asyncio
+async def test_user_settings_by_user_uses_index(db_session: AsyncSession, seeded):
+    plan = await explain_service_query(
+        db_session, lambda: User_SettingsService(db_session).get_by_user_id(seeded["user_id"]))
+    assert_index_scan(plan, "user_settings", "ix_user_settings_user_id")
@@ -2,8 +2,10 @@ import pytest
 from httpx import AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.exception_handlers import BadRequestError, NotFoundError
 from app.database.models.models import User
-from app.database.schemas.schemas import UserCreate
+from app.database.schemas.schemas import UserCreate, UserUpdate
+from app.services.user import UserService
 
 
 @pytest.mark.asyncio
@@ -185,4 +187,55 @@ async def test_update_user_duplicate_email(client: AsyncClient, db_session: Asyn
     response = await client.put(f"/api/v1/users/{user1_id}", json=update_data)
 
     assert response.status_code == 400 # Or 409 Conflict
-    assert "User with this email already exists" in response.json()["detail"] 
\ No newline at end of file
+    assert "User with this email already exists" in response.json()["detail"] 
+
+
+@pytest.mark.asyncio
+async def test_get_users_cursor_pagination(db_session: AsyncSession):
+    user_service = UserService(db_session)
+    for i in range(7):
+        await user_service.create(user_in=UserCreate(
+            email=f"page_user_{i}@example.com", password="password", name=f"Page User {i}"))
+
+    everything = await user_service.get_users(limit=1000)
+    seen, cursor = [], None
+    while True:
+        page = await user_service.get_users(limit=3, cursor=cursor)
+        assert len(page.items) <= 3
+        seen.extend(user.id for user in page.items)
+        if page.next_cursor is None:
+            break
+        cursor = page.next_cursor
+
+    # Страницы по курсору без пропусков и повторов дают тот же порядок, что и один большой запрос
+    assert seen == [user.id for user in everything.items]
+    assert [user.email for user in everything.items] == sorted(user.email for user in everything.items)
+
+    # Старые параметры skip/limit работают в том же порядке
+    offset_page = await user_service.get_users(skip=2, limit=2)
+    assert [user.id for user in offset_page.items] == seen[2:4]
+
+
+@pytest.mark.asyncio
+async def test_get_users_invalid_cursor(db_session: AsyncSession):
+    with pytest.raises(BadRequestError):
+        await UserService(db_session).get_users(cursor="not-a-cursor")
+
+
+@pytest.mark.asyncio
+async def test_update_user_refreshes_loaded_current_user(db_session: AsyncSession):
+    user_service = UserService(db_session)
+    created = await user_service.create(user_in=UserCreate(
+        email="returning_user@example.com", password="password", name="Before"))
+    # Как get_current_user: пользователь загружен в ту же сессию до UPDATE
+    current_user = await user_service.get_by_id(created.id)
+
+    updated = await user_service.update(current_user.id, UserUpdate(name="After"), current_user)
+
+    # Значения из RETURNING, включая вычисленный базой updated_at, видны после commit
+    assert updated.name == "After"
+    assert updated.updated_at is not None
+
+    await user_service.delete(updated.id, updated)
+    with pytest.raises(NotFoundError):
+        await user_service.delete(updated.id, updated)
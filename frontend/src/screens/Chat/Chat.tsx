@@ -1,7 +1,7 @@
 import React, { useState, useRef, useEffect } from 'react';
 import '../../components/Layout.css';
 import './Chat.css';
-import { chatWithML } from '@/utils/mlApi';
+import { chatInConversation } from '@/utils/mlApi';
 import { createEvent } from '@/utils/calendarApi';
 import { saveChatMessage, getCurrentUserId, getChatHistory } from '@/utils/api';
 
@@ -15,6 +15,9 @@ export const Chat: React.FC = () => {
   const [input, setInput] = useState('');
   const [userId, setUserId] = useState<string | null>(null);
   const chatEndRef = useRef<HTMLDivElement>(null);
+  // История диалога хранится на ML-сервисе; полностью она отправляется только первым запросом
+  const conversationId = useRef<string>(crypto.randomUUID());
+  const conversationSynced = useRef(false);
 
   useEffect(() => {
     chatEndRef.current?.scrollIntoView({ behavior: 'smooth' });
@@ -79,13 +82,16 @@ export const Chat: React.FC = () => {
     }
 
     try {
-      const chatHistory = [
-        ...messages,
-        userMessage
-      ].map((m) => ({ role: m.sender === 'user' ? 'user' : 'llm', content: m.text }));
-      
-      console.log('Sending chat history to ML:', chatHistory.length, 'messages');
-      const result = await chatWithML(userMessage.text, chatHistory);
+      // Только предыдущие сообщения: текущее сервис добавит в историю сам
+      const chatHistory = messages.map((m) => ({ role: m.sender === 'user' ? 'user' : 'llm', content: m.text }));
+
+      const result = await chatInConversation(
+        conversationId.current,
+        userMessage.text,
+        () => ({ history: chatHistory }),
+        !conversationSynced.current,
+      );
+      conversationSynced.current = true;
       let llmText = result.response ?? 'No responce for LLM service.';
       try {
         const eventCandidate = JSON.parse(llmText);
@@ -20,6 +20,51 @@ export async function chatWithML(message: string, history?: any, calendar?: any)
   }
 }
 
+export interface ConversationState {
+  history: any[];
+  calendar?: any;
+  calendarVersion?: string;
+}
+
+// Диалог хранится на ML-сервисе по conversationId: обычно уходит только новое сообщение.
+// Если сессии там нет (истекла, сервис перезапущен) или устарел календарь, сервис отвечает 409,
+// и запрос повторяется один раз с полной историей и календарём из getState().
+export async function chatInConversation(
+  conversationId: string,
+  message: string,
+  getState: () => ConversationState,
+  fullSync = false,
+) {
+  const post = (body: object) =>
+    fetch(`${ML_API_URL}/chat`, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ message, conversation_id: conversationId, ...body }),
+    });
+  const fullBody = () => {
+    const state = getState();
+    return { history: state.history, calendar: state.calendar, calendar_version: state.calendarVersion };
+  };
+
+  try {
+    let response = await post(fullSync ? fullBody() : { calendar_version: getState().calendarVersion });
+    if (response.status === 409 && !fullSync) {
+      console.warn("ML conversation session missing, resending full history");
+      response = await post(fullBody());
+    }
+
+    if (!response.ok) {
+      const errorText = await response.text();
+      throw new Error(`ML chat failed: ${response.status} - ${errorText}`);
+    }
+
+    return await response.json();
+  } catch (error) {
+    console.error("Error in chatInConversation:", error);
+    throw new Error(`ML service unavailable: ${error instanceof Error ? error.message : 'Unknown error'}`);
+  }
+}
+
 export async function voiceChatWithML(file: File) {
   try {
     const formData = new FormData();